@@ -1,7 +1,7 @@
-from board import Direction, MapSpace
-from dataclasses import dataclass
+from board import Direction, MapSpace, TileDef
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 
 class ActionType(Enum):
@@ -36,7 +36,7 @@ class ActionType(Enum):
     END_TURN = 9
 
 
-@dataclass
+@dataclass(frozen=True)
 class Action:
     type: ActionType
     """
@@ -49,6 +49,8 @@ class Action:
     MOVE_START, MOVE_END, DREAM, END actions don't have arguments.
     """
     arg: Optional[Union[Direction, MapSpace]] = None
+    # Dense id assigned by ActionTable for interned actions, -1 otherwise.
+    id: int = field(default=-1, compare=False, repr=False)
 
     def __str__(self):
         if self.type == ActionType.MOVE_START:
@@ -63,3 +65,72 @@ class Action:
             return 'End turn'
         else:
             return 'PLEASE IMPLEMENT ME %s' % self.type
+
+
+class ActionTable:
+    """Interns Actions, so that there is exactly one immutable Action for each (type, arg) pair.
+
+    Interned Actions get dense integer ids in the order they're interned. Move generation hands out these shared
+    objects instead of allocating new Actions for every candidate.
+    """
+    def __init__(self):
+        self._actions: List[Action] = []
+        self._ids: Dict[Tuple[ActionType, Any], int] = {}
+        # MapSpace uid -> interned MOVE action, for the move generation fast path.
+        self._move_actions: List[Optional[Action]] = []
+        # Tiles whose MOVE actions have all been interned by add_tiles().
+        self._tile_defs: Set[TileDef] = set()
+
+    def intern(self, action_type: ActionType, arg: Optional[Union[Direction, MapSpace]] = None) -> Action:
+        """Return the interned Action for (action_type, arg), creating it if needed."""
+        action_id = self._ids.get((action_type, arg))
+        if action_id is not None:
+            return self._actions[action_id]
+        action = Action(action_type, arg, id=len(self._actions))
+        self._actions.append(action)
+        self._ids[(action_type, arg)] = action.id
+        if action_type == ActionType.MOVE:
+            missing = arg.uid + 1 - len(self._move_actions)
+            if missing > 0:
+                self._move_actions.extend([None] * missing)
+            self._move_actions[arg.uid] = action
+        return action
+
+    def get(self, action_id: int) -> Action:
+        """Return the interned Action with the given id."""
+        return self._actions[action_id]
+
+    def move(self, space: MapSpace) -> Action:
+        """Return the MOVE action to `space`."""
+        action = self._move_actions[space.uid] if space.uid < len(self._move_actions) else None
+        if action is None:
+            action = self.intern(ActionType.MOVE, space)
+        return action
+
+    def exit(self, direction: Direction) -> Action:
+        """Return the EXIT action in `direction`."""
+        return self.intern(ActionType.EXIT, direction)
+
+    def add_tiles(self, tile_defs: Iterable[TileDef]) -> None:
+        """Intern the MOVE actions for every space on the given tiles, e.g. a whole tile set from the catalog.
+
+        Every new Game adds its whole tile set, so tiles that were added before are skipped.
+        """
+        for tile_def in tile_defs:
+            if tile_def not in self._tile_defs:
+                for space in tile_def.spaces:
+                    self.move(space)
+                self._tile_defs.add(tile_def)
+
+    def __len__(self):
+        return len(self._actions)
+
+
+ACTIONS = ActionTable()
+
+# Actions without arguments, and one exit per direction, are interned up front so that their ids are stable.
+MOVE_START = ACTIONS.intern(ActionType.MOVE_START)
+END_MOVE = ACTIONS.intern(ActionType.END_MOVE)
+END_TURN = ACTIONS.intern(ActionType.END_TURN)
+# Indexed by Direction.value.
+EXITS = tuple(ACTIONS.exit(direction) for direction in Direction)
@@ -1,17 +1,36 @@
 from board import MapSpace
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from actor.occupancy import Occupancy
 
 
 class Actor:
     """Represents an entity that can move around on the board and has HP, etc."""
+    # Overridden by Hunter. A class attribute, so the hot paths that tell hunters from monsters avoid isinstance().
+    is_hunter = False
+
     def __init__(self, position: MapSpace, max_hp: int):
         self.position = position
+        # The Occupancy index tracking this actor, if any. Set by Occupancy.add().
+        self.occupancy: Optional['Occupancy'] = None
         self._max_hp = max_hp
         self._current_hp = max_hp
 
     def move(self, new_position: MapSpace) -> None:
         """Update this Actor's current position. Does not make any checks about the validity of the move."""
+        if self.occupancy is not None:
+            self.occupancy.actor_moved(self, new_position)
         self.position = new_position
 
+    def get_hp(self) -> int:
+        """Return this Actor's current hp."""
+        return self._current_hp
+
+    def get_max_hp(self) -> int:
+        """Return this Actor's maximum hp."""
+        return self._max_hp
+
     def set_hp(self, new_hp: int) -> None:
         """Set this Actor's current hp."""
         self._current_hp = new_hp
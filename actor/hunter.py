@@ -23,6 +23,8 @@ class Hunter(Actor):
 
     This includes things like current HP, weapon state, board position, etc.
     """
+    is_hunter = True
+
     def __init__(self, position: MapSpace, weapon: HunterWeaponDef, gun: HunterGunDef):
         super().__init__(position, max_hp=6)
         self._hp = 6
@@ -0,0 +1,146 @@
+from actor.actor import Actor
+from board import Board, MapSpace, MapTile
+from typing import Any, Collection, Dict, List, Tuple
+
+_NO_ACTORS: Dict[Actor, None] = {}
+
+
+class Occupancy:
+    """Tracks which actors are on which spaces and tiles.
+
+    Actors that are added to the index keep it up to date themselves whenever they move (see Actor.move), so the queries
+    are lookups rather than scans over every hunter and monster. Monsters are any actors that aren't Hunters.
+    """
+    def __init__(self, board: Board):
+        self._board = board
+        # Actor -> (space, tile) it's indexed under. Kept here rather than looked up, because by the time an actor moves
+        # off a tile (e.g. in Game.restore), the tile may no longer be on the board.
+        self._locations: Dict[Actor, Tuple[MapSpace, MapTile]] = {}
+        # Space uid/tile -> actors on it, in the order they arrived. Dicts rather than sets so the order is stable.
+        self._space_actors: Dict[int, Dict[Actor, None]] = {}
+        self._tile_actors: Dict[MapTile, Dict[Actor, None]] = {}
+        # MapSpace uid -> number of actors / hunters on that space.
+        self._counts: List[int] = []
+        self._hunter_counts: List[int] = []
+
+    def add(self, actor: Actor) -> None:
+        """Start tracking `actor`."""
+        if actor in self._locations:
+            raise ValueError('Actor is already tracked.')
+        actor.occupancy = self
+        self._insert(actor, actor.position)
+
+    def remove(self, actor: Actor) -> None:
+        """Stop tracking `actor`, e.g. because it was killed."""
+        self._erase(actor)
+        actor.occupancy = None
+
+    def actor_moved(self, actor: Actor, new_position: MapSpace) -> None:
+        """Called by Actor.move."""
+        space, tile = self._locations[actor]
+        uid = space.uid
+        new_uid = new_position.uid
+        if uid == new_uid:
+            return
+        new_tile = self._board.get_tile(new_position)
+        self._locations[actor] = (new_position, new_tile)
+        # Runs on every move, so the space index is updated inline rather than with _discard() and setdefault().
+        space_actors = self._space_actors
+        if len(space_actors[uid]) == 1:
+            del space_actors[uid]
+        else:
+            del space_actors[uid][actor]
+        if new_uid in space_actors:
+            space_actors[new_uid][actor] = None
+        else:
+            space_actors[new_uid] = {actor: None}
+        # Most moves stay on the same tile.
+        if new_tile is not tile:
+            _discard(self._tile_actors, tile, actor)
+            self._tile_actors.setdefault(new_tile, {})[actor] = None
+        counts = self._counts
+        if new_uid >= len(counts):
+            self._ensure_counts(new_uid)
+        counts[uid] -= 1
+        counts[new_uid] += 1
+        if actor.is_hunter:
+            hunter_counts = self._hunter_counts
+            hunter_counts[uid] -= 1
+            hunter_counts[new_uid] += 1
+
+    def get_actors(self, space: MapSpace) -> Collection[Actor]:
+        """Return the actors on `space`. The result is a live view, so don't move actors while iterating over it."""
+        return self._space_actors.get(space.uid, _NO_ACTORS).keys()
+
+    def get_tile_actors(self, tile: MapTile) -> Collection[Actor]:
+        """Return the actors on any of `tile`'s spaces. The result is a live view, like get_actors()."""
+        return self._tile_actors.get(tile, _NO_ACTORS).keys()
+
+    def count(self, space: MapSpace) -> int:
+        """Return the number of actors on `space`."""
+        uid = space.uid
+        return self._counts[uid] if uid < len(self._counts) else 0
+
+    def count_hunters(self, space: MapSpace) -> int:
+        uid = space.uid
+        return self._hunter_counts[uid] if uid < len(self._hunter_counts) else 0
+
+    def count_monsters(self, space: MapSpace) -> int:
+        uid = space.uid
+        return self._counts[uid] - self._hunter_counts[uid] if uid < len(self._counts) else 0
+
+    def _ensure_counts(self, uid: int) -> None:
+        if uid >= len(self._counts):
+            padding = [0] * (uid + 1 - len(self._counts))
+            self._counts.extend(padding)
+            self._hunter_counts.extend(padding)
+
+    def _insert(self, actor: Actor, space: MapSpace) -> None:
+        tile = self._board.get_tile(space)
+        self._locations[actor] = (space, tile)
+        uid = space.uid
+        self._space_actors.setdefault(uid, {})[actor] = None
+        self._tile_actors.setdefault(tile, {})[actor] = None
+        self._ensure_counts(uid)
+        self._counts[uid] += 1
+        if actor.is_hunter:
+            self._hunter_counts[uid] += 1
+
+    def _erase(self, actor: Actor) -> None:
+        space, tile = self._locations.pop(actor)
+        uid = space.uid
+        _discard(self._space_actors, uid, actor)
+        _discard(self._tile_actors, tile, actor)
+        self._counts[uid] -= 1
+        if actor.is_hunter:
+            self._hunter_counts[uid] -= 1
+
+    def __getstate__(self):
+        # The space index and counts are keyed by MapSpace uid, which can differ in the unpickling process. So the space
+        # index is pickled by space, and the counts are rebuilt from the actors' locations.
+        state = self.__dict__.copy()
+        state['_space_actors'] = [(self._locations[next(iter(actors))][0], actors)
+                                  for actors in self._space_actors.values()]
+        del state['_counts']
+        del state['_hunter_counts']
+        return state
+
+    def __setstate__(self, state):
+        space_actors = state.pop('_space_actors')
+        self.__dict__.update(state)
+        self._space_actors = {space.uid: actors for space, actors in space_actors}
+        self._counts = []
+        self._hunter_counts = []
+        for actor, (space, _) in self._locations.items():
+            self._ensure_counts(space.uid)
+            self._counts[space.uid] += 1
+            if actor.is_hunter:
+                self._hunter_counts[space.uid] += 1
+
+
+def _discard(index: Dict[Any, Dict[Actor, None]], key: Any, actor: Actor) -> None:
+    """Remove `actor` from index[key], and the key from the index if that leaves no actors."""
+    actors = index[key]
+    del actors[actor]
+    if not actors:
+        del index[key]
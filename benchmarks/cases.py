@@ -0,0 +1,180 @@
+"""The benchmark cases.
+
+Each case is a function that does its setup and returns the operation to time. Operations should leave their inputs
+in a state where they can be run again, e.g. by restoring a snapshot, since they're called many times in a row.
+"""
+import random
+from board import Board, Direction, MapTile
+from cards.deck import Deck
+from collections import OrderedDict
+from controller import RandomHunterController
+from functools import partial
+from game import Game, TurnPhase
+from simulate import run_game
+from tiles import BASE, TileDeck
+from typing import Callable, Dict
+
+Operation = Callable[[], None]
+
+# Benchmark name -> setup function, in the order they were registered.
+BENCHMARKS: Dict[str, Callable[[], Operation]] = OrderedDict()
+
+
+def benchmark(name: str):
+    """Register the decorated setup function under `name`."""
+    def register(setup: Callable[[], Operation]) -> Callable[[], Operation]:
+        if name in BENCHMARKS:
+            raise ValueError('Duplicate benchmark %s.' % name)
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _grown_board() -> Board:
+    """A board with a tile on every exit of the central lamp."""
+    board = Board(MapTile(BASE['central_lamp'], 0))
+    root = board.get_newest_tile()
+    tile_defs = [tile_def for name, tile_def in BASE.items() if name != 'central_lamp']
+    for direction, tile_def in zip(root.get_exit_directions(), tile_defs):
+        board.add_tile(root, direction, tile_def)
+    return board
+
+
+def _new_game(seed: int = 1) -> Game:
+    random.seed(seed)
+    return Game(1, controller_factory=partial(RandomHunterController, rng=random.Random(seed)), verbose=False)
+
+
+@benchmark('map_tile.rotation_queries')
+def map_tile_rotation_queries() -> Operation:
+    tiles = [MapTile(tile_def, rotation) for tile_def in BASE.values() for rotation in range(4)]
+
+    def run():
+        for tile in tiles:
+            tile.get_exit_directions()
+            for direction in Direction:
+                tile.get_exit_space(direction)
+            for space in tile.get_spaces():
+                tile.get_space_exits(space)
+                tile.get_space_neighbors(space)
+    return run
+
+
+@benchmark('board.add_tile')
+def board_add_tile() -> Operation:
+    board = Board(MapTile(BASE['central_lamp'], 0))
+    root = board.get_newest_tile()
+    direction = root.get_exit_directions()[0]
+    tile_def = BASE['oedon_chapel']
+    snapshot = board.snapshot()
+
+    def run():
+        board.add_tile(root, direction, tile_def)
+        board.restore(snapshot)
+    return run
+
+
+@benchmark('board.get_valid_moves')
+def board_get_valid_moves() -> Operation:
+    board = _grown_board()
+    spaces = [space for tile in board.get_current_tiles() for space in tile.get_spaces()]
+
+    def run():
+        get_valid_moves = board.get_valid_moves
+        for space in spaces:
+            get_valid_moves(space)
+    return run
+
+
+@benchmark('deck.draw_discard')
+def deck_draw_discard() -> Operation:
+    random.seed(1)
+    deck = Deck(60)
+    deck.shuffle()
+
+    def run():
+        deck.discard(deck.draw(5))
+    return run
+
+
+@benchmark('deck.shuffle_in')
+def deck_shuffle_in() -> Operation:
+    random.seed(1)
+    deck = Deck(60)
+    deck.shuffle()
+
+    def run():
+        deck.shuffle_in(list(deck.draw(1)))
+    return run
+
+
+@benchmark('tile_deck.draw')
+def tile_deck_draw() -> Operation:
+    random.seed(1)
+    tile_deck = TileDeck([tile_def for name, tile_def in BASE.items() if name != 'central_lamp'])
+    snapshot = tile_deck.snapshot()
+
+    def run():
+        if tile_deck.draw() is None:
+            tile_deck.restore(snapshot)
+    return run
+
+
+@benchmark('tile_deck.draw_with_exit_masks')
+def tile_deck_draw_with_exit_masks() -> Operation:
+    random.seed(1)
+    tile_deck = TileDeck([tile_def for name, tile_def in BASE.items() if name != 'central_lamp'])
+    snapshot = tile_deck.snapshot()
+    # Tiles with an exit UP and at least one more exit.
+    allowed_masks = sum(1 << exit_mask for exit_mask in range(16) if exit_mask & 1 and exit_mask != 1)
+
+    def run():
+        if tile_deck.draw_with_exit_masks(allowed_masks) is None:
+            tile_deck.restore(snapshot)
+    return run
+
+
+@benchmark('game.get_player_moves')
+def game_get_player_moves() -> Operation:
+    game = _new_game()
+    game.apply_action(game.get_possible_actions()[0])
+    assert game.get_phase() == TurnPhase.MOVE
+    player = game.get_current_player()
+
+    def run():
+        game.get_player_moves(player)
+    return run
+
+
+@benchmark('game.get_player_moves.uncached')
+def game_get_player_moves_uncached() -> Operation:
+    game = _new_game()
+    game.apply_action(game.get_possible_actions()[0])
+    player = game.get_current_player()
+    move_cache = game._player_move_cache
+
+    def run():
+        move_cache.clear()
+        game.get_player_moves(player)
+    return run
+
+
+@benchmark('game.round')
+def game_round() -> Operation:
+    game = _new_game()
+    snapshot = game.snapshot()
+
+    def run():
+        game.round()
+        if game.is_game_over():
+            game.restore(snapshot)
+    return run
+
+
+@benchmark('game.full_game')
+def game_full_game() -> Operation:
+    seeds = iter(range(1 << 30))
+
+    def run():
+        run_game(next(seeds))
+    return run
@@ -0,0 +1,133 @@
+"""Runs the benchmark cases, and saves or compares their results.
+
+Usage:
+    python -m benchmarks --output results.json
+    python -m benchmarks --save-baseline benchmarks/baseline.json
+    python -m benchmarks --baseline benchmarks/baseline.json
+
+Each case is timed like timeit: the number of loops is calibrated so that one repeat takes at least --min-time
+seconds, then the best and median time per operation over --repeat repeats are reported. When comparing against a
+baseline, a case whose best time got more than --tolerance slower is a regression, and the exit status is 1.
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from benchmarks.cases import BENCHMARKS, Operation
+from typing import Any, Dict, List, Optional
+
+RESULTS_FORMAT_VERSION = 1
+
+
+def _time_loops(operation: Operation, loops: int) -> float:
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(loops):
+            operation()
+        return time.perf_counter() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def time_operation(operation: Operation, min_time: float = 0.2, repeat: int = 5) -> Dict[str, Any]:
+    """Time `operation` and return its statistics, in seconds per operation."""
+    loops = 1
+    while True:
+        elapsed = _time_loops(operation, loops)
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    times = [elapsed / loops] + [_time_loops(operation, loops) / loops for _ in range(repeat - 1)]
+    best = min(times)
+    return {
+        'best': best,
+        'median': statistics.median(times),
+        'ops_per_second': 1 / best if best > 0 else float('inf'),
+        'loops': loops,
+        'repeat': repeat,
+    }
+
+
+def run_benchmarks(names: Optional[List[str]] = None, min_time: float = 0.2, repeat: int = 5,
+                   log=None) -> Dict[str, Any]:
+    """Run the named cases (all of them by default) and return the results document."""
+    results = {}
+    for name in names if names is not None else BENCHMARKS:
+        result = time_operation(BENCHMARKS[name](), min_time, repeat)
+        results[name] = result
+        if log is not None:
+            log('%-32s %12.3f us/op  (median %.3f us, %d loops)' %
+                (name, result['best'] * 1e6, result['median'] * 1e6, result['loops']))
+    return {
+        'format': RESULTS_FORMAT_VERSION,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'timestamp': time.time(),
+        'benchmarks': results,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """Return a description of every case that's more than `tolerance` (a fraction) slower than in `baseline`.
+
+    Cases that are missing from either document are ignored.
+    """
+    regressions = []
+    baseline_benchmarks = baseline.get('benchmarks', {})
+    for name, result in results['benchmarks'].items():
+        baseline_result = baseline_benchmarks.get(name)
+        if baseline_result is None:
+            continue
+        ratio = result['best'] / baseline_result['best']
+        if ratio > 1 + tolerance:
+            regressions.append('%s: %.3f us/op vs baseline %.3f us/op (%.0f%% slower)' %
+                               (name, result['best'] * 1e6, baseline_result['best'] * 1e6, (ratio - 1) * 100))
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Run the Bloodborne performance benchmarks.')
+    parser.add_argument('names', nargs='*', help='Cases to run (substring match). Defaults to all of them.')
+    parser.add_argument('--list', action='store_true', help='List the cases and exit.')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Minimum seconds per repeat.')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed repeats per case.')
+    parser.add_argument('--output', help='Write the results as JSON to this file.')
+    parser.add_argument('--baseline', help='Compare against the results in this JSON file.')
+    parser.add_argument('--save-baseline', help='Write the results as the new baseline to this file.')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed slowdown against the baseline, as a fraction.')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print('\n'.join(BENCHMARKS))
+        return 0
+    names = [name for name in BENCHMARKS if not args.names or any(pattern in name for pattern in args.names)]
+    results = run_benchmarks(names, args.min_time, args.repeat, log=print)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print('Regressions against %s:' % args.baseline)
+            for regression in regressions:
+                print('  ' + regression)
+            return 1
+        print('No regressions against %s.' % args.baseline)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
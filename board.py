@@ -1,7 +1,8 @@
 import random
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, List, Optional, Tuple, NewType, Dict, Iterable
+from typing import Callable, List, Optional, Tuple, NewType, Dict, Iterable
 
 Position = NewType('Position', Tuple[int, int])
 
@@ -16,22 +17,34 @@ class Direction(Enum):
         return Direction((self.value + 2) % 4)
 
 
+# 4-bit exit mask (bit n set for Direction(n)) -> the directions in it.
+MASK_DIRECTIONS: Tuple[Tuple[Direction, ...], ...] = tuple(
+    tuple(direction for direction in Direction if mask & (1 << direction.value)) for mask in range(16))
+
+
+# Width and height of a new Board's grid. It grows as needed.
+_INITIAL_GRID_SIZE = 8
+
+# Exit mask -> number of exits.
+_NUM_EXITS: Tuple[int, ...] = tuple(len(directions) for directions in MASK_DIRECTIONS)
+# Direction value -> 16-bit set of the exit masks with an exit that way.
+_MASKS_WITH_EXIT: Tuple[int, ...] = tuple(sum(1 << exit_mask for exit_mask in range(16) if exit_mask & (1 << direction))
+                                          for direction in range(4))
+# Exit mask m -> 16-bit set of the exit masks with no exits in common with m.
+_DISJOINT_MASKS: Tuple[int, ...] = tuple(sum(1 << exit_mask for exit_mask in range(16) if not exit_mask & m)
+                                         for m in range(16))
+
+# (x, y) offset of one step in Direction(n).
+DIRECTION_DELTAS: Tuple[Tuple[int, int], ...] = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+
 def move(position: Position, direction: Direction) -> Position:
     """Return the position that is one space in the provided direction from the provided position."""
-    # I'm sure there's a more elegant way to do this but I'm not clever enough to think of it right now.
-    if direction == Direction.UP:
-        return Position((position[0], position[1]+1))
-    elif direction == Direction.RIGHT:
-        return Position((position[0]+1, position[1]))
-    elif direction == Direction.DOWN:
-        return Position((position[0], position[1]-1))
-    elif direction == Direction.LEFT:
-        return Position((position[0]-1, position[1]))
-    else:
-        raise ValueError('Invalid direction %d' % direction)
-
-
-@dataclass(eq=True, frozen=True)
+    dx, dy = DIRECTION_DELTAS[direction.value]
+    return Position((position[0] + dx, position[1] + dy))
+
+
+@dataclass(frozen=True, eq=False)
 class MapSpace:
     """Contains information about a space's physical boundaries on a tile."""
     """
@@ -47,16 +60,63 @@ class MapSpace:
     (0, 1)          (1, 1)
     
     Coordinates will be stored in a list in clockwise order.
+    
+    Every MapSpace is interned in SPACES when it is created, which gives it a dense integer `uid`. Equal spaces share a
+    uid, so hashing and equality only look at the uid, and the uid can be used to index flat lists.
     """
     id: str
     bounds: Tuple[Tuple[float, float], ...]
     name: str = ''
     has_exit: bool = False
+    uid: int = field(init=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'uid', SPACES.intern(self))
+
+    def __eq__(self, other):
+        if other.__class__ is MapSpace:
+            return self.uid == other.uid
+        return NotImplemented
+
+    def __hash__(self):
+        return self.uid
+
+    def __reduce__(self):
+        # uids are specific to a process, so re-intern on unpickling. Anything indexed by uid has to be rebuilt on
+        # unpickling too, see e.g. Board.__setstate__.
+        return MapSpace, (self.id, self.bounds, self.name, self.has_exit)
 
     def __str__(self):
         return self.id
 
 
+class SpaceRegistry:
+    """Assigns every distinct MapSpace a dense integer uid, starting from 0."""
+    def __init__(self):
+        self._spaces: List[MapSpace] = []
+        self._uids: Dict[Tuple, int] = {}
+
+    def intern(self, space: MapSpace) -> int:
+        """Return the uid for `space`, registering it if no equal space has been seen before."""
+        key = (space.id, space.bounds, space.name, space.has_exit)
+        uid = self._uids.get(key)
+        if uid is None:
+            uid = len(self._spaces)
+            self._uids[key] = uid
+            self._spaces.append(space)
+        return uid
+
+    def get(self, uid: int) -> MapSpace:
+        """Return the space with the given uid."""
+        return self._spaces[uid]
+
+    def __len__(self):
+        return len(self._spaces)
+
+
+SPACES = SpaceRegistry()
+
+
 class TileDef:
     """Contains information about a map tile's spaces, exits and connectivity."""
     def __init__(self, spaces: List[MapSpace], exits: List[Optional[MapSpace]],
@@ -77,6 +137,53 @@ class TileDef:
         self.adjacency = adjacency
         self.name = name
         # TODO probably tile effects, lamps, chest/monster spawns, etc. will go here too
+        self._compile()
+
+    def _compile(self) -> None:
+        """Precompute the lookup tables MapTile needs for every rotation, so that MapTile queries are just indexing.
+
+        Tables indexed by rotation are indexed by the number of clockwise 90 degree rotations (0-3).
+        """
+        # MapSpace uid -> index in self.spaces.
+        self._space_index: Dict[int, int] = {space.uid: i for i, space in enumerate(self.spaces)}
+        self._neighbors: Tuple[Tuple[MapSpace, ...], ...] = tuple(
+            tuple(self.adjacency.get(space, ())) for space in self.spaces)
+
+        rotated_exits = []
+        exit_directions = []
+        exit_masks = []
+        space_exits = []
+        for rotation in range(4):
+            # Entry d is the exit that ends up facing Direction(d) after rotating.
+            exits = tuple(self.exits[(d - rotation) % 4] for d in range(4))
+            directions = tuple(Direction(d) for d in range(4) if exits[d] is not None)
+            rotated_exits.append(exits)
+            exit_directions.append(directions)
+            exit_masks.append(sum(1 << d.value for d in directions))
+            space_exits.append(tuple(tuple(d for d in directions if exits[d.value] == space) for space in self.spaces))
+        self._rotated_exits: Tuple[Tuple[Optional[MapSpace], ...], ...] = tuple(rotated_exits)
+        self._exit_directions: Tuple[Tuple[Direction, ...], ...] = tuple(exit_directions)
+        self._exit_masks: Tuple[int, ...] = tuple(exit_masks)
+        self._space_exits: Tuple[Tuple[Tuple[Direction, ...], ...], ...] = tuple(space_exits)
+
+    def get_space_index(self, space: MapSpace) -> int:
+        """Return the index of `space` in this tile's list of spaces, raising ValueError if it isn't on this tile."""
+        index = self._space_index.get(space.uid)
+        if index is None:
+            raise ValueError('Specified space is not on this tile.')
+        return index
+
+    def get_exit_mask(self, rotation: int = 0) -> int:
+        """Return a 4-bit mask of exit directions (bit n set for Direction(n)) for the given rotation."""
+        return self._exit_masks[rotation % 4]
+
+    def __getstate__(self):
+        # The compiled tables are indexed by MapSpace uid, which can differ in the unpickling process.
+        return {'spaces': self.spaces, 'exits': self.exits, 'adjacency': self.adjacency, 'name': self.name}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._compile()
 
 
 class MapTile:
@@ -92,34 +199,38 @@ class MapTile:
         """
         self._tile_def = tile_def
         self._rotation = rotation % 4
+        # Bind this rotation's precompiled tables.
+        self._exits = tile_def._rotated_exits[self._rotation]
+        self._exit_directions = tile_def._exit_directions[self._rotation]
+        self._space_exits = tile_def._space_exits[self._rotation]
 
-    def _rotate(self, lst: List[Any]) -> List[Any]:
-        return lst[-self._rotation:] + lst[:-self._rotation]
+    def get_tile_def(self) -> TileDef:
+        return self._tile_def
 
-    def get_exit_directions(self) -> List[Direction]:
-        """Return a list of Directions in which one can exit this tile."""
-        rotated_exits = self._rotate(self._tile_def.exits)
-        return [Direction(i) for i, e in enumerate(rotated_exits) if e is not None]
+    def get_rotation(self) -> int:
+        return self._rotation
+
+    def get_exit_directions(self) -> Tuple[Direction, ...]:
+        """Return the Directions in which one can exit this tile."""
+        return self._exit_directions
+
+    def get_exit_mask(self) -> int:
+        """Return a 4-bit mask of the directions in which one can exit this tile (bit n set for Direction(n))."""
+        return self._tile_def._exit_masks[self._rotation]
 
     def get_exit_space(self, direction: Direction) -> Optional[MapSpace]:
         """Return the MapSpace with the exit in the specified direction, or None."""
-        rotated_exits = self._rotate(self._tile_def.exits)
-        return rotated_exits[direction.value]
+        return self._exits[direction.value]
 
-    def get_space_exits(self, space: MapSpace) -> List[Direction]:
-        """Return the Directions in which the specified space have exit(s), or an empty list."""
-        if space not in self._tile_def.spaces:
-            raise ValueError('Specified space is not on this tile.')
-        return [Direction((i + self._rotation) % 4) for i, e in enumerate(self._tile_def.exits) if space == e]
+    def get_space_exits(self, space: MapSpace) -> Tuple[Direction, ...]:
+        """Return the Directions in which the specified space have exit(s), or an empty tuple."""
+        return self._space_exits[self._tile_def.get_space_index(space)]
 
     def get_spaces(self) -> List[MapSpace]:
         return self._tile_def.spaces
 
-    def get_space_neighbors(self, space: MapSpace) -> List[MapSpace]:
-        if space not in self._tile_def.spaces:
-            raise ValueError('Specified space is not on this tile.')
-
-        return list(self._tile_def.adjacency[space])
+    def get_space_neighbors(self, space: MapSpace) -> Tuple[MapSpace, ...]:
+        return self._tile_def._neighbors[self._tile_def.get_space_index(space)]
 
     def __repr__(self):
         return '%s, rotation=%d' % (self._tile_def.name, self._rotation)
@@ -128,38 +239,178 @@ class MapTile:
         return self.__repr__()
 
 
+class BoardListener:
+    """Receives notifications of changes to a Board. See Board.add_listener()."""
+    def tile_added(self, tile: 'MapTile') -> None:
+        pass
+
+    def tile_removed(self, tile: 'MapTile') -> None:
+        """Called after `tile` has been taken off the board, e.g. by Board.restore()."""
+        pass
+
+
 class Board:
     """Represents the entirety of the playing board."""
-    def __init__(self, first_tile: MapTile):
+    def __init__(self, first_tile: MapTile, rng: Optional[random.Random] = None):
+        """
+        Args:
+            first_tile: The tile the board starts with, at Position (0, 0).
+            rng: Random number generator for picking the rotation of new tiles. Defaults to the module-level one.
+        """
+        self._rng = rng if rng is not None else random
         # Here Positions are used to describe where a given MapTiles are located
-        # relative to the board origin.
+        # relative to the board origin, which is where the first tile goes.
         # TODO some of the physical tiles are larger than the standard ones, do we need special
         # handling for those?
-        origin = Position((0, 0))
-        # Graph structure representing tile network.
-        self._board_root = self._BoardNode(first_tile, origin)
-        # MapTile -> Position lookup dict.
-        self._tile_positions = {first_tile: origin}
-        # Position -> BoardNode lookup dict.
-        self._positions = {origin: self._board_root}
-        # MapSpace -> MapTile lookup dict.
-        self._spaces: Dict[MapSpace, MapTile] = {}
+        # Tiles are stored in a dense, row-major grid of slots, with row y + 1 above row y. There are always at least
+        # two empty rows or columns between the tiles and the edge of the grid, so the neighbors of a tile and of the
+        # empty positions next to it are always in the grid, and are found by adding self._deltas[direction] to its
+        # index.
+        self._grid_width = _INITIAL_GRID_SIZE
+        self._grid_height = _INITIAL_GRID_SIZE
+        self._grid: List[Optional[MapTile]] = [None] * (_INITIAL_GRID_SIZE * _INITIAL_GRID_SIZE)
+        # Grid index of Position (0, 0).
+        self._origin = (_INITIAL_GRID_SIZE // 2) * (_INITIAL_GRID_SIZE + 1)
+        self._deltas = self._grid_deltas(_INITIAL_GRID_SIZE)
+        # MapTile -> grid index, in the order the tiles were added.
+        self._tile_cells: Dict[MapTile, int] = {first_tile: self._origin}
+        self._grid[self._origin] = first_tile
+        # MapSpace uid -> MapTile lookup list. None for spaces that aren't on the board.
+        self._spaces: List[Optional[MapTile]] = []
+        # MapSpace uid -> valid moves cache. Kept up to date by add_tile, which only touches the spaces it affects.
+        self._moves: List[Optional[Tuple[MapSpace, ...]]] = []
         self._register_spaces(first_tile)
-
-    class _BoardNode:
-        """This is pretty much a bidirectional 2d linked list node."""
-        def __init__(self, tile: MapTile, position: Position):
-            self.tile = tile
-            self.position = position
-            # clockwise, starting with top
-            self.neighbors: List[Optional[Board._BoardNode]] = [None, None, None, None]
+        self._update_moves(first_tile.get_spaces())
+        # The frontier: for each tile, a mask of its open exits, i.e. exits that face an empty position. Kept up to
+        # date by add_tile and _remove_last_tile, which only look at the positions around the changed one.
+        self._open_exits: Dict[MapTile, int] = {first_tile: first_tile.get_exit_mask()}
+        self._num_open_exits = bin(first_tile.get_exit_mask()).count('1')
+        # Incremented every time a tile is added or removed, so that callers can tell when to refresh anything they
+        # derive from the board.
+        self._version = 0
+        self._listeners: List[BoardListener] = []
+
+    def add_listener(self, listener: BoardListener) -> None:
+        """Have `listener` notified whenever a tile is added to or removed from the board."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: BoardListener) -> None:
+        self._listeners.remove(listener)
+
+    @staticmethod
+    def _grid_deltas(width: int) -> Tuple[int, ...]:
+        """Return the grid index offset of one step in each Direction, for a grid `width` slots wide."""
+        return tuple(dy * width + dx for dx, dy in DIRECTION_DELTAS)
+
+    def _position_of(self, index: int) -> Position:
+        return Position((index % self._grid_width - self._origin % self._grid_width,
+                         index // self._grid_width - self._origin // self._grid_width))
+
+    def _index_of(self, position: Position) -> Optional[int]:
+        x = self._origin % self._grid_width + position[0]
+        y = self._origin // self._grid_width + position[1]
+        if 0 <= x < self._grid_width and 0 <= y < self._grid_height:
+            return y * self._grid_width + x
+        return None
+
+    def _ensure_margin(self, index: int) -> None:
+        """Grow the grid if the tile at `index` is too close to its edge."""
+        x = index % self._grid_width
+        y = index // self._grid_width
+        if 1 < x < self._grid_width - 2 and 1 < y < self._grid_height - 2:
+            return
+        # Double both dimensions and keep the tiles centred, so growing is rare and amortized O(1) per tile.
+        positions = {tile: self._position_of(tile_index) for tile, tile_index in self._tile_cells.items()}
+        min_x = min(x for x, _ in positions.values())
+        max_x = max(x for x, _ in positions.values())
+        min_y = min(y for _, y in positions.values())
+        max_y = max(y for _, y in positions.values())
+        width = max(self._grid_width, 2 * (max_x - min_x + 1))
+        height = max(self._grid_height, 2 * (max_y - min_y + 1))
+        origin_x = (width - (max_x - min_x + 1)) // 2 - min_x
+        origin_y = (height - (max_y - min_y + 1)) // 2 - min_y
+        self._grid_width = width
+        self._grid_height = height
+        self._origin = origin_y * width + origin_x
+        self._deltas = self._grid_deltas(width)
+        self._grid = [None] * (width * height)
+        for tile, position in positions.items():
+            tile_index = self._origin + position[1] * width + position[0]
+            self._grid[tile_index] = tile
+            self._tile_cells[tile] = tile_index
 
     def _register_spaces(self, tile: MapTile) -> None:
+        # Grow the uid-indexed lists to cover every space registered so far.
+        missing = len(SPACES) - len(self._spaces)
+        if missing > 0:
+            self._spaces.extend([None] * missing)
+            self._moves.extend([None] * missing)
         for space in tile.get_spaces():
-            self._spaces[space] = tile
+            self._spaces[space.uid] = tile
+
+    def _update_moves(self, spaces: Iterable[MapSpace]) -> None:
+        for space in spaces:
+            self._moves[space.uid] = self._compute_moves(space)
+
+    def _compute_moves(self, space: MapSpace) -> Tuple[MapSpace, ...]:
+        # Valid moves from a given space include all of its neighbors on the tile, plus whatever spaces are through
+        # any exits.
+        tile = self.get_tile(space)
+        moves = tile.get_space_neighbors(space)
+        exit_directions = tile.get_space_exits(space)
+        if exit_directions:
+            exit_moves = []
+            for direction in exit_directions:
+                exit_tile = self.get_tile_in_direction(tile, direction)
+                if exit_tile:
+                    # Check that the tile on the other side of the exit actually has an exit itself in the
+                    # opposite direction.
+                    exit_space = exit_tile.get_exit_space(direction.reverse())
+                    if exit_space:
+                        exit_moves.append(exit_space)
+            if exit_moves:
+                moves = moves + tuple(exit_moves)
+        return moves
 
     def get_current_tiles(self) -> Iterable[MapTile]:
-        return self._tile_positions.keys()
+        return self._tile_cells.keys()
+
+    def get_position(self, tile: MapTile) -> Position:
+        """Return the position of `tile` relative to the first tile on the board."""
+        return self._position_of(self._tile_cells[tile])
+
+    def get_tile_at(self, position: Position) -> Optional[MapTile]:
+        """Return the tile at `position`, or None."""
+        index = self._index_of(position)
+        return self._grid[index] if index is not None else None
+
+    def to_matrix(self, cell_value: Optional[Callable[[MapTile], int]] = None) -> 'BoardMatrix':
+        """Export the board as a dense integer matrix covering the bounding box of its tiles.
+
+        Args:
+            cell_value: Maps each tile to its value in the matrix. Defaults to 1 + the order it was added to the board
+                in, so the first tile is 1. Empty positions are 0.
+        """
+        if cell_value is None:
+            order = {tile: i + 1 for i, tile in enumerate(self._tile_cells)}
+            cell_value = order.__getitem__
+        positions = {tile: self._position_of(index) for tile, index in self._tile_cells.items()}
+        min_x = min(x for x, _ in positions.values())
+        min_y = min(y for _, y in positions.values())
+        width = max(x for x, _ in positions.values()) - min_x + 1
+        height = max(y for _, y in positions.values()) - min_y + 1
+        cells = array('i', bytes(4 * width * height))
+        for tile, (x, y) in positions.items():
+            cells[(y - min_y) * width + x - min_x] = cell_value(tile)
+        return BoardMatrix(width, height, Position((min_x, min_y)), cells)
+
+    def get_version(self) -> int:
+        """Return a number that changes whenever tiles are added to or removed from the board."""
+        return self._version
+
+    def get_newest_tile(self) -> MapTile:
+        """Return the tile that was added to the board most recently."""
+        return next(reversed(self._tile_cells))
 
     def add_tile(self, tile: MapTile, direction: Direction, new_tile_def: TileDef,
                  new_tile_rotation: Optional[int] = None) -> MapTile:
@@ -170,17 +421,15 @@ class Board:
         new_tile_rotation is primarily intended to simplify testing, but there is still some uncertainty about whether
         players are intended to determine tile rotation or if it's supposed to be randomly chosen.
         """
-        if tile not in self._tile_positions:
+        if tile not in self._tile_cells:
             raise ValueError('Specified base tile is not on the board.')
         # Validate tile orientation.
         tile_exits = tile.get_exit_directions()
         if direction not in tile_exits:
             raise ValueError('Tile not in valid orientation.')
         if new_tile_rotation is None:
-            tile_exits = new_tile_def.exits
             # Pick a rotation at random to line up the exits.
-            exit_directions = [Direction(i) for i, exit_space in enumerate(tile_exits) if exit_space is not None]
-            chosen_exit_direction = random.choice(exit_directions)
+            chosen_exit_direction = self._rng.choice(new_tile_def._exit_directions[0])
             new_tile_rotation = Direction(direction).reverse().value - chosen_exit_direction.value
         new_tile = MapTile(new_tile_def, new_tile_rotation)
         if new_tile_rotation is not None:
@@ -188,47 +437,216 @@ class Board:
             if direction.reverse() not in new_tile.get_exit_directions():
                 raise ValueError('Provided rotation is not valid.')
 
-        # Create new position and BoardNode.
-        src_position = self._tile_positions[tile]
-        dst_position = move(src_position, direction)
-        dst_node = self._BoardNode(new_tile, dst_position)
-
-        # Hook up new node to graph.
-        src_node = self._positions[src_position]
-        src_node.neighbors[direction.value] = dst_node
-        dst_node.neighbors[direction.reverse().value] = src_node
-
-        # Update lookup dicts.
-        self._positions[dst_position] = dst_node
-        self._tile_positions[new_tile] = dst_position
+        dst_index = self._tile_cells[tile] + self._deltas[direction.value]
+        if self._grid[dst_index] is not None:
+            raise ValueError('There is already a tile in that direction.')
+        self._grid[dst_index] = new_tile
+        self._tile_cells[new_tile] = dst_index
+        self._ensure_margin(dst_index)
         self._register_spaces(new_tile)
+        self._add_to_frontier(new_tile)
+
+        # The only cached moves that change are those of the new tile's spaces and of the spaces on neighboring tiles
+        # whose exits face one of the new tile's exits.
+        self._update_moves(new_tile.get_spaces())
+        self._update_moves(self._facing_exit_spaces(new_tile))
+        self._version += 1
+        for listener in self._listeners:
+            listener.tile_added(new_tile)
 
         return new_tile
 
+    def _add_to_frontier(self, new_tile: MapTile) -> None:
+        """Close the exits that face the new tile, and open the new tile's exits that face empty positions."""
+        index = self._tile_cells[new_tile]
+        exit_mask = new_tile.get_exit_mask()
+        open_mask = 0
+        for direction, delta in enumerate(self._deltas):
+            neighbor = self._grid[index + delta]
+            if neighbor is None:
+                if exit_mask & (1 << direction):
+                    open_mask |= 1 << direction
+                    self._num_open_exits += 1
+            else:
+                facing_bit = 1 << ((direction + 2) % 4)
+                if self._open_exits[neighbor] & facing_bit:
+                    self._open_exits[neighbor] ^= facing_bit
+                    self._num_open_exits -= 1
+        self._open_exits[new_tile] = open_mask
+
+    def _remove_from_frontier(self, tile: MapTile, index: int) -> None:
+        """Undo _add_to_frontier. `tile` must already have been taken off the board, from grid index `index`."""
+        self._num_open_exits -= bin(self._open_exits.pop(tile)).count('1')
+        for direction, delta in enumerate(self._deltas):
+            neighbor = self._grid[index + delta]
+            if neighbor is not None:
+                facing_bit = 1 << ((direction + 2) % 4)
+                if neighbor.get_exit_mask() & facing_bit:
+                    self._open_exits[neighbor] |= facing_bit
+                    self._num_open_exits += 1
+
+    def get_num_open_exits(self) -> int:
+        """Return the number of exits on the board that face an empty position."""
+        return self._num_open_exits
+
+    def get_open_exit_mask(self, tile: MapTile) -> int:
+        """Return a 4-bit mask of the directions in which `tile` has an exit facing an empty position."""
+        return self._open_exits[tile]
+
+    def get_open_exits(self, tile: MapTile) -> Tuple[Direction, ...]:
+        """Return the directions in which `tile` has an exit facing an empty position."""
+        return MASK_DIRECTIONS[self._open_exits[tile]]
+
+    def get_frontier(self) -> Iterable[Tuple[MapTile, Direction]]:
+        """Iterate over every open exit on the board, as (tile, direction)."""
+        for tile, open_mask in self._open_exits.items():
+            for direction in MASK_DIRECTIONS[open_mask]:
+                yield tile, direction
+
+    def would_close_frontier(self, tile: MapTile, direction: Direction, new_tile_def: TileDef,
+                             new_tile_rotation: int) -> bool:
+        """Return whether adding `new_tile_def` with the given rotation next to `tile` in `direction` would leave the
+        board without any open exits."""
+        num_closed, empty_mask = self._placement_effect(self._tile_cells[tile] + self._deltas[direction.value])
+        exit_mask = new_tile_def.get_exit_mask(new_tile_rotation)
+        return self._num_open_exits - num_closed + _NUM_EXITS[exit_mask & empty_mask] == 0
+
+    def get_placement_masks(self, tile: MapTile, direction: Direction, keep_frontier_open: bool = False) -> int:
+        """Return the exit masks a new tile next to `tile` in `direction` could have, as a 16-bit set: bit m is set if
+        exit mask m is allowed.
+
+        The new tile needs an exit back towards `tile`. With keep_frontier_open, masks that would leave the board
+        without any open exits (see would_close_frontier) aren't allowed either.
+        """
+        if tile not in self._tile_cells:
+            raise ValueError('Specified base tile is not on the board.')
+        allowed = _MASKS_WITH_EXIT[(direction.value + 2) % 4]
+        if keep_frontier_open:
+            num_closed, empty_mask = self._placement_effect(self._tile_cells[tile] + self._deltas[direction.value])
+            # Both counts are non-negative, so the frontier only closes if no other exit is open and the new tile has
+            # no exits towards empty cells.
+            if self._num_open_exits == num_closed:
+                allowed &= ~_DISJOINT_MASKS[empty_mask]
+        return allowed
+
+    def _placement_effect(self, index: int) -> Tuple[int, int]:
+        """Return how placing a tile at grid index `index` changes the frontier: the number of open exits it closes,
+        and a mask of the directions in which it has empty neighbors (its exits that way would be open)."""
+        num_closed = 0
+        empty_mask = 0
+        grid = self._grid
+        for neighbor_direction, delta in enumerate(self._deltas):
+            neighbor = grid[index + delta]
+            if neighbor is None:
+                empty_mask |= 1 << neighbor_direction
+            elif self._open_exits[neighbor] & (1 << ((neighbor_direction + 2) % 4)):
+                num_closed += 1
+        return num_closed, empty_mask
+
+    def _facing_exit_spaces(self, tile: MapTile) -> List[MapSpace]:
+        """Return the spaces on neighboring tiles whose exits face one of `tile`'s exits."""
+        facing_spaces = []
+        for exit_direction in tile.get_exit_directions():
+            neighbor = self.get_tile_in_direction(tile, exit_direction)
+            if neighbor:
+                neighbor_exit_space = neighbor.get_exit_space(exit_direction.reverse())
+                if neighbor_exit_space:
+                    facing_spaces.append(neighbor_exit_space)
+        return facing_spaces
+
+    def snapshot(self) -> 'BoardSnapshot':
+        """Return a token that restore() can use to bring the board back to its current state.
+
+        Tiles are only ever added to a board, so a snapshot just records how many tiles there were. Taking one is O(1)
+        and all the board's structures stay shared.
+        """
+        return BoardSnapshot(len(self._tile_cells), next(reversed(self._tile_cells)))
+
+    def restore(self, snapshot: 'BoardSnapshot') -> None:
+        """Remove every tile added since `snapshot` was taken. Cost is proportional to the number of removed tiles.
+
+        The snapshot must come from this board's current history, i.e. no tile that was on the board when it was taken
+        may have been removed since.
+        """
+        # Tiles are removed last-in-first-out, so if the snapshot's last tile is still here, so is everything before it.
+        if snapshot.last_tile not in self._tile_cells:
+            raise ValueError('Snapshot is not from this board\'s history.')
+        for _ in range(len(self._tile_cells) - snapshot.num_tiles):
+            self._remove_last_tile()
+
+    def _remove_last_tile(self) -> None:
+        facing_spaces = self._facing_exit_spaces(next(reversed(self._tile_cells)))
+        tile, index = self._tile_cells.popitem()
+        self._grid[index] = None
+        for space in tile.get_spaces():
+            self._spaces[space.uid] = None
+            self._moves[space.uid] = None
+        self._remove_from_frontier(tile, index)
+        self._update_moves(facing_spaces)
+        self._version += 1
+        for listener in self._listeners:
+            listener.tile_removed(tile)
+
     def get_tile(self, space: MapSpace) -> MapTile:
         """Return the tile on which the specified space exists."""
-        return self._spaces[space]
+        tile = self._spaces[space.uid] if space.uid < len(self._spaces) else None
+        if tile is None:
+            raise KeyError(space)
+        return tile
 
     def get_tile_in_direction(self, tile: MapTile, direction: Direction) -> Optional[MapTile]:
         """Return the tile in the specified direction from the specified tile, or None."""
-        position = self._tile_positions[tile]
-        dst_position = move(position, direction)
-        return self._positions[dst_position].tile if dst_position in self._positions else None
+        return self._grid[self._tile_cells[tile] + self._deltas[direction.value]]
 
-    def get_valid_moves(self, space: MapSpace) -> List[MapSpace]:
-        """Return a list of valid moves from `space`."""
-        # Valid moves from a given space include all of its neighbors on the tile, plus whatever spaces are through
-        # any exits.
-        tile = self._spaces[space]
-        moves: List[MapSpace] = tile.get_space_neighbors(space)
-        exit_directions = tile.get_space_exits(space)
-        if exit_directions:
-            for direction in exit_directions:
-                exit_tile = self.get_tile_in_direction(tile, direction)
-                if exit_tile:
-                    # Check that the tile on the other side of the exit actually has an exit itself in the
-                    # opposite direction.
-                    exit_space = exit_tile.get_exit_space(direction.reverse())
-                    if exit_space:
-                        moves.append(exit_space)
+    def get_valid_moves(self, space: MapSpace) -> Tuple[MapSpace, ...]:
+        """Return the valid moves from `space`.
+
+        The result is cached and shared between calls, so callers must not try to modify it.
+        """
+        moves = self._moves[space.uid] if space.uid < len(self._moves) else None
+        if moves is None:
+            raise KeyError(space)
         return moves
+
+    def __getstate__(self):
+        # The space and move lists are indexed by MapSpace uid, which can differ in the unpickling process, so they're
+        # rebuilt from the tiles.
+        state = self.__dict__.copy()
+        del state['_spaces']
+        del state['_moves']
+        if self._rng is random:
+            # Modules can't be pickled. The copy uses the module-level RNG of the process it ends up in.
+            state['_rng'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self._rng is None:
+            self._rng = random
+        self._spaces = []
+        self._moves = []
+        for tile in self._tile_cells:
+            self._register_spaces(tile)
+        for tile in self._tile_cells:
+            self._update_moves(tile.get_spaces())
+
+
+@dataclass(frozen=True)
+class BoardMatrix:
+    """A board exported as a dense matrix. See Board.to_matrix()."""
+    width: int
+    height: int
+    # Position of the tile in the first column of the first row.
+    origin: Position
+    # Row-major values, with row r holding the tiles at y = origin y + r.
+    cells: array
+
+    def rows(self) -> List[List[int]]:
+        return [self.cells[r * self.width:(r + 1) * self.width].tolist() for r in range(self.height)]
+
+
+@dataclass(frozen=True)
+class BoardSnapshot:
+    """See Board.snapshot()."""
+    num_tiles: int
+    last_tile: MapTile
@@ -1,5 +1,22 @@
 import random
-from typing import List, Sequence
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+# Cards are stored as unsigned shorts, so card numbers must be below 65536.
+_CARD_TYPECODE = 'H'
+
+
+def _shuffle_range(cards: array, start: int, stop: int, rng: random.Random) -> None:
+    """Shuffle cards[start:stop], in place."""
+    shuffle_range = getattr(rng, 'shuffle_range', None)
+    if shuffle_range is not None:
+        # A RandomStream, which can shuffle in place.
+        shuffle_range(cards, start, stop)
+        return
+    part = cards[start:stop]
+    rng.shuffle(part)
+    cards[start:stop] = part
 
 
 class Deck:
@@ -8,51 +25,173 @@ class Deck:
     the discard.
     """
 
-    def __init__(self, num_cards: int):
+    def __init__(self, num_cards: int, rng: Optional[random.Random] = None):
+        """
+        Args:
+            num_cards: Number of cards in the deck. They're numbered from 0.
+            rng: Random number generator for shuffling. Defaults to the module-level one.
+        """
+        self._rng = rng if rng is not None else random
         self._num_cards_available: int = num_cards
-        self._deck: List[int] = list(range(num_cards))
-        self._discard: List[int] = []
+        # The deck is self._cards[self._top:self._bottom], top card first. Drawing just advances self._top.
+        # Nothing below self._top is ever written to again, so views of drawn cards stay valid; when the deck needs more
+        # room at the bottom, it moves to a new buffer instead of resizing this one.
+        self._cards = array(_CARD_TYPECODE, range(num_cards))
+        self._top = 0
+        self._bottom = num_cards
+        self._discard = array(_CARD_TYPECODE)
+        # True while the buffers are shared with a DeckSnapshot. They're copied before the next write.
+        self._shared = False
+        # Card -> index in self._cards, built on demand by _card_positions(). Only entries >= self._top are current.
+        # Drawing keeps it valid; anything that reorders the deck throws it away.
+        self._positions: Optional[Dict[int, int]] = None
 
     def current_deck_size(self) -> int:
-        return len(self._deck)
+        return self._bottom - self._top
 
     def shuffle(self) -> None:
         """Shuffle the remaining cards in the deck."""
-        random.shuffle(self._deck)
+        self._unshare()
+        _shuffle_range(self._cards, self._top, self._bottom, self._rng)
+        self._positions = None
 
     def reset(self) -> None:
         """The discard pile is shuffled and placed on the bottom of the deck."""
-        new_deck = self._discard
-        random.shuffle(new_deck)
-        self._discard = []
-        self._deck.extend(new_deck)
+        self._unshare()
+        new_cards = self._discard
+        _shuffle_range(new_cards, 0, len(new_cards), self._rng)
+        self._discard = array(_CARD_TYPECODE)
+        self._append(new_cards)
 
     def draw(self, num_cards: int = 1, auto_shuffle_discard: bool = True) -> Sequence[int]:
-        """Draw num_cards from the deck, shuffling the discard if necessary."""
+        """Draw num_cards from the deck, shuffling the discard if necessary.
+
+        The drawn cards are returned as a read-only view into the deck's storage rather than a copy.
+        """
         if auto_shuffle_discard:
             num_cards_available = self._num_cards_available
         else:
-            num_cards_available = len(self._deck)
+            num_cards_available = self.current_deck_size()
         if num_cards > num_cards_available:
             raise ValueError('Number of cards to draw (%d) exceeds number of available cards in deck (%d).' %
                              (num_cards, num_cards_available))
-        cards_drawn, self._deck = self._deck[:num_cards], self._deck[num_cards:]
-        if len(cards_drawn) < num_cards:
+        if num_cards > self.current_deck_size():
             # It shouldn't be possible to come in here if auto_shuffle_discard is False.
-            draw_remainder = num_cards - len(cards_drawn)
+            # Since the discard goes on the bottom of the deck, the drawn cards stay contiguous.
             self.reset()
-            cards_drawn.extend(self._deck[:draw_remainder])
-            self._deck = self._deck[draw_remainder:]
+        top = self._top
+        self._top = top + num_cards
         self._num_cards_available -= num_cards
-        return cards_drawn
+        return memoryview(self._cards)[top:top + num_cards].toreadonly()
+
+    def has_card(self, card: int) -> bool:
+        """Return whether `card` is in the deck, i.e. it can still be drawn without reshuffling the discard."""
+        # Called for every candidate tile on every tile draw, so _card_positions() is inlined.
+        positions = self._positions
+        if positions is None:
+            positions = self._card_positions()
+        position = positions.get(card)
+        return position is not None and position >= self._top
+
+    def draw_card(self, card: int) -> None:
+        """Draw a specific card from the deck.
+
+        The card is swapped with the top card before drawing it, so if the deck was shuffled, the rest of it stays
+        shuffled (as long as the choice of card didn't depend on the order of the deck).
+        """
+        positions = self._card_positions()
+        position = positions.get(card)
+        if position is None or position < self._top:
+            raise ValueError('Card %d is not in the deck.' % card)
+        self._unshare()
+        cards = self._cards
+        top = self._top
+        top_card = cards[top]
+        cards[position] = top_card
+        cards[top] = card
+        positions[top_card] = position
+        del positions[card]
+        self._top = top + 1
+        self._num_cards_available -= 1
+
+    def _card_positions(self) -> Dict[int, int]:
+        positions = self._positions
+        if positions is None:
+            positions = self._positions = {card: i for i, card in enumerate(self._cards[self._top:self._bottom],
+                                                                         self._top)}
+        return positions
 
     def discard(self, cards_to_discard: Sequence[int]):
         """Put cards_to_discard into the discard pile."""
+        self._unshare()
         self._discard.extend(cards_to_discard)
         self._num_cards_available += len(cards_to_discard)
 
     def shuffle_in(self, cards_to_shuffle: Sequence[int]):
-        """Shuffle cards_to_shuffle into the deck."""
-        self._deck.extend(cards_to_shuffle)
-        self.shuffle()
+        """Shuffle cards_to_shuffle into the deck.
+
+        Each new card is swapped into a uniformly random position (the incremental step of Fisher-Yates), which is the
+        same as reshuffling the whole deck as long as the deck was already shuffled.
+        """
+        self._unshare()
+        start = self._bottom
+        self._append(cards_to_shuffle)
+        cards = self._cards
+        top = self._top
+        randrange = self._rng.randrange
+        for i in range(start, self._bottom):
+            j = randrange(top, i + 1)
+            cards[i], cards[j] = cards[j], cards[i]
         self._num_cards_available += len(cards_to_shuffle)
+        self._positions = None
+
+    def _append(self, new_cards: Sequence[int]) -> None:
+        """Put new_cards on the bottom of the deck, in order."""
+        num_new_cards = len(new_cards)
+        if self._bottom + num_new_cards > len(self._cards):
+            # Move the deck to the start of a new buffer rather than resizing the current one.
+            deck_size = self.current_deck_size()
+            capacity = max(len(self._cards), deck_size + num_new_cards)
+            cards = array(_CARD_TYPECODE, bytes(capacity * self._cards.itemsize))
+            cards[:deck_size] = self._cards[self._top:self._bottom]
+            self._cards = cards
+            self._top = 0
+            self._bottom = deck_size
+        self._cards[self._bottom:self._bottom + num_new_cards] = array(_CARD_TYPECODE, new_cards)
+        self._bottom += num_new_cards
+        self._positions = None
+
+    def snapshot(self) -> 'DeckSnapshot':
+        """Return a token that restore() can use to bring the deck back to its current state.
+
+        This is O(1): the snapshot shares the deck's buffers, and the deck copies them the next time it needs to write
+        to them. Drawing never writes, so a deck that is only drawn from after a snapshot never copies anything.
+        """
+        self._shared = True
+        return DeckSnapshot(self._cards, self._top, self._bottom, self._discard, self._num_cards_available)
+
+    def restore(self, snapshot: 'DeckSnapshot') -> None:
+        """Bring the deck back to the state it was in when `snapshot` was taken."""
+        self._cards = snapshot.cards
+        self._top = snapshot.top
+        self._bottom = snapshot.bottom
+        self._discard = snapshot.discard
+        self._num_cards_available = snapshot.num_cards_available
+        self._shared = True
+        self._positions = None
+
+    def _unshare(self) -> None:
+        if self._shared:
+            self._cards = array(_CARD_TYPECODE, self._cards)
+            self._discard = array(_CARD_TYPECODE, self._discard)
+            self._shared = False
+
+
+@dataclass(frozen=True)
+class DeckSnapshot:
+    """See Deck.snapshot(). The buffers must not be modified."""
+    cards: array
+    top: int
+    bottom: int
+    discard: array
+    num_cards_available: int
@@ -0,0 +1,117 @@
+"""Lazily loaded, precompiled tile sets.
+
+Tile sets live in the `tilesets` package, one module per set, each with a TILES dict of tiles.create_tile keyword
+arguments. Executing those modules (with their large ASCII help diagrams) on every process start is wasted work, so
+the first load of a set compiles just the data create_tile needs into a marshal file in the package's __pycache__
+directory. Later loads read that file instead of importing the module. A compiled file is only used if its format
+version and the SHA-256 of the tile set's source both match, so editing a tile set invalidates it automatically.
+
+Set BLOODBORNE_TILE_CACHE to use a different cache directory.
+"""
+import hashlib
+import importlib
+import importlib.util
+import marshal
+import os
+import pkgutil
+from board import TileDef
+from tiles import create_tile
+from typing import Any, Dict, List, Optional, Tuple
+
+# Bump this whenever the compiled layout or create_tile's interpretation of it changes.
+CATALOG_FORMAT_VERSION = 1
+
+_TILE_SET_PACKAGE = 'tilesets'
+# The create_tile keyword arguments that are kept in the compiled catalog.
+_COMPILED_KEYS = ('tile_id', 'positions', 'exits', 'adjacency', 'names')
+
+# Tile set name -> {tile name -> TileDef}, for sets loaded in this process.
+_loaded: Dict[str, Dict[str, TileDef]] = {}
+
+
+def available_tile_sets() -> List[str]:
+    """Return the names of all tile sets that can be loaded."""
+    package = importlib.import_module(_TILE_SET_PACKAGE)
+    return sorted(module.name for module in pkgutil.iter_modules(package.__path__))
+
+
+def load_tile_set(name: str) -> Dict[str, TileDef]:
+    """Return the tiles of the named tile set, keyed by tile name.
+
+    Each set is only built once per process; repeated calls return the same TileDefs.
+    """
+    tile_set = _loaded.get(name)
+    if tile_set is None:
+        tile_set = {tile_name: create_tile(**kwargs) for tile_name, kwargs in _load_compiled(name)}
+        _loaded[name] = tile_set
+    return tile_set
+
+
+def get_tile_help(tile_set_name: str, tile_name: str) -> str:
+    """Return the human readable help text (diagram and special effects) for a tile.
+
+    This imports the tile set's source module, so it's meant for interactive use rather than the simulation hot path.
+    """
+    module = importlib.import_module('%s.%s' % (_TILE_SET_PACKAGE, tile_set_name))
+    return module.TILES[tile_name].get('help', '')
+
+
+def _source_path(name: str) -> str:
+    spec = importlib.util.find_spec('%s.%s' % (_TILE_SET_PACKAGE, name))
+    if spec is None or spec.origin is None:
+        raise ValueError('Unknown tile set %s.' % name)
+    return spec.origin
+
+
+def _cache_path(name: str, source_path: str) -> str:
+    cache_dir = os.environ.get('BLOODBORNE_TILE_CACHE')
+    if not cache_dir:
+        cache_dir = os.path.join(os.path.dirname(source_path), '__pycache__')
+    return os.path.join(cache_dir, '%s.tiles-v%d' % (name, CATALOG_FORMAT_VERSION))
+
+
+def _load_compiled(name: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """Return [(tile name, create_tile kwargs)] for a tile set, compiling it first if the cache is missing or stale."""
+    source_path = _source_path(name)
+    with open(source_path, 'rb') as f:
+        source_hash = hashlib.sha256(f.read()).hexdigest()
+    cache_path = _cache_path(name, source_path)
+
+    compiled = _read_cache(cache_path, source_hash)
+    if compiled is None:
+        compiled = _compile(name)
+        _write_cache(cache_path, source_hash, compiled)
+    return [(tile_name, dict(zip(_COMPILED_KEYS, values))) for tile_name, values in compiled]
+
+
+def _compile(name: str) -> List[Tuple[str, Tuple]]:
+    module = importlib.import_module('%s.%s' % (_TILE_SET_PACKAGE, name))
+    return [(tile_name, tuple(kwargs.get(key, {}) if key == 'names' else kwargs[key] for key in _COMPILED_KEYS))
+            for tile_name, kwargs in module.TILES.items()]
+
+
+def _read_cache(cache_path: str, source_hash: str) -> Optional[List[Tuple[str, Tuple]]]:
+    try:
+        with open(cache_path, 'rb') as f:
+            version, cached_hash, compiled = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != CATALOG_FORMAT_VERSION or cached_hash != source_hash:
+        return None
+    return compiled
+
+
+def _write_cache(cache_path: str, source_hash: str, compiled: List[Tuple[str, Tuple]]) -> None:
+    # Several worker processes may compile the same set at once, so write to a private file and atomically rename it.
+    tmp_path = '%s.%d.tmp' % (cache_path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            marshal.dump((CATALOG_FORMAT_VERSION, source_hash, compiled), f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # The cache is only an optimization; carry on without it if it can't be written.
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
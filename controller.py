@@ -1,10 +1,13 @@
+import asyncio
+from abc import ABC, abstractmethod
 from action import Action, ActionType
 from actor.actor import Actor
 from actor.hunter import Hunter
 from board import Board, MapSpace
 from dataclasses import dataclass
 from enum import Enum
-from typing import List
+from pursuit import DistanceField
+from typing import Any, Optional, Sequence
 import random
 
 
@@ -12,14 +15,24 @@ class Controller:
     def __init__(self, actor: Actor):
         self.actor = actor
 
-    def select_action(self, possible_actions: List[Action]) -> Action:
+    def select_action(self, possible_actions: Sequence[Action]) -> Action:
         raise NotImplemented()
 
     def new_round(self) -> None:
         raise NotImplemented()
 
+    def snapshot(self) -> Any:
+        """Return this controller's game state (not including its actor), for Game.snapshot()."""
+        return None
 
-class HunterController(Controller):
+    def restore(self, state: Any) -> None:
+        """Restore game state returned by snapshot()."""
+        pass
+
+
+class HunterControllerBase(Controller):
+    """The per-hunter state the game keeps in the controller, shared by HunterController and AsyncHunterController.
+    How decisions are made is up to the subclasses."""
     def __init__(self, hunter: Hunter):
         super().__init__(hunter)
         # TODO replace this with stat cards when those are implemented.
@@ -32,44 +45,168 @@ class HunterController(Controller):
     def has_action(self) -> bool:
         return self._num_actions > 0
 
+    def snapshot(self) -> Any:
+        return self._num_actions
+
+    def restore(self, state: Any) -> None:
+        self._num_actions = state
+
     def discard_stat_card(self) -> None:
         # TODO prompt player for stat card to discard.
         # TODO return discarded stat card
         self._num_actions -= 1
 
-    def select_action(self, possible_actions: List[Action]) -> Action:
-        return self._action_prompt(possible_actions,
-                                   'Your current space is %s.\nPossible actions:\n' % self.actor.position)
-
-    def select_move(self, possible_moves: List[Action], num_moves: int) -> Action:
-        return self._action_prompt(possible_moves, '%d moves remaining. Possible moves:\n' % num_moves)
-
-    def _action_prompt(self, action_list: List[Action], initial_prompt: str) -> Action:
-        action = -1
-        while not 0 <= action < len(action_list):
-            prompt_lst = [initial_prompt]
-            for i, possible_action in enumerate(action_list):
-                prompt_lst.append('\t%d: %s.' % (i + 1, possible_action))
-                if possible_action.type == ActionType.MOVE and isinstance(possible_action.arg,
-                                                                          MapSpace) and possible_action.arg.has_exit:
-                    prompt_lst.append(' This space has an exit to another tile.')
-                prompt_lst.append('\n')
-            prompt_lst.append('Pick an action: [1-%d] > ' % len(action_list))
-            try:
-                action = int(input(''.join(prompt_lst))) - 1
-            except ValueError:
-                print('Invalid selection.')
-                continue
-            if not 0 <= action < len(action_list):
-                print('Invalid selection.')
-                continue
-        return action_list[action]
+    def _action_prompt_header(self) -> str:
+        return 'Your current space is %s.\nPossible actions:\n' % self.actor.position
+
+    @staticmethod
+    def _move_prompt_header(num_moves: int) -> str:
+        return '%d moves remaining. Possible moves:\n' % num_moves
+
+
+class HunterController(HunterControllerBase):
+    """Makes decisions by prompting a human on the terminal. Subclasses make them some other way, but always
+    synchronously, so games with these controllers can be played with Game.round."""
+    def select_action(self, possible_actions: Sequence[Action]) -> Action:
+        return self._action_prompt(possible_actions, self._action_prompt_header())
+
+    def select_move(self, possible_moves: Sequence[Action], num_moves: int) -> Action:
+        return self._action_prompt(possible_moves, self._move_prompt_header(num_moves))
+
+    def _action_prompt(self, action_list: Sequence[Action], initial_prompt: str) -> Action:
+        prompt = format_action_prompt(action_list, initial_prompt)
+        while True:
+            action = parse_action_selection(input(prompt), len(action_list))
+            if action is not None:
+                return action_list[action]
+            print('Invalid selection.')
+
+
+class AsyncHunterController(HunterControllerBase, ABC):
+    """A hunter controller that makes its decisions asynchronously, e.g. for a player connected over the network.
+
+    select_action and select_move are coroutines, so games with these controllers have to be driven by
+    server.play_async rather than Game.round. This is deliberately not a HunterController.
+    """
+    @abstractmethod
+    async def select_action(self, possible_actions: Sequence[Action]) -> Action:
+        pass
+
+    @abstractmethod
+    async def select_move(self, possible_moves: Sequence[Action], num_moves: int) -> Action:
+        pass
+
+
+class BlockingControllerAdapter(AsyncHunterController):
+    """Adapts a blocking HunterController (e.g. the interactive terminal one) to the async protocol by running its
+    decisions in a worker thread."""
+    def __init__(self, hunter: Hunter, controller: Optional[HunterController] = None):
+        super().__init__(hunter)
+        self._controller = controller if controller is not None else HunterController(hunter)
+
+    async def select_action(self, possible_actions: Sequence[Action]) -> Action:
+        return await asyncio.to_thread(self._controller.select_action, possible_actions)
+
+    async def select_move(self, possible_moves: Sequence[Action], num_moves: int) -> Action:
+        return await asyncio.to_thread(self._controller.select_move, possible_moves, num_moves)
+
+
+class StreamHunterController(AsyncHunterController):
+    """Prompts a remote player over an asyncio stream, using the same text prompts as HunterController."""
+    def __init__(self, hunter: Hunter, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        super().__init__(hunter)
+        self._reader = reader
+        self._writer = writer
+
+    async def select_action(self, possible_actions: Sequence[Action]) -> Action:
+        return await self._action_prompt_async(possible_actions, self._action_prompt_header())
+
+    async def select_move(self, possible_moves: Sequence[Action], num_moves: int) -> Action:
+        return await self._action_prompt_async(possible_moves, self._move_prompt_header(num_moves))
+
+    async def _action_prompt_async(self, action_list: Sequence[Action], initial_prompt: str) -> Action:
+        prompt = format_action_prompt(action_list, initial_prompt).encode()
+        while True:
+            self._writer.write(prompt)
+            await self._writer.drain()
+            line = await self._reader.readline()
+            if not line:
+                raise ConnectionError('Player disconnected.')
+            action = parse_action_selection(line.decode(errors='replace'), len(action_list))
+            if action is not None:
+                return action_list[action]
+            self._writer.write(b'Invalid selection.\n')
+
+
+def format_action_prompt(action_list: Sequence[Action], initial_prompt: str) -> str:
+    """Return the text asking a human to pick one of `action_list`."""
+    prompt_lst = [initial_prompt]
+    for i, possible_action in enumerate(action_list):
+        prompt_lst.append('\t%d: %s.' % (i + 1, possible_action))
+        if possible_action.type == ActionType.MOVE and isinstance(possible_action.arg,
+                                                                  MapSpace) and possible_action.arg.has_exit:
+            prompt_lst.append(' This space has an exit to another tile.')
+        prompt_lst.append('\n')
+    prompt_lst.append('Pick an action: [1-%d] > ' % len(action_list))
+    return ''.join(prompt_lst)
+
+
+def parse_action_selection(selection: str, num_actions: int) -> Optional[int]:
+    """Return the index of the action picked by a human's 1-based `selection`, or None if it isn't valid."""
+    try:
+        action = int(selection) - 1
+    except ValueError:
+        return None
+    return action if 0 <= action < num_actions else None
+
+
+class RandomHunterController(HunterController):
+    """A HunterController that picks uniformly at random from the possible actions instead of prompting a human.
+
+    This is mostly useful for headless simulation, where `rng` can be seeded per game.
+    """
+    def __init__(self, hunter: Hunter, rng: Optional[random.Random] = None):
+        super().__init__(hunter)
+        self._rng = rng if rng is not None else random
+
+    def select_action(self, possible_actions: Sequence[Action]) -> Action:
+        return self._rng.choice(possible_actions)
+
+    def select_move(self, possible_moves: Sequence[Action], num_moves: int) -> Action:
+        return self._rng.choice(possible_moves)
 
 
 class MonsterController(Controller):
-    def select_action(self, possible_actions: List[Action]) -> Action:
+    def __init__(self, monster: Actor, distance_field: Optional[DistanceField] = None,
+                 rng: Optional[random.Random] = None):
+        """
+        Args:
+            monster: The monster Actor being controlled.
+            distance_field: Distances to the hunters, shared between all monsters. Needed for pursuit.
+            rng: Random number generator for picking actions. Defaults to the module-level one.
+        """
+        super().__init__(monster)
+        self._distance_field = distance_field
+        self._rng = rng if rng is not None else random
+
+    def select_action(self, possible_actions: Sequence[Action]) -> Action:
         # Just pick a random move.
-        return random.choice(possible_actions)
+        return self._rng.choice(possible_actions)
+
+    def select_move(self, possible_moves: Sequence[Action], num_moves: int) -> Action:
+        """Pick the move that gets closest to a hunter, or the last possible move (END_MOVE) if none gets closer."""
+        best_move = possible_moves[-1]
+        if self._distance_field is None:
+            return best_move
+        best_distance = self._distance_field.distance(self.actor.position)
+        for possible_move in possible_moves:
+            if possible_move.type != ActionType.MOVE:
+                continue
+            distance = self._distance_field.distance(possible_move.arg)
+            if distance is not None and (best_distance is None or distance < best_distance):
+                best_move = possible_move
+                best_distance = distance
+        return best_move
 
     def new_round(self) -> None:
         # Do nothing. Maybe some boss monsters care about new rounds?
@@ -0,0 +1,199 @@
+"""Tile special effects, indexed by what triggers them.
+
+Effects are registered per tile (by TileDef name) against a Trigger, optionally restricted to one of the tile's spaces.
+TileEffects listens to the Board and keeps, for every trigger, the effects that apply on each space of the placed tiles,
+so firing a trigger is a dict lookup for the space in question rather than a scan over every tile on the board.
+
+Effects are functions of a TileEvent. Effects that change the actor apply the change directly (e.g. healing), and
+effects that modify the triggering action or need a decision (attack speed, cards to draw, teleport destinations) record
+it on the event for the caller to act on.
+"""
+from actor.actor import Actor
+from board import Board, BoardListener, MapSpace, MapTile
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+
+class Trigger(Enum):
+    # An actor moves onto the space.
+    ON_ENTER = 0
+    # A hunter takes the interact action on the space.
+    ON_INTERACT = 1
+    # An enemy on the space attacks.
+    ON_ENEMY_ATTACK = 2
+    # A hunter on the space may use the effect once per turn.
+    ONCE_PER_TURN = 3
+
+
+@dataclass
+class TileEvent:
+    """What a triggered effect gets to look at and modify."""
+    trigger: Trigger
+    actor: Actor
+    space: MapSpace
+    effects: 'TileEffects'
+    # Change to the speed of the attack, for ON_ENEMY_ATTACK.
+    speed: int = 0
+    # Cards the actor should draw.
+    cards_to_draw: int = 0
+    # Spaces the actor may choose to move to.
+    destinations: List[MapSpace] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class TileEffect:
+    tile_name: str
+    trigger: Trigger
+    apply: Callable[[TileEvent], None]
+    # Index into the tile's spaces of the one space the effect applies on, or None for all of them.
+    space_index: Optional[int] = None
+
+
+# TileDef name -> effects of that tile, in the order they were registered.
+EFFECTS: Dict[str, List[TileEffect]] = OrderedDict()
+
+# TileDef name -> index of the space with a lamp. From the `L`s in the tile help diagrams.
+# TODO lamps should probably be part of the TileDef, see the TODO in TileDef.__init__.
+LAMPS: Dict[str, int] = {
+    'central_lamp': 1,
+    'oedon_chapel': 0,
+    'courtyard_lamp': 1,
+    'tomb_of_oedon': 1,
+    'good_chalice': 1,
+    'grand_cathedral': 1,
+    'iosefkas_clinic': 0,
+}
+
+_NO_EFFECTS: Tuple[TileEffect, ...] = ()
+# Iterating over the Enum class itself is comparatively slow.
+_TRIGGERS = tuple(Trigger)
+
+
+def tile_effect(tile_name: str, trigger: Trigger, space_index: Optional[int] = None):
+    """Register the decorated function as an effect of the tiles named `tile_name`."""
+    def register(apply: Callable[[TileEvent], None]) -> Callable[[TileEvent], None]:
+        EFFECTS.setdefault(tile_name, []).append(TileEffect(tile_name, trigger, apply, space_index))
+        return apply
+    return register
+
+
+class TileEffects(BoardListener):
+    """Finds the effects that a trigger sets off on a space of the board, and applies them."""
+    def __init__(self, board: Board, effects: Optional[Dict[str, List[TileEffect]]] = None):
+        """
+        Args:
+            board: The board to follow. TileEffects registers itself as a listener; call close() to unregister.
+            effects: TileDef name -> effects, EFFECTS by default.
+        """
+        self._board = board
+        self._effects = effects if effects is not None else EFFECTS
+        # Trigger -> space -> effects of that trigger on that space. Only spaces with effects are in the dicts.
+        self._space_effects: Dict[Trigger, Dict[MapSpace, Tuple[TileEffect, ...]]] = {
+            trigger: {} for trigger in _TRIGGERS}
+        # Trigger -> placed tiles with at least one effect of that trigger.
+        self._tiles: Dict[Trigger, Dict[MapTile, None]] = {trigger: {} for trigger in _TRIGGERS}
+        # Lamp spaces on the board, in the order their tiles were placed.
+        self._lamps: Dict[MapSpace, None] = {}
+        # (actor, effect) pairs that have been used this turn, for ONCE_PER_TURN effects.
+        self._used: Set[Tuple[Actor, TileEffect]] = set()
+        for tile in board.get_current_tiles():
+            self.tile_added(tile)
+        board.add_listener(self)
+
+    def close(self) -> None:
+        """Stop following changes to the board."""
+        self._board.remove_listener(self)
+
+    def tile_added(self, tile: MapTile) -> None:
+        name = tile.get_tile_def().name
+        spaces = tile.get_spaces()
+        for effect in self._effects.get(name, ()):
+            space_effects = self._space_effects[effect.trigger]
+            targets = spaces if effect.space_index is None else (spaces[effect.space_index],)
+            for space in targets:
+                space_effects[space] = space_effects.get(space, _NO_EFFECTS) + (effect,)
+            self._tiles[effect.trigger][tile] = None
+        if name in LAMPS:
+            self._lamps[spaces[LAMPS[name]]] = None
+
+    def tile_removed(self, tile: MapTile) -> None:
+        spaces = tile.get_spaces()
+        for trigger in _TRIGGERS:
+            tiles = self._tiles[trigger]
+            if tile in tiles:
+                del tiles[tile]
+                space_effects = self._space_effects[trigger]
+                for space in spaces:
+                    space_effects.pop(space, None)
+        for space in spaces:
+            self._lamps.pop(space, None)
+
+    def get_effects(self, trigger: Trigger, space: MapSpace) -> Tuple[TileEffect, ...]:
+        """Return the effects `trigger` sets off on `space`."""
+        return self._space_effects[trigger].get(space, _NO_EFFECTS)
+
+    def get_tiles(self, trigger: Trigger) -> List[MapTile]:
+        """Return the placed tiles with effects for `trigger`."""
+        return list(self._tiles[trigger])
+
+    def get_lamp_spaces(self) -> List[MapSpace]:
+        """Return the spaces with a lamp on the board."""
+        return list(self._lamps)
+
+    def fire(self, trigger: Trigger, actor: Actor, space: MapSpace) -> Optional[TileEvent]:
+        """Apply the effects `trigger` sets off on `space` for `actor`. Return the event the effects were applied to,
+        or None if there weren't any (or, for ONCE_PER_TURN, they've all been used this turn)."""
+        effects = self._space_effects[trigger].get(space)
+        if effects is None:
+            return None
+        if trigger == Trigger.ONCE_PER_TURN:
+            effects = tuple(effect for effect in effects if (actor, effect) not in self._used)
+            if not effects:
+                return None
+            self._used.update((actor, effect) for effect in effects)
+        event = TileEvent(trigger, actor, space, self)
+        for effect in effects:
+            effect.apply(event)
+        return event
+
+    def new_turn(self) -> None:
+        """Make ONCE_PER_TURN effects available again."""
+        self._used.clear()
+
+    def snapshot(self) -> FrozenSet[Tuple[Actor, TileEffect]]:
+        """Return the ONCE_PER_TURN effects used this turn, for restore(). Placed tiles follow the board, so the board's
+        own snapshot covers them."""
+        return frozenset(self._used)
+
+    def restore(self, snapshot: FrozenSet[Tuple[Actor, TileEffect]]) -> None:
+        """Bring back the ONCE_PER_TURN effects used as of `snapshot`."""
+        self._used = set(snapshot)
+
+
+@tile_effect('central_lamp', Trigger.ON_INTERACT, space_index=LAMPS['central_lamp'])
+def _central_lamp(event: TileEvent) -> None:
+    # Interact on Central Lamp space: teleport to any lamp space or inside any fog gate.
+    # TODO fog gates aren't implemented yet.
+    event.destinations.extend(space for space in event.effects.get_lamp_spaces() if space != event.space)
+
+
+@tile_effect('oedon_chapel', Trigger.ON_ENEMY_ATTACK)
+def _oedon_chapel(event: TileEvent) -> None:
+    # Enemy attacks suffer -1 speed while on this tile.
+    event.speed -= 1
+
+
+@tile_effect('grand_cathedral', Trigger.ON_INTERACT)
+def _grand_cathedral(event: TileEvent) -> None:
+    # Interact: Heal 2
+    actor = event.actor
+    actor.set_hp(min(actor.get_hp() + 2, actor.get_max_hp()))
+
+
+@tile_effect('iosefkas_clinic', Trigger.ONCE_PER_TURN)
+def _iosefkas_clinic(event: TileEvent) -> None:
+    # Once per turn: Take one damage and draw one card
+    event.actor.set_hp(event.actor.get_hp() - 1)
+    event.cards_to_draw += 1
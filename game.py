@@ -1,89 +1,287 @@
-from action import Action, ActionType
+from action import ACTIONS, END_MOVE, END_TURN, EXITS, MOVE_START, Action, ActionType
+from actor.actor import Actor
 from actor.hunter import Hunter, HunterGunDef, HunterWeaponDef
-from board import Board, Direction, MapTile, MapSpace
-from controller import HunterController, MonsterController
+from actor.occupancy import Occupancy
+from board import Board, BoardSnapshot, Direction, MapTile, MapSpace
+from cards.deck import DeckSnapshot
+from controller import HunterController, HunterControllerBase, MonsterController
+from dataclasses import dataclass
+from effects import EFFECTS, TileEffect, TileEffects, Trigger
 from enum import Enum
+from pursuit import DistanceField
 import random
+from replay import ReplayWriter
+from rng import RandomStream
 from tiles import BASE, TileDeck
-from typing import List, Optional
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+
+# The actions a player can always choose from.
+_PLAYER_ACTIONS = (MOVE_START, END_TURN)
+
+
+class TurnPhase(Enum):
+    # The current player is choosing an action (see Game.get_player_actions).
+    ACTION = 0
+    # The current player is choosing the next step of a move action (see Game.get_player_moves).
+    MOVE = 1
+
+
+@dataclass(frozen=True)
+class GameSnapshot:
+    """See Game.snapshot()."""
+    board: BoardSnapshot
+    tiles: DeckSnapshot
+    # (position, hp, controller state) for each player and monster.
+    players: Tuple[Tuple[MapSpace, int, Any], ...]
+    monsters: Tuple[Tuple[MapSpace, int, Any], ...]
+    current_round: int
+    player_index: int
+    phase: TurnPhase
+    moves_remaining: int
+    # State of each of the game's random streams, so the game draws the same tiles etc. again after restore().
+    streams: Tuple[Tuple, ...]
+    # Once-per-turn tile effects that have been used this turn, see TileEffects.snapshot().
+    effects_used: FrozenSet[Tuple[Actor, TileEffect]]
 
 
 class Game:
-    def __init__(self, num_players: int):
+    def __init__(self, num_players: int,
+                 controller_factory: Callable[[Hunter], HunterControllerBase] = HunterController,
+                 verbose: bool = True, recorder: Optional[ReplayWriter] = None, rng: Optional[RandomStream] = None):
+        """
+        Args:
+            num_players: Number of hunters in the game.
+            controller_factory: Called with each Hunter to create the controller that makes its decisions. Defaults
+                to the interactive HunterController. Controllers bring their own RNG, if they need one.
+            verbose: Whether to print game events (e.g. new tiles) to stdout.
+            recorder: If given, every action, tile draw and round end is logged to it.
+            rng: Root of the game's random streams. The tile deck, the board and player setup each get their own
+                stream split from it. Defaults to a stream seeded from the module-level RNG, so random.seed() still
+                makes games reproducible.
+        """
         # TODO hunter types will need to be specified
+        if rng is None:
+            rng = RandomStream(random.getrandbits(64))
+        self._rng = rng
+        # Subsystem name -> stream, see reseed().
+        self._streams: Dict[str, RandomStream] = {name: rng.split(name) for name in ('tiles', 'board', 'players')}
         self._num_players = num_players
+        self._verbose = verbose
+        self._recorder = recorder
         self._current_round = 0
+        # Where we are in the current round: whose decision it is, and what kind of decision.
+        self._player_index = 0
+        self._phase = TurnPhase.ACTION
+        self._moves_remaining = 0
+        # MapSpace uid -> (stamp, possible moves), see get_player_moves and get_monster_moves.
+        self._player_move_cache: Dict[int, Tuple[int, Tuple[Action, ...]]] = {}
+        self._monster_move_cache: Dict[int, Tuple[int, Tuple[Action, ...]]] = {}
         self._init_tiles()
         self._init_board()
-        self._init_players()
+        self._init_players(controller_factory)
         self._init_monsters()
+        self._start_round()
 
     def _init_tiles(self):
         # TODO tile deck is campaign-dependent
         all_tiles = dict(BASE)
+        ACTIONS.add_tiles(all_tiles.values())
         del all_tiles['central_lamp']
-        self._tiles = TileDeck(list(all_tiles.values()))
+        self._tiles = TileDeck(list(all_tiles.values()), self._streams['tiles'])
 
     def _init_board(self):
         # TODO starting board is campaign-dependent
-        self._board = Board(MapTile(BASE['central_lamp'], 0))
+        self._board = Board(MapTile(BASE['central_lamp'], 0), self._streams['board'])
+        # Shared by all monsters for pursuit. Only kept up to date while there are monsters, since keeping it up to
+        # date is a large part of the cost of a hunter move.
+        self._distance_field = DistanceField(self._board)
+        # Who is on which space and tile. Every hunter and monster is added to it.
+        self._occupancy = Occupancy(self._board)
+        # Tile special effects, indexed by trigger. Every move fires ON_ENTER effects, so the index is created up front
+        # if some tile has one. Otherwise nothing in the game loop needs it, and get_tile_effects() creates it on first
+        # use.
+        self._effects: Optional[TileEffects] = None
+        if any(effect.trigger == Trigger.ON_ENTER for effects in EFFECTS.values() for effect in effects):
+            self._effects = TileEffects(self._board)
 
-    def _init_players(self):
-        self._players: List[HunterController] = []
+    def _init_players(self, controller_factory: Callable[[Hunter], HunterControllerBase]):
+        self._players: List[HunterControllerBase] = []
         # TODO hunters should have choice of starting space as applicable
         starting_spaces = [space for tile in self._board.get_current_tiles() for space in tile.get_spaces()]
-        starting_space = random.choice(starting_spaces)
+        starting_space = self._streams['players'].choice(starting_spaces)
         for _ in range(self._num_players):
             hunter = Hunter(starting_space, HunterWeaponDef(), HunterGunDef())
-            controller = HunterController(hunter)
+            self._occupancy.add(hunter)
+            controller = controller_factory(hunter)
             self._players.append(controller)
 
     def _init_monsters(self):
         # TODO This should loop through all spaces on the board, find the spawns, and set up monsters accordingly.
         # But monster spawns aren't implemented yet :)
+        # Monsters should be created as MonsterController(monster, self._distance_field) to share pursuit distances,
+        # and added to self._occupancy.
         self._monsters: List[MonsterController] = []
 
     def round(self):
+        """Play until the current round is over, asking the controllers for every decision."""
+        if self.is_game_over():
+            raise ValueError('The game is over; there are no more rounds to play.')
         for player in self._players:
-            player.new_round()
+            if not isinstance(player, HunterController):
+                raise TypeError('Game.round needs HunterControllers, got %s. Play games with async controllers with '
+                                'server.play_async.' % type(player).__name__)
+        current_round = self._current_round
+        while self._current_round == current_round:
+            player = self.get_current_player()
+            if self._phase == TurnPhase.ACTION:
+                player_action = player.select_action(self.get_player_actions(player))
+            else:
+                player_action = player.select_move(self.get_player_moves(player), self._moves_remaining)
+            self.apply_action(player_action)
+
+    def get_current_player(self) -> HunterControllerBase:
+        """Return the player who has to make the next decision."""
+        return self._players[self._player_index]
+
+    def get_current_player_index(self) -> int:
+        """Return the index in get_players() of the player who has to make the next decision."""
+        return self._player_index
+
+    def get_phase(self) -> TurnPhase:
+        """Return the kind of decision the current player has to make next."""
+        return self._phase
+
+    def get_moves_remaining(self) -> int:
+        """Return the number of moves the current player has left, if they're in the middle of a move action."""
+        return self._moves_remaining
 
+    def get_possible_actions(self) -> Sequence[Action]:
+        """Return the choices for the current player's next decision."""
+        player = self.get_current_player()
+        if self._phase == TurnPhase.ACTION:
+            return self.get_player_actions(player)
+        return self.get_player_moves(player)
+
+    def apply_action(self, action: Action) -> None:
+        """Carry out the current player's decision and advance to the next one."""
+        player = self.get_current_player()
+        if self._recorder is not None:
+            self._recorder.record_action(self._player_index, action)
+        if self._phase == TurnPhase.MOVE:
+            destination_space = self.apply_player_move(player, action)
+            if destination_space is not None:
+                self._moves_remaining -= 1
+            if destination_space is None or self._moves_remaining == 0:
+                self._handle_monster_pursuit()
+                self._phase = TurnPhase.ACTION
+                self._prepare_decision()
+        elif action.type == ActionType.MOVE_START:
+            self._phase = TurnPhase.MOVE
+            self._moves_remaining = 2
+        elif action.type == ActionType.END_TURN:
+            self._end_player_turn()
+            self._prepare_decision()
+        else:
+            # TODO: other actions aren't implemented yet.
+            self._prepare_decision()
+
+    def _start_round(self) -> None:
         for player in self._players:
-            while player.has_action():
+            player.new_round()
+        if self._monsters:
+            self._distance_field.reset(player.actor.position for player in self._players)
+        self._player_index = 0
+        self._phase = TurnPhase.ACTION
+        self._moves_remaining = 0
+        self._prepare_decision()
+
+    def _prepare_decision(self) -> None:
+        """Move on to the next player that still has actions this round, and have them pay for their next action."""
+        while self._player_index < len(self._players):
+            player = self._players[self._player_index]
+            if player.has_action():
                 # TODO: handle returned stat card and alter player's actions
                 player.discard_stat_card()
-                possible_actions = self.get_player_actions(player)
-                player_action = player.select_action(possible_actions)
-                if player_action.type == ActionType.MOVE_START:
-                    num_moves_remaining = 2
-                    while num_moves_remaining > 0:
-                        player_move = self.handle_player_move(player, num_moves_remaining)
-                        if not player_move:
-                            break
-                        num_moves_remaining -= 1
-                    # TODO: Handle monster pursuit.
-                elif player_action.type == ActionType.END_TURN:
-                    break
-
-            # Enemy activation
-            for monster in self._monsters:
-                # TODO: Keep track of player moves for monster move.
-                monster.select_action([])
+                return
+            self._end_player_turn()
+        self._end_round()
 
+    def _end_player_turn(self) -> None:
+        # Enemy activation
+        for monster in self._monsters:
+            # TODO: Keep track of player moves for monster move.
+            monster.select_action([])
+        if self._effects is not None:
+            self._effects.new_turn()
+        self._player_index += 1
+        self._phase = TurnPhase.ACTION
+
+    def _end_round(self) -> None:
         # End of round stuff goes here, e.g. increment hunt track
+        if self._recorder is not None:
+            self._recorder.record_round_end(self._current_round)
         self._current_round += 1
+        if not self.is_game_over():
+            self._start_round()
+
+    def snapshot(self) -> GameSnapshot:
+        """Return a token that restore() can use to bring the game back to its current position.
+
+        Snapshots share structure with the live game: the board and tile deck snapshots are O(1) and only the small
+        per-actor and per-controller state is copied, so branching a position is cheap.
+        """
+        return GameSnapshot(
+            board=self._board.snapshot(),
+            tiles=self._tiles.snapshot(),
+            players=tuple((player.actor.position, player.actor.get_hp(), player.snapshot())
+                          for player in self._players),
+            monsters=tuple((monster.actor.position, monster.actor.get_hp(), monster.snapshot())
+                           for monster in self._monsters),
+            current_round=self._current_round,
+            player_index=self._player_index,
+            phase=self._phase,
+            moves_remaining=self._moves_remaining,
+            streams=tuple(stream.getstate() for stream in self._streams.values()),
+            effects_used=self._effects.snapshot() if self._effects is not None else frozenset())
+
+    def restore(self, snapshot: GameSnapshot) -> None:
+        """Bring the game back to the position it was in when `snapshot` was taken.
+
+        The cost is proportional to what changed since then (e.g. the number of tiles placed), apart from the pursuit
+        distances which are recomputed for the restored hunter positions if there are monsters.
+        """
+        self._board.restore(snapshot.board)
+        self._tiles.restore(snapshot.tiles)
+        for controller, (position, hp, state) in zip(self._players + self._monsters,
+                                                     snapshot.players + snapshot.monsters):
+            controller.actor.move(position)
+            controller.actor.set_hp(hp)
+            controller.restore(state)
+        self._current_round = snapshot.current_round
+        self._player_index = snapshot.player_index
+        self._phase = snapshot.phase
+        self._moves_remaining = snapshot.moves_remaining
+        for stream, state in zip(self._streams.values(), snapshot.streams):
+            stream.setstate(state)
+        if self._effects is not None:
+            self._effects.restore(snapshot.effects_used)
+        if self._monsters:
+            self._distance_field.reset(player.actor.position for player in self._players)
 
-    def get_player_actions(self, player: HunterController) -> List[Action]:
-        possible_actions = []
-        possible_actions.append(Action(type=ActionType.MOVE_START))
+    def get_player_actions(self, player: HunterControllerBase) -> Sequence[Action]:
         # TODO get possible attack targets, dream action, etc.
-        possible_actions.append(Action(type=ActionType.END_TURN))
-        return possible_actions
+        return _PLAYER_ACTIONS
 
     def handle_player_move(self, player: HunterController, num_moves_remaining: int) -> Optional[MapSpace]:
         """Get the list of possible moves, ask the player controller for a selection, and move the player
         actor. Return the space the player moved to, or None if the player ended the move early."""
-        possible_moves = self.get_player_moves(player)
-        player_move = player.select_move(possible_moves, num_moves_remaining)
+        player_move = player.select_move(self.get_player_moves(player), num_moves_remaining)
+        return self.apply_player_move(player, player_move)
+
+    def apply_player_move(self, player: HunterControllerBase, player_move: Action) -> Optional[MapSpace]:
+        """Move the player actor according to `player_move`, one of the actions from get_player_moves.
+        Return the space the player moved to, or None if the player ended the move early."""
         if player_move.type == ActionType.MOVE:
             destination_space = player_move.arg
         elif player_move.type == ActionType.EXIT:
@@ -96,33 +294,136 @@ class Game:
             return None
         else:
             raise ValueError('Unexpected ActionType %s for player move.' % player_move.type)
+        previous_space = player.actor.position
         player.actor.move(destination_space)
+        if self._monsters:
+            self._distance_field.hunter_moved(previous_space, destination_space)
+        if self._effects is not None:
+            self._effects.fire(Trigger.ON_ENTER, player.actor, destination_space)
         return destination_space
 
-    def get_player_moves(self, player: HunterController) -> List[Action]:
-        possible_moves = []
-        current_position = player.actor.position
-        current_tile = self._board.get_tile(current_position)
-        valid_moves = self._board.get_valid_moves(current_position)
-        for move in valid_moves:
-            possible_moves.append(Action(type=ActionType.MOVE, arg=move))
-        if current_position.has_exit and self._tiles.num_remaining() > 0:
-            all_exits = self._board.get_tile(current_position).get_space_exits(current_position)
-            for exit_direction in all_exits:
-                # Only add exits to unknown tiles here. Exits to known tiles are handled in get_space_exits
-                # above.
-                if not self._board.get_tile_in_direction(current_tile, exit_direction):
-                    possible_moves.append(Action(type=ActionType.EXIT, arg=exit_direction))
-        possible_moves.append(Action(type=ActionType.END_MOVE))
+    def get_monster_moves(self, monster: MonsterController) -> Sequence[Action]:
+        """Return the possible moves for `monster`. The result is cached and shared, so it must not be modified."""
+        current_position = monster.actor.position
+        board_version = self._board.get_version()
+        cached = self._monster_move_cache.get(current_position.uid)
+        if cached is not None and cached[0] == board_version:
+            return cached[1]
+        possible_moves = tuple(ACTIONS.move(move) for move in self._board.get_valid_moves(current_position))
+        possible_moves += (END_MOVE,)
+        self._monster_move_cache[current_position.uid] = (board_version, possible_moves)
         return possible_moves
 
+    def _handle_monster_pursuit(self) -> None:
+        """Let every monster take a step toward the nearest hunter."""
+        # TODO: Pursuit rules are more nuanced than this (e.g. which monsters pursue depends on where the hunter moved
+        # from), but the distance field is the expensive part and is shared by every monster either way.
+        for monster in self._monsters:
+            monster_move = monster.select_move(self.get_monster_moves(monster), 1)
+            if monster_move.type == ActionType.MOVE:
+                monster.actor.move(monster_move.arg)
+                if self._effects is not None:
+                    self._effects.fire(Trigger.ON_ENTER, monster.actor, monster_move.arg)
+
+    def get_player_moves(self, player: HunterControllerBase) -> Sequence[Action]:
+        """Return the possible moves for `player`. The result is cached and shared, so it must not be modified."""
+        current_position = player.actor.position
+        # The moves from a space only change when the board changes or the tile deck runs out.
+        has_tiles = self._tiles.num_remaining() > 0
+        cache_stamp = (self._board.get_version() << 1) | has_tiles
+        cached = self._player_move_cache.get(current_position.uid)
+        if cached is not None and cached[0] == cache_stamp:
+            return cached[1]
+
+        possible_moves = [ACTIONS.move(move) for move in self._board.get_valid_moves(current_position)]
+        if current_position.has_exit and has_tiles:
+            current_tile = self._board.get_tile(current_position)
+            # Only add exits to unknown tiles here. Exits to known tiles are handled in get_valid_moves above.
+            open_exits = self._board.get_open_exit_mask(current_tile)
+            for exit_direction in current_tile.get_space_exits(current_position):
+                if open_exits & (1 << exit_direction.value):
+                    possible_moves.append(EXITS[exit_direction.value])
+        possible_moves.append(END_MOVE)
+        cached_moves = tuple(possible_moves)
+        self._player_move_cache[current_position.uid] = (cache_stamp, cached_moves)
+        return cached_moves
+
     def _add_new_tile_for_move(self, existing_tile: MapTile, direction: Direction) -> MapTile:
-        new_tile_def = self._tiles.draw()
-        new_tile = self._board.add_tile(existing_tile, direction, new_tile_def)
-        print('Added new tile %s.' % new_tile)
-        # TODO need to handle case where adding this tile would lead to no open exits on board (redraw tile)
+        # Don't let the new tile close off the board, unless every remaining tile would.
+        drawn = self._tiles.draw_with_exit_masks(
+            self._board.get_placement_masks(existing_tile, direction, keep_frontier_open=True))
+        if drawn is None:
+            drawn = self._tiles.draw_with_exit_masks(self._board.get_placement_masks(existing_tile, direction))
+        new_tile_def, rotation = drawn
+        new_tile = self._board.add_tile(existing_tile, direction, new_tile_def, rotation)
+        if self._monsters:
+            self._distance_field.tile_added(new_tile)
+        if self._recorder is not None:
+            self._recorder.record_tile(new_tile)
+        if self._verbose:
+            print('Added new tile %s.' % new_tile)
         return new_tile
 
+    def get_board(self) -> Board:
+        return self._board
+
+    def get_players(self) -> List[HunterControllerBase]:
+        return self._players
+
+    def get_monsters(self) -> List[MonsterController]:
+        return self._monsters
+
+    def get_occupancy(self) -> Occupancy:
+        """Return the index of which actors are on which spaces and tiles."""
+        return self._occupancy
+
+    def get_tile_effects(self) -> TileEffects:
+        """Return the index of the special effects of the tiles on the board."""
+        if self._effects is None:
+            self._effects = TileEffects(self._board)
+        return self._effects
+
+    def get_tile_deck(self) -> TileDeck:
+        return self._tiles
+
+    def is_verbose(self) -> bool:
+        return self._verbose
+
+    def set_verbose(self, verbose: bool) -> None:
+        """Turn printing of game events on or off."""
+        self._verbose = verbose
+
+    def get_recorder(self) -> Optional[ReplayWriter]:
+        return self._recorder
+
+    def set_recorder(self, recorder: Optional[ReplayWriter]) -> None:
+        """Start logging to `recorder`, or stop logging if it's None."""
+        self._recorder = recorder
+
+    def get_rng(self) -> RandomStream:
+        """Return the root of the game's random streams."""
+        return self._rng
+
+    def reseed(self, seed: int) -> None:
+        """Restart all of the game's random streams from `seed`, as if the game had been created with
+        RandomStream(seed). The game's position doesn't change, only its future random events."""
+        self._rng.seed(seed)
+        for name, stream in self._streams.items():
+            # The board and tile deck hold on to their streams, so restart them in place.
+            stream.setstate(self._rng.split(name).getstate())
+
+    def __getstate__(self):
+        # The recorder's file can't be pickled, and a copy of the game shouldn't write to the same log anyway.
+        state = self.__dict__.copy()
+        state['_recorder'] = None
+        # The move caches are keyed by MapSpace uid, which can differ in the unpickling process.
+        state['_player_move_cache'] = {}
+        state['_monster_move_cache'] = {}
+        return state
+
+    def get_current_round(self) -> int:
+        return self._current_round
+
     def is_game_over(self) -> bool:
         # TODO this is completely arbitrary
         return self._current_round > 4
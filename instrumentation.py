@@ -0,0 +1,205 @@
+"""Opt-in call counters and timing histograms for the game loop.
+
+Nothing is measured until enable() is called: it replaces the instrumented methods with timing wrappers, and
+disable() puts the originals back, so instrumentation costs nothing while it's off.
+
+Timings are recorded into the current Stats (one per process, so one per simulation worker). take() returns the
+current Stats and starts a new one, so calling it after every game gives per-game stats, and calling it at the end of a
+batch gives per-worker stats. Stats can be merged and formatted in the Prometheus text exposition format.
+
+Controller classes are found when enable() is called, so controllers defined after that aren't instrumented. Async
+controllers aren't instrumented at all, since timing them would only measure creating the coroutine.
+"""
+import functools
+import inspect
+import time
+from board import Board
+from controller import Controller
+from game import Game
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Durations are bucketed by their bit length in nanoseconds, i.e. bucket i holds durations below 2**i ns.
+_NUM_BUCKETS = 48
+
+# (class, method name, metric name, whether to count the number of items returned)
+_GAME_TARGETS = [
+    (Game, 'round', 'game.round', False),
+    (Game, 'get_player_actions', 'game.get_player_actions', True),
+    (Game, 'get_player_moves', 'game.get_player_moves', True),
+    (Game, 'apply_player_move', 'game.apply_player_move', False),
+    (Game, '_add_new_tile_for_move', 'game.add_new_tile_for_move', False),
+    (Board, 'add_tile', 'board.add_tile', False),
+]
+_CONTROLLER_METHODS = ('select_action', 'select_move')
+
+
+class Timing:
+    """Count, total and log2 histogram of the durations of one instrumented function."""
+    __slots__ = ('count', 'total_ns', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.buckets = [0] * _NUM_BUCKETS
+
+    def observe(self, duration_ns: int) -> None:
+        self.count += 1
+        self.total_ns += duration_ns
+        self.buckets[min(duration_ns.bit_length(), _NUM_BUCKETS - 1)] += 1
+
+    def merge(self, other: 'Timing') -> None:
+        self.count += other.count
+        self.total_ns += other.total_ns
+        for i, bucket_count in enumerate(other.buckets):
+            self.buckets[i] += bucket_count
+
+    def mean_seconds(self) -> float:
+        return self.total_ns / self.count / 1e9 if self.count else 0.0
+
+
+class Stats:
+    """Timings and event counters, keyed by name."""
+    def __init__(self):
+        self.timings: Dict[str, Timing] = {}
+        self.counters: Dict[str, int] = {}
+
+    def timing(self, name: str) -> Timing:
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = Timing()
+        return timing
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def merge(self, other: 'Stats') -> None:
+        for name, timing in other.timings.items():
+            self.timing(name).merge(timing)
+        for name, amount in other.counters.items():
+            self.count(name, amount)
+
+    def to_prometheus(self, labels: Optional[Dict[str, str]] = None, prefix: str = 'bloodborne') -> str:
+        return format_prometheus([(labels or {}, self)], prefix)
+
+    def __str__(self):
+        lines = ['%-32s %10d calls %12.3f us/call %10.3f s total' %
+                 (name, timing.count, timing.mean_seconds() * 1e6, timing.total_ns / 1e9)
+                 for name, timing in sorted(self.timings.items())]
+        lines.extend('%-32s %10d' % (name, amount) for name, amount in sorted(self.counters.items()))
+        return '\n'.join(lines)
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    escaped = ('%s="%s"' % (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+               for key, value in labels.items())
+    return '{%s}' % ','.join(escaped)
+
+
+def format_prometheus(labeled_stats: Iterable[Tuple[Dict[str, str], Stats]], prefix: str = 'bloodborne') -> str:
+    """Format several Stats (e.g. one per worker, each with a worker label) as one Prometheus text exposition."""
+    labeled_stats = list(labeled_stats)
+    seconds_name = '%s_call_seconds' % prefix
+    events_name = '%s_events_total' % prefix
+    lines = ['# HELP %s Time spent in instrumented game functions.' % seconds_name,
+             '# TYPE %s histogram' % seconds_name]
+    for labels, stats in labeled_stats:
+        for name, timing in sorted(stats.timings.items()):
+            series_labels = dict(labels, function=name)
+            # Only write the range of buckets that have been used; the ones outside it are 0 or equal to the count.
+            used = [i for i, bucket_count in enumerate(timing.buckets) if bucket_count] or [0]
+            cumulative = 0
+            for i in range(used[0], used[-1] + 1):
+                cumulative += timing.buckets[i]
+                bucket_labels = dict(series_labels, le='%.9g' % (2 ** i / 1e9))
+                lines.append('%s_bucket%s %d' % (seconds_name, _format_labels(bucket_labels), cumulative))
+            bucket_labels = dict(series_labels, le='+Inf')
+            lines.append('%s_bucket%s %d' % (seconds_name, _format_labels(bucket_labels), timing.count))
+            lines.append('%s_sum%s %.9f' % (seconds_name, _format_labels(series_labels), timing.total_ns / 1e9))
+            lines.append('%s_count%s %d' % (seconds_name, _format_labels(series_labels), timing.count))
+    lines.extend(['# HELP %s Counts of game loop events.' % events_name, '# TYPE %s counter' % events_name])
+    for labels, stats in labeled_stats:
+        for name, amount in sorted(stats.counters.items()):
+            lines.append('%s%s %d' % (events_name, _format_labels(dict(labels, event=name)), amount))
+    return '\n'.join(lines) + '\n'
+
+
+_stats = Stats()
+# (owner class, attribute name, original function) for every method that's currently wrapped.
+_patched: List[Tuple[type, str, Callable]] = []
+
+
+def _wrap(function: Callable, name: str, count_results: bool, active: List[bool]) -> Callable:
+    """Wrap `function` to record its timings under `name`. `active` is shared by all wrappers for the same name:
+    subclass methods often call the base class method they override, and only the outermost call should be timed."""
+    perf_counter_ns = time.perf_counter_ns
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if active[0]:
+            return function(*args, **kwargs)
+        active[0] = True
+        start = perf_counter_ns()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            _stats.timing(name).observe(perf_counter_ns() - start)
+            active[0] = False
+        if count_results:
+            _stats.count(name + '.results', len(result))
+        return result
+    return wrapper
+
+
+def _controller_classes() -> List[type]:
+    classes = []
+    pending = [Controller]
+    while pending:
+        cls = pending.pop()
+        classes.append(cls)
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+def _targets() -> Sequence[Tuple[type, str, str, bool]]:
+    targets = list(_GAME_TARGETS)
+    for cls in _controller_classes():
+        for method_name in _CONTROLLER_METHODS:
+            function = cls.__dict__.get(method_name)
+            if function is not None and not inspect.iscoroutinefunction(function):
+                targets.append((cls, method_name, 'controller.' + method_name, False))
+    return targets
+
+
+def enable() -> None:
+    """Start instrumenting. Does nothing if instrumentation is already on."""
+    if _patched:
+        return
+    active: Dict[str, List[bool]] = {}
+    for cls, attribute, name, count_results in _targets():
+        function = cls.__dict__[attribute]
+        setattr(cls, attribute, _wrap(function, name, count_results, active.setdefault(name, [False])))
+        _patched.append((cls, attribute, function))
+
+
+def disable() -> None:
+    """Stop instrumenting and restore the original methods. The current Stats are kept."""
+    while _patched:
+        cls, attribute, function = _patched.pop()
+        setattr(cls, attribute, function)
+
+
+def is_enabled() -> bool:
+    return bool(_patched)
+
+
+def get_stats() -> Stats:
+    """Return the Stats that are currently being recorded into."""
+    return _stats
+
+
+def take() -> Stats:
+    """Return the current Stats and start recording into a new, empty one."""
+    global _stats
+    stats = _stats
+    _stats = Stats()
+    return stats
@@ -0,0 +1,265 @@
+"""Exact enumeration of the board layouts that random tile placement can produce.
+
+This answers questions like "how often does the central lamp get walled in by dead ends" exactly, for a given tile deck
+composition. The placement process is modelled as:
+
+1. An open exit (a tile exit facing an empty cell) is chosen uniformly at random.
+2. A tile is drawn uniformly at random from the remaining tiles.
+3. The tile is rotated the way Board.add_tile does it: one of its exits is chosen uniformly at random to connect to the
+   open exit.
+
+With keep_frontier_open (the default), placements follow Game's rule instead: rotations that would leave the board
+without any open exits (see Board.would_close_frontier) aren't allowed, and the tile is drawn uniformly from the
+remaining tiles that have an allowed rotation, unless every remaining tile would close the board.
+
+The process ends when there are no open exits left (the board is closed), when the deck runs out, or after max_tiles
+placements.
+
+Only the exits of each tile affect which layouts are possible, so tiles are reduced to their exit masks, and a board
+to the exit mask of every occupied cell. States are canonicalized under rotation, reflection and translation of the
+whole board, and memoized on (canonical layout, remaining tiles). Every tile shape (dead end, straight, corner, T,
+cross) is symmetric under reflection up to rotation, so the remaining tiles are simply counted per shape.
+"""
+import argparse
+import math
+from board import MapTile, TileDef
+from dataclasses import dataclass, field
+from fractions import Fraction
+from tiles import BASE
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+CLOSED = 'closed'
+EXHAUSTED = 'exhausted'
+DEPTH_LIMIT = 'depth_limit'
+
+# (x, y) offsets for Direction(d), matching board.move.
+_DELTAS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+Cell = Tuple[int, int]
+# Sorted ((x, y, exit mask), ...) of every tile on the board.
+Layout = Tuple[Tuple[int, int, int], ...]
+# (how the process ended, number of tiles placed)
+Outcome = Tuple[str, int]
+
+
+def rotate_mask(mask: int, rotation: int) -> int:
+    """Rotate a 4-bit exit mask clockwise by `rotation` quarter turns."""
+    rotation %= 4
+    return ((mask << rotation) | (mask >> (4 - rotation))) & 0b1111
+
+
+def reflect_mask(mask: int) -> int:
+    """Mirror a 4-bit exit mask left to right, i.e. swap the LEFT and RIGHT bits."""
+    return (mask & 0b0101) | ((mask & 0b0010) << 2) | ((mask & 0b1000) >> 2)
+
+
+def shape_of(mask: int) -> int:
+    """Return the canonical exit mask for a tile shape: the smallest of the mask's rotations."""
+    return min(rotate_mask(mask, rotation) for rotation in range(4))
+
+
+# Exit mask -> directions (as ints) of its exits.
+_EXITS = tuple(tuple(d for d in range(4) if mask & (1 << d)) for mask in range(16))
+
+
+def _make_symmetries() -> List[Tuple[int, int, int, int, Tuple[int, ...]]]:
+    """Return the 8 symmetries of the square as (a, b, c, d, mask table): (x, y) -> (a*x + b*y, c*x + d*y), and
+    mask -> mask table[mask]."""
+    symmetries = []
+    for reflect in (False, True):
+        # Reflecting first: x -> -x.
+        a, b, c, d = (-1, 0, 0, 1) if reflect else (1, 0, 0, 1)
+        for rotation in range(4):
+            masks = tuple(rotate_mask(reflect_mask(mask) if reflect else mask, rotation) for mask in range(16))
+            symmetries.append((a, b, c, d, masks))
+            # A clockwise quarter turn takes UP (0, 1) to RIGHT (1, 0): (x, y) -> (y, -x).
+            a, b, c, d = c, d, -a, -b
+    return symmetries
+
+
+_SYMMETRIES = _make_symmetries()
+
+
+def _open_exits(cells: Dict[Cell, int]) -> List[Tuple[int, int, int]]:
+    """Return (x, y, direction) for every exit that faces an empty cell."""
+    return [(x, y, d) for (x, y), mask in cells.items() for d in _EXITS[mask]
+            if (x + _DELTAS[d][0], y + _DELTAS[d][1]) not in cells]
+
+
+def canonical_layout(cells: Dict[Cell, int]) -> Layout:
+    """Return the same key for every rotation, reflection and translation of a layout."""
+    items = list(cells.items())
+    best: Optional[Layout] = None
+    for a, b, c, d, masks in _SYMMETRIES:
+        transformed = [(a * x + b * y, c * x + d * y, masks[mask]) for (x, y), mask in items]
+        min_x = min(t[0] for t in transformed)
+        min_y = min(t[1] for t in transformed)
+        layout = tuple(sorted([(x - min_x, y - min_y, mask) for x, y, mask in transformed]))
+        if best is None or layout < best:
+            best = layout
+    return best
+
+
+@dataclass
+class LayoutDistribution:
+    """Exact probabilities of how the placement process ends."""
+    outcomes: Dict[Outcome, Fraction] = field(default_factory=dict)
+    # Number of distinct (canonical layout, remaining tiles) states visited.
+    num_states: int = 0
+
+    def probability(self, kind: str) -> Fraction:
+        """Return the probability that the process ended with `kind` (CLOSED, EXHAUSTED or DEPTH_LIMIT)."""
+        return sum((p for (outcome_kind, _), p in self.outcomes.items() if outcome_kind == kind), Fraction(0))
+
+    def __str__(self):
+        lines = ['%-12s %3d tiles: %.6f' % (kind, num_tiles, float(p))
+                 for (kind, num_tiles), p in sorted(self.outcomes.items())]
+        lines.append('States: %d' % self.num_states)
+        return '\n'.join(lines)
+
+
+class _Enumerator:
+    def __init__(self, shapes: Sequence[int], max_tiles: Optional[int], keep_frontier_open: bool):
+        self._shapes = shapes
+        self._max_tiles = max_tiles
+        self._keep_frontier_open = keep_frontier_open
+        # (canonical layout, remaining counts) -> {outcome: probability}
+        self._memo: Dict[Tuple[Layout, Tuple[int, ...]], Dict[Outcome, Fraction]] = {}
+
+    def outcomes(self, cells: Dict[Cell, int], remaining: Tuple[int, ...], num_placed: int,
+                 key: Optional[Tuple[Layout, Tuple[int, ...]]] = None) -> Dict[Outcome, Fraction]:
+        if key is None:
+            key = (canonical_layout(cells), remaining)
+        result = self._memo.get(key)
+        if result is None:
+            result = self._memo[key] = self._expand(cells, remaining, num_placed)
+        return result
+
+    def num_states(self) -> int:
+        return len(self._memo)
+
+    def _end(self, num_open_exits: int, num_remaining: int, num_placed: int) -> Optional[Outcome]:
+        """Return how the process ends in this state, or None if it goes on."""
+        if not num_open_exits:
+            return CLOSED, num_placed
+        if num_remaining == 0:
+            return EXHAUSTED, num_placed
+        if self._max_tiles is not None and num_placed >= self._max_tiles:
+            return DEPTH_LIMIT, num_placed
+        return None
+
+    def _expand(self, cells: Dict[Cell, int], remaining: Tuple[int, ...], num_placed: int) -> Dict[Outcome, Fraction]:
+        open_exits = _open_exits(cells)
+        num_remaining = sum(remaining)
+        end = self._end(len(open_exits), num_remaining, num_placed)
+        if end is not None:
+            return {end: Fraction(1)}
+        # If the next placement is the last one, the children's outcomes can be read off directly without memoizing.
+        last_placement = self._max_tiles is not None and num_placed + 1 >= self._max_tiles
+        # Cell -> number of open exits facing it.
+        targets: Dict[Cell, int] = {}
+        for x, y, direction in open_exits:
+            target = (x + _DELTAS[direction][0], y + _DELTAS[direction][1])
+            targets[target] = targets.get(target, 0) + 1
+        # Cell -> mask of the directions in which it has empty neighbors. A new tile's exits that way are open.
+        empty_masks = {(tx, ty): sum(1 << d for d, (dx, dy) in enumerate(_DELTAS) if (tx + dx, ty + dy) not in cells)
+                       for tx, ty in targets}
+
+        # For every open exit: the target cell, (shape index, exit masks of the allowed rotations) for the shapes that
+        # can be placed there, and the number of remaining tiles of those shapes.
+        placements = []
+        for x, y, direction in open_exits:
+            target = (x + _DELTAS[direction][0], y + _DELTAS[direction][1])
+            facing = (direction + 2) % 4
+            # Same rotation choices as Board.add_tile.
+            options = [(shape_index, [rotate_mask(self._shapes[shape_index], facing - exit_direction)
+                                      for exit_direction in _EXITS[self._shapes[shape_index]]])
+                       for shape_index, count in enumerate(remaining) if count]
+            # The frontier can only close if the target is facing every open exit.
+            if self._keep_frontier_open and targets[target] == len(open_exits):
+                empty_mask = empty_masks[target]
+                open_options = [(shape_index, [mask for mask in masks if mask & empty_mask])
+                                for shape_index, masks in options]
+                open_options = [option for option in open_options if option[1]]
+                if open_options:
+                    options = open_options
+            placements.append((target, options, sum(remaining[shape_index] for shape_index, _ in options)))
+
+        # Many placements lead to equivalent states, so add up the probability of reaching each distinct state first.
+        # Weights are integers over a common denominator of len(open_exits) * num_tiles * 12, where num_tiles is a
+        # multiple of the number of tiles that can be placed at every open exit (and 12 is divisible by any number of
+        # rotations a tile can have).
+        num_tiles = math.lcm(*(num_candidates for _, _, num_candidates in placements))
+        children: Dict[Tuple[Layout, Tuple[int, ...]], List] = {}
+        end_weights: Dict[Outcome, int] = {}
+        for target, options, num_candidates in placements:
+            num_other_open_exits = len(open_exits) - targets[target]
+            empty_mask = empty_masks[target]
+            for shape_index, masks in options:
+                count = remaining[shape_index]
+                next_remaining = remaining[:shape_index] + (count - 1,) + remaining[shape_index + 1:]
+                weight = count * (12 // len(masks)) * (num_tiles // num_candidates)
+                for new_mask in masks:
+                    cells[target] = new_mask
+                    if last_placement:
+                        # The exits into the target are now closed, and the new tile's exits into empty cells open.
+                        num_open_exits = num_other_open_exits + len(_EXITS[new_mask & empty_mask])
+                        end = self._end(num_open_exits, num_remaining - 1, num_placed + 1)
+                        end_weights[end] = end_weights.get(end, 0) + weight
+                    else:
+                        key = (canonical_layout(cells), next_remaining)
+                        child = children.get(key)
+                        if child is None:
+                            children[key] = [weight, dict(cells)]
+                        else:
+                            child[0] += weight
+                    del cells[target]
+
+        denominator = len(open_exits) * num_tiles * 12
+        result = {end: Fraction(weight, denominator) for end, weight in end_weights.items()}
+        for key, (weight, child_cells) in children.items():
+            p_child = Fraction(weight, denominator)
+            for outcome, p in self.outcomes(child_cells, key[1], num_placed + 1, key).items():
+                result[outcome] = result.get(outcome, Fraction(0)) + p_child * p
+        return result
+
+
+def enumerate_layouts(tile_defs: Iterable[TileDef], start_tile: MapTile, max_tiles: Optional[int] = None,
+                      keep_frontier_open: bool = True) -> LayoutDistribution:
+    """Return the exact distribution of outcomes of randomly placing `tile_defs` around `start_tile`.
+
+    Args:
+        tile_defs: The composition of the tile deck. Order doesn't matter.
+        start_tile: The tile the board starts with.
+        max_tiles: Stop after this many placements. The search is exponential in the number of tiles placed, so this
+            is needed for full size decks.
+        keep_frontier_open: Don't let a placement close the board unless every remaining tile would, like Game does.
+    """
+    shape_counts: Dict[int, int] = {}
+    for tile_def in tile_defs:
+        shape = shape_of(tile_def.get_exit_mask())
+        if not shape:
+            raise ValueError('Tile %s has no exits, so it can never be placed.' % tile_def.name)
+        shape_counts[shape] = shape_counts.get(shape, 0) + 1
+    shapes = sorted(shape_counts)
+    enumerator = _Enumerator(shapes, max_tiles, keep_frontier_open)
+    outcomes = enumerator.outcomes({(0, 0): start_tile.get_exit_mask()}, tuple(shape_counts[s] for s in shapes), 0)
+    return LayoutDistribution(dict(outcomes), enumerator.num_states())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Enumerate the tile layouts of the base game deck exactly.')
+    parser.add_argument('--max-tiles', type=int, default=4, help='Stop after this many tiles have been placed.')
+    parser.add_argument('--allow-closing', action='store_true',
+                        help="Let any placement close the board, instead of following the game's rule.")
+    args = parser.parse_args(argv)
+
+    tile_defs = [tile_def for name, tile_def in BASE.items() if name != 'central_lamp']
+    distribution = enumerate_layouts(tile_defs, MapTile(BASE['central_lamp'], 0), args.max_tiles,
+                                     keep_frontier_open=not args.allow_closing)
+    print(distribution)
+    print('P(closed) = %s' % distribution.probability(CLOSED))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+"""Monte Carlo tree search controller for automated playtesting.
+
+The tree alternates decision nodes (one per game position where some player picks from Game.get_possible_actions())
+and action edges. Actions with random results, i.e. exits that reveal an unknown tile, act as chance nodes: their
+edges keep one child per observed outcome (which tile was drawn and how it was rotated). The unknown order of the tile
+deck is re-sampled at the start of every iteration, so the search never peeks at the real next tile.
+
+Search runs on the real Game object using Game.snapshot()/restore(). Iterations reseed the game's random streams, and
+the snapshot brings them back afterwards, so searching doesn't change the game's future random events. With
+workers > 0, extra independent searches are run in a process pool on copies of the game while this process searches
+its own tree, and the root statistics are merged before choosing (root parallelization).
+"""
+import math
+import multiprocessing
+import pickle
+import random
+import time
+from action import Action
+from actor.hunter import Hunter
+from controller import HunterController
+from game import Game
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+RewardFunction = Callable[[Game], float]
+# (visits, total reward) for each root action.
+RootStats = Dict[Hashable, Tuple[int, float]]
+
+
+def tiles_revealed_reward(game: Game) -> float:
+    """Fraction of the tile deck that has been placed on the board. The default MCTS reward."""
+    num_placed = len(game.get_board().get_current_tiles()) - 1
+    num_total = num_placed + game.get_tile_deck().num_remaining()
+    return num_placed / num_total if num_total else 0.0
+
+
+def _action_key(action: Action) -> Hashable:
+    # Actions are immutable and hash by (type, arg), so they can key the tree directly. (Ids aren't used because
+    # interned ids aren't guaranteed to match between processes.)
+    return action
+
+
+def _state_key(game: Game) -> Hashable:
+    """Everything about a game position that decides which actions are possible and what they lead to, so that the tree
+    is only reused for the position it was built for. The order of the tile deck is left out, since every iteration
+    re-samples it anyway."""
+    board = game.get_board()
+    return (game.get_current_round(), game.get_current_player_index(), game.get_phase(), game.get_moves_remaining(),
+            tuple((controller.actor.position, controller.actor.get_hp(), controller.snapshot())
+                  for controller in game.get_players() + game.get_monsters()),
+            tuple((tile.get_tile_def(), tile.get_rotation(), board.get_position(tile))
+                  for tile in board.get_current_tiles()),
+            frozenset(game.get_tile_deck().get_remaining_tiles()))
+
+
+class _Edge:
+    __slots__ = ('action', 'visits', 'total_reward', 'outcomes')
+
+    def __init__(self, action: Action):
+        self.action = action
+        self.visits = 0
+        self.total_reward = 0.0
+        # Outcome of taking the action (None for deterministic actions) -> resulting node.
+        self.outcomes: Dict[Hashable, _Node] = {}
+
+
+class _Node:
+    __slots__ = ('state_key', 'visits', 'edges', 'untried')
+
+    def __init__(self, state_key: Hashable):
+        self.state_key = state_key
+        self.visits = 0
+        self.edges: Dict[Hashable, _Edge] = {}
+        # Actions that don't have an edge yet. None until the node is first visited.
+        self.untried: Optional[List[Action]] = None
+
+
+class _Search:
+    """The parts of MCTS that are shared between the controller and the worker processes."""
+    def __init__(self, exploration: float, reward: RewardFunction, max_rollout_depth: int, rng: random.Random):
+        self._exploration = exploration
+        self._reward = reward
+        self._max_rollout_depth = max_rollout_depth
+        self._rng = rng
+
+    def run(self, game: Game, root: _Node, iterations: Optional[int], deadline: Optional[float]) -> int:
+        """Run search iterations from the game's current position until either budget runs out. The game is left in
+        the position it started in. Return the number of iterations run."""
+        root_snapshot = game.snapshot()
+        # The snapshot covers the game's streams, but not the root they're reseeded from.
+        rng_state = game.get_rng().getstate()
+        num_iterations = 0
+        try:
+            while (iterations is None or num_iterations < iterations) and \
+                    (deadline is None or time.perf_counter() < deadline):
+                self._iterate(game, root, root_snapshot)
+                num_iterations += 1
+        finally:
+            game.restore(root_snapshot)
+            game.get_rng().setstate(rng_state)
+        return num_iterations
+
+    def _iterate(self, game: Game, root: _Node, root_snapshot) -> None:
+        game.restore(root_snapshot)
+        # Determinize the unknown tile order for this iteration. The restore rewound the game's streams too, so they're
+        # reseeded to sample a different order (and different rotations etc.) every iteration.
+        game.reseed(self._rng.getrandbits(64))
+        game.get_tile_deck().shuffle()
+
+        node = root
+        path: List[Tuple[_Node, _Edge]] = []
+        while not game.is_game_over():
+            if node.untried is None:
+                node.untried = list(game.get_possible_actions())
+                self._rng.shuffle(node.untried)
+            expanding = bool(node.untried)
+            if expanding:
+                action = node.untried.pop()
+                edge = _Edge(action)
+                node.edges[_action_key(action)] = edge
+            else:
+                edge = self._select(node)
+            outcome = self._apply(game, edge.action)
+            child = edge.outcomes.get(outcome)
+            if child is None:
+                child = edge.outcomes[outcome] = _Node(_state_key(game))
+            path.append((node, edge))
+            node = child
+            if expanding:
+                break
+
+        reward = self._rollout(game)
+        for node, edge in path:
+            node.visits += 1
+            edge.visits += 1
+            edge.total_reward += reward
+
+    def _select(self, node: _Node) -> _Edge:
+        log_visits = math.log(node.visits)
+        best_edge = None
+        best_score = -math.inf
+        for edge in node.edges.values():
+            score = edge.total_reward / edge.visits + self._exploration * math.sqrt(log_visits / edge.visits)
+            if score > best_score:
+                best_edge = edge
+                best_score = score
+        return best_edge
+
+    @staticmethod
+    def _apply(game: Game, action: Action) -> Hashable:
+        """Apply the action and return its random outcome, or None if it didn't have one."""
+        board = game.get_board()
+        num_tiles = len(board.get_current_tiles())
+        game.apply_action(action)
+        if len(board.get_current_tiles()) == num_tiles:
+            return None
+        new_tile = board.get_newest_tile()
+        return new_tile.get_tile_def().name, new_tile.get_rotation()
+
+    def _rollout(self, game: Game) -> float:
+        for _ in range(self._max_rollout_depth):
+            if game.is_game_over():
+                break
+            game.apply_action(self._rng.choice(game.get_possible_actions()))
+        return self._reward(game)
+
+
+def root_stats(root: _Node) -> RootStats:
+    return {key: (edge.visits, edge.total_reward) for key, edge in root.edges.items()}
+
+
+def _worker_search(task: Tuple[bytes, int, Optional[int], Optional[float], float, RewardFunction, int]) -> RootStats:
+    """Entry point for worker processes: search a private copy of the game and return the root statistics."""
+    pickled_game, seed, iterations, time_limit, exploration, reward, max_rollout_depth = task
+    game: Game = pickle.loads(pickled_game)
+    game.set_verbose(False)
+    search = _Search(exploration, reward, max_rollout_depth, random.Random(seed))
+    root = _Node(_state_key(game))
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+    search.run(game, root, iterations, deadline)
+    return root_stats(root)
+
+
+class MCTSController(HunterController):
+    """A HunterController that picks actions with Monte Carlo tree search.
+
+    The controller needs the Game it's playing in, which isn't available when Game creates its controllers, so call
+    set_game() before the first decision. Call close() when done to shut down the worker pool.
+    """
+    def __init__(self, hunter: Hunter, rollouts: Optional[int] = 500, time_limit: Optional[float] = None,
+                 workers: int = 0, exploration: float = 1.4, reward: RewardFunction = tiles_revealed_reward,
+                 max_rollout_depth: int = 200, reuse_depth: int = 4, rng: Optional[random.Random] = None):
+        """
+        Args:
+            hunter: The hunter being controlled.
+            rollouts: Number of search iterations per decision, split between this process and the workers. None
+                for no limit, in which case time_limit must be set.
+            time_limit: Seconds to search per decision, or None for no limit.
+            workers: Number of extra processes to run root-parallel searches in. 0 searches in this process only.
+            exploration: UCT exploration constant.
+            reward: Scores a finished rollout. Should return values in [0, 1], and must be picklable (i.e. a module
+                level function) if workers > 0.
+            max_rollout_depth: Maximum number of random decisions in a rollout.
+            reuse_depth: How many decisions below the previous root to look for the current position when reusing
+                the tree.
+            rng: Random number generator for the search.
+        """
+        super().__init__(hunter)
+        if rollouts is None and time_limit is None:
+            raise ValueError('At least one of rollouts and time_limit must be set.')
+        self._rollouts = rollouts
+        self._time_limit = time_limit
+        self._workers = workers
+        self._exploration = exploration
+        self._reward = reward
+        self._max_rollout_depth = max_rollout_depth
+        self._reuse_depth = reuse_depth
+        self._rng = rng if rng is not None else random.Random()
+        self._search = _Search(exploration, reward, max_rollout_depth, self._rng)
+        self._game: Optional[Game] = None
+        # The edge chosen at the previous decision. The current position is usually somewhere below it.
+        self._last_edge: Optional[_Edge] = None
+        self._pool = None
+
+    def set_game(self, game: Game) -> None:
+        self._game = game
+        self._last_edge = None
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+
+    def __getstate__(self):
+        # The search tree and pool aren't needed (or picklable) in worker processes.
+        state = self.__dict__.copy()
+        state['_pool'] = None
+        state['_last_edge'] = None
+        return state
+
+    def select_action(self, possible_actions: Sequence[Action]) -> Action:
+        return self._choose(possible_actions)
+
+    def select_move(self, possible_moves: Sequence[Action], num_moves: int) -> Action:
+        return self._choose(possible_moves)
+
+    def _choose(self, possible_actions: Sequence[Action]) -> Action:
+        if len(possible_actions) == 1:
+            return possible_actions[0]
+        game = self._game
+        if game is None:
+            raise ValueError('MCTSController needs set_game() to be called before it can choose actions.')
+
+        root = self._find_reusable_root(_state_key(game))
+        deadline = time.perf_counter() + self._time_limit if self._time_limit is not None else None
+        local_rollouts = self._rollouts
+        pending = None
+        if self._workers > 0:
+            if self._rollouts is not None:
+                local_rollouts = max(1, self._rollouts // (self._workers + 1))
+            if self._pool is None:
+                self._pool = multiprocessing.Pool(self._workers)
+            # Pickle the game now, before the local search starts changing it under the pool's feeder thread.
+            pickled_game = pickle.dumps(game)
+            tasks = [(pickled_game, self._rng.getrandbits(64), local_rollouts, self._time_limit, self._exploration,
+                      self._reward, self._max_rollout_depth) for _ in range(self._workers)]
+            pending = self._pool.map_async(_worker_search, tasks)
+
+        # Searching plays out lots of hypothetical moves, which shouldn't be printed or logged.
+        verbose = game.is_verbose()
+        recorder = game.get_recorder()
+        game.set_verbose(False)
+        game.set_recorder(None)
+        try:
+            self._search.run(game, root, local_rollouts, deadline)
+        finally:
+            game.set_verbose(verbose)
+            game.set_recorder(recorder)
+
+        stats = root_stats(root)
+        if pending is not None:
+            for worker_stats in pending.get():
+                for key, (visits, total_reward) in worker_stats.items():
+                    merged_visits, merged_total = stats.get(key, (0, 0.0))
+                    stats[key] = (merged_visits + visits, merged_total + total_reward)
+
+        best_key = max((_action_key(action) for action in possible_actions),
+                       key=lambda key: (stats.get(key, (0, 0.0))[0], stats.get(key, (0, 0.0))[1]))
+        chosen_action = next(action for action in possible_actions if _action_key(action) == best_key)
+
+        # Keep the chosen subtree around for the next decision.
+        self._last_edge = root.edges.get(best_key)
+        return chosen_action
+
+    def _find_reusable_root(self, state_key: Hashable) -> _Node:
+        """Look for the current position below the previous decision's chosen action, or start a new tree."""
+        if self._last_edge is not None:
+            frontier = list(self._last_edge.outcomes.values())
+            for _ in range(self._reuse_depth):
+                for node in frontier:
+                    if node.state_key == state_key:
+                        return node
+                frontier = [child for node in frontier for edge in node.edges.values()
+                            for child in edge.outcomes.values()]
+        return _Node(state_key)
@@ -0,0 +1,114 @@
+from board import Board, MapSpace, MapTile
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+
+class DistanceField:
+    """Tracks the number of moves from every space on the board to the nearest hunter.
+
+    This is a multi-source BFS over the board's space graph, computed once per round and then shared by every monster
+    that needs to pursue a hunter. Hunter moves and new tiles update the field incrementally instead of redoing the
+    whole search.
+
+    Moves between spaces are assumed to be symmetric (tile adjacency lists are symmetric, and Board only links exits
+    that face each other), so distances from the hunters are also distances to the hunters.
+    """
+    def __init__(self, board: Board):
+        self._board = board
+        # MapSpace -> distance to the nearest hunter. Unreachable spaces are absent.
+        self._distances: Dict[MapSpace, int] = {}
+        # MapSpace -> number of hunters on that space.
+        self._sources: Dict[MapSpace, int] = {}
+
+    def reset(self, hunter_positions: Iterable[MapSpace]) -> None:
+        """Recompute the whole field from scratch for the given hunter positions."""
+        self._distances = {}
+        self._sources = {}
+        for position in hunter_positions:
+            self._sources[position] = self._sources.get(position, 0) + 1
+        for position in self._sources:
+            self._distances[position] = 0
+        self._relax(list(self._sources))
+
+    def distance(self, space: MapSpace) -> Optional[int]:
+        """Return the number of moves from `space` to the nearest hunter, or None if no hunter can be reached."""
+        return self._distances.get(space)
+
+    def next_step(self, space: MapSpace) -> Optional[MapSpace]:
+        """Return a neighboring space that is one move closer to the nearest hunter, or None if there isn't one."""
+        current_distance = self._distances.get(space)
+        if not current_distance:
+            return None
+        for move in self._board.get_valid_moves(space):
+            if self._distances.get(move) == current_distance - 1:
+                return move
+        return None
+
+    def hunter_moved(self, old_position: MapSpace, new_position: MapSpace) -> None:
+        """Update the field after a hunter moved from `old_position` to `new_position`."""
+        if old_position == new_position:
+            return
+        self._add_source(new_position)
+        self._remove_source(old_position)
+
+    def tile_added(self, tile: MapTile) -> None:
+        """Update the field after `tile` was added to the board."""
+        # New connections can only shorten paths, so relaxing outward from the reachable spaces next to the new tile is
+        # enough.
+        seeds = {move for space in tile.get_spaces() for move in self._board.get_valid_moves(space)
+                 if move in self._distances}
+        self._relax(sorted(seeds, key=self._distances.__getitem__))
+
+    def _add_source(self, space: MapSpace) -> None:
+        count = self._sources.get(space, 0)
+        self._sources[space] = count + 1
+        if count == 0:
+            self._distances[space] = 0
+            self._relax([space])
+
+    def _remove_source(self, space: MapSpace) -> None:
+        count = self._sources[space] - 1
+        if count > 0:
+            self._sources[space] = count
+            return
+        del self._sources[space]
+
+        # Find every space whose shortest paths all ran through the removed source. Spaces are visited in increasing
+        # distance order, so by the time a space is checked all of its candidate parents have already been classified.
+        distances = self._distances
+        affected = {space}
+        queue = deque([space])
+        while queue:
+            current = queue.popleft()
+            child_distance = distances[current] + 1
+            for move in self._board.get_valid_moves(current):
+                if move in affected or move in self._sources or distances.get(move) != child_distance:
+                    continue
+                if all(parent in affected or distances.get(parent) != child_distance - 1
+                       for parent in self._board.get_valid_moves(move)):
+                    affected.add(move)
+                    queue.append(move)
+
+        # Re-seed the affected region from its unaffected border and propagate.
+        for current in affected:
+            del distances[current]
+        seeds: List[MapSpace] = []
+        for current in affected:
+            border = [distances[move] for move in self._board.get_valid_moves(current) if move in distances]
+            if border:
+                distances[current] = min(border) + 1
+                seeds.append(current)
+        seeds.sort(key=distances.__getitem__)
+        self._relax(seeds)
+
+    def _relax(self, seeds: List[MapSpace]) -> None:
+        """Propagate distances outward from `seeds`, which should be sorted by increasing distance."""
+        distances = self._distances
+        queue = deque(seeds)
+        while queue:
+            current = queue.popleft()
+            next_distance = distances[current] + 1
+            for move in self._board.get_valid_moves(current):
+                if distances.get(move, next_distance + 1) > next_distance:
+                    distances[move] = next_distance
+                    queue.append(move)
@@ -0,0 +1,152 @@
+"""Bitset reachability over the board's space graph.
+
+Sets of spaces are Python ints, with bit `space.uid` standing for each space, and the neighbors of every space are
+kept as such a mask. Expanding a set of spaces by one move is then an OR over the neighbor masks of its members, and
+"which spaces can be reached within k moves" is k of those steps. Results are cached per starting space until the board
+changes.
+
+Reachability listens to the Board, and only updates the masks of the spaces around a tile that is added or removed.
+Only moves within the known board are considered: exits into unexplored territory don't lead anywhere yet.
+"""
+from board import SPACES, Board, BoardListener, MapSpace, MapTile
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Yield the positions of the set bits in `mask`, lowest first."""
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+
+def mask_of(spaces: Iterable[MapSpace]) -> int:
+    """Return the mask with the bits of `spaces` set."""
+    mask = 0
+    for space in spaces:
+        mask |= 1 << space.uid
+    return mask
+
+
+def spaces_of(mask: int) -> List[MapSpace]:
+    """Return the spaces whose bits are set in `mask`, in uid order."""
+    return [SPACES.get(uid) for uid in iter_bits(mask)]
+
+
+class Reachability(BoardListener):
+    """Answers k-step reachability and route queries for the spaces on a Board."""
+    def __init__(self, board: Board):
+        """
+        Args:
+            board: The board to follow. Reachability registers itself as a listener; call close() to unregister.
+        """
+        self._board = board
+        # MapSpace uid -> mask of the spaces one move away. 0 for spaces that aren't on the board.
+        self._neighbors: List[int] = []
+        # MapSpace uid -> [spaces within 0 moves, within 1 move, ...], extended as far as queries have needed.
+        self._balls: Dict[int, List[int]] = {}
+        for tile in board.get_current_tiles():
+            self.tile_added(tile)
+        board.add_listener(self)
+
+    def close(self) -> None:
+        """Stop following changes to the board."""
+        self._board.remove_listener(self)
+
+    def tile_added(self, tile: MapTile) -> None:
+        neighbors = self._neighbors
+        spaces = tile.get_spaces()
+        max_uid = max(space.uid for space in spaces)
+        if max_uid >= len(neighbors):
+            neighbors.extend([0] * (max_uid + 1 - len(neighbors)))
+        for space in spaces:
+            mask = 0
+            for move in self._board.get_valid_moves(space):
+                mask |= 1 << move.uid
+                # Moves are symmetric, so this also links the spaces on other tiles back to the new one.
+                neighbors[move.uid] |= 1 << space.uid
+            neighbors[space.uid] = mask
+        self._balls.clear()
+
+    def tile_removed(self, tile: MapTile) -> None:
+        neighbors = self._neighbors
+        removed = mask_of(tile.get_spaces())
+        for space in tile.get_spaces():
+            for uid in iter_bits(neighbors[space.uid] & ~removed):
+                neighbors[uid] &= ~removed
+            neighbors[space.uid] = 0
+        self._balls.clear()
+
+    def __getstate__(self):
+        # Masks are indexed by MapSpace uid, which can differ in the unpickling process, so they're pickled as spaces.
+        state = self.__dict__.copy()
+        state['_neighbors'] = [(SPACES.get(uid), spaces_of(mask)) for uid, mask in enumerate(self._neighbors) if mask]
+        state['_balls'] = {}
+        return state
+
+    def __setstate__(self, state):
+        neighbors = state.pop('_neighbors')
+        self.__dict__.update(state)
+        self._neighbors = []
+        for space, moves in neighbors:
+            if space.uid >= len(self._neighbors):
+                self._neighbors.extend([0] * (space.uid + 1 - len(self._neighbors)))
+            self._neighbors[space.uid] = mask_of(moves)
+
+    def neighbors(self, space: MapSpace) -> int:
+        """Return the mask of the spaces one move from `space`."""
+        return self._neighbors[space.uid] if space.uid < len(self._neighbors) else 0
+
+    def step(self, mask: int) -> int:
+        """Return the mask of the spaces one move from any space in `mask`."""
+        neighbors = self._neighbors
+        result = 0
+        while mask:
+            low_bit = mask & -mask
+            result |= neighbors[low_bit.bit_length() - 1]
+            mask ^= low_bit
+        return result
+
+    def within(self, space: MapSpace, num_moves: int) -> int:
+        """Return the mask of the spaces that can be reached from `space` in at most `num_moves` moves, including
+        `space` itself."""
+        balls = self._balls.get(space.uid)
+        if balls is None:
+            # Raises KeyError for spaces that aren't on the board.
+            self._board.get_tile(space)
+            balls = self._balls[space.uid] = [1 << space.uid]
+        while len(balls) <= num_moves:
+            reached = balls[-1]
+            # Only the spaces reached in the last step can lead anywhere new.
+            frontier = reached & ~balls[-2] if len(balls) > 1 else reached
+            expanded = reached | self.step(frontier)
+            if expanded == reached:
+                # Everything reachable has been reached.
+                return reached
+            balls.append(expanded)
+        return balls[num_moves]
+
+    def exactly(self, space: MapSpace, num_moves: int) -> int:
+        """Return the mask of the spaces whose shortest route from `space` is exactly `num_moves` moves."""
+        if num_moves == 0:
+            return self.within(space, 0)
+        return self.within(space, num_moves) & ~self.within(space, num_moves - 1)
+
+    def routes(self, space: MapSpace, num_moves: int) -> List[Tuple[MapSpace, ...]]:
+        """Return every route of at most `num_moves` moves from `space` that doesn't visit a space twice, as the
+        sequence of spaces moved to. The empty route (not moving at all) is included."""
+        neighbors = self._neighbors
+        routes: List[Tuple[int, ...]] = []
+
+        def extend(route: Tuple[int, ...], visited: int, moves_left: int) -> None:
+            routes.append(route)
+            if not moves_left:
+                return
+            current = route[-1] if route else space.uid
+            for uid in iter_bits(neighbors[current] & ~visited):
+                extend(route + (uid,), visited | (1 << uid), moves_left - 1)
+
+        self._board.get_tile(space)
+        extend((), 1 << space.uid, num_moves)
+        get_space = SPACES.get
+        return [tuple(get_space(uid) for uid in route) for route in routes]
@@ -0,0 +1,315 @@
+"""Draws a Board as ASCII art or SVG.
+
+Rendering a tile only depends on its TileDef and rotation, so those fragments are cached. On top of that, the renderer
+keeps each board cell's finished output (the fragment plus any actors standing on it), and only redraws the cells
+that add_tile, tile removal or actor moves touched since the last frame. Assembling a frame is then just joining the
+cached cells.
+
+Usage:
+    python -m render --seed 3
+"""
+import argparse
+import random
+from board import Board, BoardListener, MapSpace, MapTile, Position, TileDef
+from controller import RandomHunterController
+from game import Game
+from spatial import Polygon, point_in_polygon, rotate_local
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+from xml.sax.saxutils import escape
+
+# Fill colours for a tile's spaces, by index.
+_SVG_COLORS = ('#d9cbb0', '#c4b494', '#e6dcc8', '#b8a683', '#cfc1a4', '#a89472')
+
+
+def _local_polygon(space: MapSpace, rotation: int) -> Polygon:
+    return tuple(rotate_local(point, rotation) for point in space.bounds)
+
+
+def _centroid(polygon: Polygon) -> Tuple[float, float]:
+    return sum(u for u, _ in polygon) / len(polygon), sum(v for _, v in polygon) / len(polygon)
+
+
+class BoardRenderer(BoardListener):
+    """Renders a board, redrawing only what changed between frames.
+
+    The renderer listens to the board for new and removed tiles. Actors aren't tracked by the board, so pass their
+    positions to update_actors() before rendering a frame.
+    """
+    def __init__(self, board: Board, cell_width: int = 13, cell_height: int = 7, svg_tile_size: int = 100):
+        """
+        Args:
+            board: The board to draw. Call close() to stop following it.
+            cell_width: Width of a tile in ASCII characters, including its border.
+            cell_height: Height of a tile in ASCII lines, including its border.
+            svg_tile_size: Width and height of a tile in SVG units.
+        """
+        self._board = board
+        self._cell_width = cell_width
+        self._cell_height = cell_height
+        self._svg_tile_size = svg_tile_size
+        # (TileDef, rotation) -> fragment, and (TileDef, rotation) -> {space: (column, row) of its label}.
+        self._ascii_fragments: Dict[Tuple[TileDef, int], List[str]] = {}
+        self._ascii_label_cells: Dict[Tuple[TileDef, int], Dict[MapSpace, Tuple[int, int]]] = {}
+        self._svg_fragments: Dict[Tuple[TileDef, int], str] = {}
+        # Position -> finished output for that board cell.
+        self._ascii_cells: Dict[Position, List[str]] = {}
+        self._svg_cells: Dict[Position, str] = {}
+        # Positions that changed since the last frame, separately for each format.
+        self._ascii_dirty: Set[Position] = set()
+        self._svg_dirty: Set[Position] = set()
+        # MapTile -> Position, so removed tiles can still be found.
+        self._tile_positions: Dict[MapTile, Position] = {}
+        # Actor label -> space, Position -> labels of the actors on that tile, and label -> Position for the actors
+        # that are drawn, so moving an actor doesn't have to search for its old cell.
+        self._actors: Dict[str, MapSpace] = {}
+        self._cell_actors: Dict[Position, Dict[str, MapSpace]] = {}
+        self._actor_cells: Dict[str, Position] = {}
+        for tile in board.get_current_tiles():
+            self.tile_added(tile)
+        board.add_listener(self)
+
+    def close(self) -> None:
+        self._board.remove_listener(self)
+
+    def _mark_dirty(self, position: Position) -> None:
+        self._ascii_dirty.add(position)
+        self._svg_dirty.add(position)
+
+    def tile_added(self, tile: MapTile) -> None:
+        position = self._board.get_position(tile)
+        self._tile_positions[tile] = position
+        self._mark_dirty(position)
+
+    def tile_removed(self, tile: MapTile) -> None:
+        position = self._tile_positions.pop(tile)
+        self._mark_dirty(position)
+        # Actors on the removed tile are forgotten, so update_actors() places them again wherever they are now.
+        for label in self._cell_actors.pop(position, {}):
+            del self._actors[label]
+            del self._actor_cells[label]
+
+    def update_actors(self, actors: Mapping[str, MapSpace]) -> None:
+        """Set where every actor is. Labels are drawn as-is in SVG, and by their first character in ASCII."""
+        for label in list(self._actors):
+            if label not in actors:
+                self._move_actor(label, None)
+        for label, space in actors.items():
+            if self._actors.get(label) != space:
+                self._move_actor(label, space)
+
+    def _space_position(self, space: MapSpace) -> Optional[Position]:
+        try:
+            return self._tile_positions.get(self._board.get_tile(space))
+        except KeyError:
+            return None
+
+    def _move_actor(self, label: str, space: Optional[MapSpace]) -> None:
+        self._actors.pop(label, None)
+        old_position = self._actor_cells.pop(label, None)
+        if old_position is not None:
+            cell_actors = self._cell_actors[old_position]
+            del cell_actors[label]
+            if not cell_actors:
+                del self._cell_actors[old_position]
+            self._mark_dirty(old_position)
+        if space is not None:
+            self._actors[label] = space
+            position = self._space_position(space)
+            if position is not None:
+                self._cell_actors.setdefault(position, {})[label] = space
+                self._actor_cells[label] = position
+                self._mark_dirty(position)
+
+    def _bounds(self) -> Optional[Tuple[int, int, int, int]]:
+        if not self._tile_positions:
+            return None
+        xs = [x for x, _ in self._tile_positions.values()]
+        ys = [y for _, y in self._tile_positions.values()]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def _tile_at(self, position: Position) -> Optional[MapTile]:
+        return self._board.get_tile_at(position)
+
+    # ASCII
+
+    def _ascii_fragment(self, tile: MapTile) -> List[str]:
+        key = (tile.get_tile_def(), tile.get_rotation())
+        fragment = self._ascii_fragments.get(key)
+        if fragment is None:
+            fragment = self._ascii_fragments[key] = self._draw_ascii_fragment(tile)
+        return fragment
+
+    def _draw_ascii_fragment(self, tile: MapTile) -> List[str]:
+        width, height = self._cell_width, self._cell_height
+        spaces = tile.get_spaces()
+        polygons = [_local_polygon(space, tile.get_rotation()) for space in spaces]
+
+        def space_at(column: int, row: int) -> int:
+            u, v = column / (width - 1), row / (height - 1)
+            for i, polygon in enumerate(polygons):
+                if point_in_polygon(polygon, u, v):
+                    return i
+            return -1
+
+        owners = [[space_at(column, row) for column in range(width)] for row in range(height)]
+        chars = [[' '] * width for _ in range(height)]
+        for row in range(1, height - 1):
+            for column in range(1, width - 1):
+                owner = owners[row][column]
+                if column + 1 < width - 1 and owners[row][column + 1] != owner:
+                    chars[row][column] = '|'
+                elif row + 1 < height - 1 and owners[row + 1][column] != owner:
+                    chars[row][column] = '-'
+        # Border, with an E in the middle of each side that has an exit.
+        for column in range(width):
+            chars[0][column] = chars[height - 1][column] = '-'
+        for row in range(height):
+            chars[row][0] = chars[row][width - 1] = '|'
+        for row, column in ((0, 0), (0, width - 1), (height - 1, 0), (height - 1, width - 1)):
+            chars[row][column] = '+'
+        exit_mask = tile.get_exit_mask()
+        for direction, (row, column) in enumerate(((0, width // 2), (height // 2, width - 1),
+                                                   (height - 1, width // 2), (height // 2, 0))):
+            if exit_mask & (1 << direction):
+                chars[row][column] = 'E'
+        # Label each space with a letter at its centre.
+        label_cells = {}
+        for i, (space, polygon) in enumerate(zip(spaces, polygons)):
+            u, v = _centroid(polygon)
+            column = min(max(round(u * (width - 1)), 1), width - 2)
+            row = min(max(round(v * (height - 1)), 1), height - 2)
+            chars[row][column] = chr(ord('a') + i)
+            label_cells[space] = (column, row)
+        self._ascii_label_cells[(tile.get_tile_def(), tile.get_rotation())] = label_cells
+        return [''.join(line) for line in chars]
+
+    def _draw_ascii_cell(self, position: Position) -> Optional[List[str]]:
+        tile = self._tile_at(position)
+        if tile is None:
+            return None
+        fragment = self._ascii_fragment(tile)
+        cell_actors = self._cell_actors.get(position)
+        if not cell_actors:
+            return fragment
+        label_cells = self._ascii_label_cells[(tile.get_tile_def(), tile.get_rotation())]
+        lines = [list(line) for line in fragment]
+        # Actors go to the right of their space's label.
+        next_column: Dict[MapSpace, int] = {}
+        for label, space in sorted(cell_actors.items()):
+            column, row = label_cells[space]
+            column = next_column.get(space, column + 1)
+            if column < self._cell_width - 1:
+                lines[row][column] = label[0]
+            next_column[space] = column + 1
+        return [''.join(line) for line in lines]
+
+    def render_ascii(self) -> str:
+        """Return the board as text, top row first."""
+        for position in self._ascii_dirty:
+            cell = self._draw_ascii_cell(position)
+            if cell is None:
+                self._ascii_cells.pop(position, None)
+            else:
+                self._ascii_cells[position] = cell
+        self._ascii_dirty.clear()
+
+        bounds = self._bounds()
+        if bounds is None:
+            return ''
+        min_x, min_y, max_x, max_y = bounds
+        blank = [' ' * self._cell_width] * self._cell_height
+        lines = []
+        for y in range(max_y, min_y - 1, -1):
+            row_cells = [self._ascii_cells.get(Position((x, y)), blank) for x in range(min_x, max_x + 1)]
+            lines.extend(''.join(parts).rstrip() for parts in zip(*row_cells))
+        return '\n'.join(lines)
+
+    # SVG
+
+    def _svg_fragment(self, tile: MapTile) -> str:
+        key = (tile.get_tile_def(), tile.get_rotation())
+        fragment = self._svg_fragments.get(key)
+        if fragment is None:
+            fragment = self._svg_fragments[key] = self._draw_svg_fragment(tile)
+        return fragment
+
+    def _draw_svg_fragment(self, tile: MapTile) -> str:
+        size = self._svg_tile_size
+        parts = ['<title>%s</title>' % escape(str(tile))]
+        for i, space in enumerate(tile.get_spaces()):
+            points = ' '.join('%g,%g' % (u * size, v * size) for u, v in _local_polygon(space, tile.get_rotation()))
+            parts.append('<polygon points="%s" fill="%s" stroke="#5a4a32"><title>%s</title></polygon>' %
+                         (points, _SVG_COLORS[i % len(_SVG_COLORS)], escape(space.name or space.id)))
+        exit_mask = tile.get_exit_mask()
+        door = size / 5
+        for direction, (x, y, w, h) in enumerate(((size / 2 - door / 2, 0, door, door / 4),
+                                                  (size - door / 4, size / 2 - door / 2, door / 4, door),
+                                                  (size / 2 - door / 2, size - door / 4, door, door / 4),
+                                                  (0, size / 2 - door / 2, door / 4, door))):
+            if exit_mask & (1 << direction):
+                parts.append('<rect class="exit" x="%g" y="%g" width="%g" height="%g" fill="#2b2118"/>' % (x, y, w, h))
+        return ''.join(parts)
+
+    def _draw_svg_cell(self, position: Position) -> Optional[str]:
+        tile = self._tile_at(position)
+        if tile is None:
+            return None
+        parts = [self._svg_fragment(tile)]
+        size = self._svg_tile_size
+        cell_actors = self._cell_actors.get(position, {})
+        offsets: Dict[MapSpace, int] = {}
+        for label, space in sorted(cell_actors.items()):
+            u, v = _centroid(_local_polygon(space, tile.get_rotation()))
+            offset = offsets.get(space, 0)
+            offsets[space] = offset + 1
+            parts.append('<g class="actor"><circle cx="%g" cy="%g" r="%g" fill="#8b1a1a"/>'
+                         '<text x="%g" y="%g" font-size="%g" text-anchor="middle" fill="white">%s</text></g>' %
+                         (u * size + offset * size / 8, v * size, size / 12, u * size + offset * size / 8,
+                          v * size + size / 30, size / 10, escape(label)))
+        return ''.join(parts)
+
+    def render_svg(self) -> str:
+        """Return the board as an SVG document."""
+        for position in self._svg_dirty:
+            cell = self._draw_svg_cell(position)
+            if cell is None:
+                self._svg_cells.pop(position, None)
+            else:
+                self._svg_cells[position] = cell
+        self._svg_dirty.clear()
+
+        bounds = self._bounds()
+        if bounds is None:
+            return '<svg xmlns="http://www.w3.org/2000/svg"/>'
+        min_x, min_y, max_x, max_y = bounds
+        size = self._svg_tile_size
+        parts = ['<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 %d %d">' %
+                 ((max_x - min_x + 1) * size, (max_y - min_y + 1) * size)]
+        for (x, y), cell in self._svg_cells.items():
+            # SVG y grows downwards, board y upwards.
+            parts.append('<g transform="translate(%d,%d)">%s</g>' % ((x - min_x) * size, (max_y - y) * size, cell))
+        parts.append('</svg>')
+        return '\n'.join(parts)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Play a random game and draw the final board.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the game.')
+    parser.add_argument('--players', type=int, default=1, help='Number of hunters.')
+    parser.add_argument('--svg', help='Also write the board as SVG to this file.')
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    game = Game(args.players, controller_factory=RandomHunterController, verbose=False)
+    renderer = BoardRenderer(game.get_board())
+    while not game.is_game_over():
+        game.round()
+    renderer.update_actors({str(i + 1): player.actor.position for i, player in enumerate(game.get_players())})
+    print(renderer.render_ascii())
+    if args.svg:
+        with open(args.svg, 'w') as f:
+            f.write(renderer.render_svg())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""Compact binary game logs, and a memory-mapped reader for them.
+
+A log file is a sequence of segments, one per ReplayWriter that appended to it. Each segment starts with a header and
+holds any number of games. All integers are little-endian, and every record starts with a one byte tag:
+
+    SEGMENT     'BBRL' magic, u16 format version. Resets the action and tile dictionaries.
+    ACTION_DEF  u16 action id, u8 ActionType, u8 arg kind, arg (u8 length + space id, or u8 Direction)
+    TILE_DEF    u16 tile code, u8 length + tile name
+    GAME_START  u64 seed, u8 number of players
+    TILE        u16 tile code, u8 rotation
+    ACTION      u8 player index, u16 action id
+    ROUND_END   u16 round number
+    GAME_END    u16 number of rounds played
+
+Actions are written as the writer process's interned action ids (see action.ACTIONS), and tiles as small codes.
+Since those are only meaningful within one process, each id is described by an ACTION_DEF or TILE_DEF record the
+first time it's used in a segment. An ordinary action costs 4 bytes and a tile draw 4 bytes.
+"""
+import mmap
+import os
+import struct
+from action import ACTIONS, Action, ActionType
+from array import array
+from board import Direction, MapTile, TileDef
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Union
+
+MAGIC = b'BBRL'
+FORMAT_VERSION = 1
+
+_SEGMENT = 0
+_ACTION_DEF = 1
+_TILE_DEF = 2
+_GAME_START = 3
+_TILE = 4
+_ACTION = 5
+_ROUND_END = 6
+_GAME_END = 7
+
+_ARG_NONE = 0
+_ARG_SPACE = 1
+_ARG_DIRECTION = 2
+
+_SEGMENT_STRUCT = struct.Struct('<B4sH')
+_ACTION_DEF_STRUCT = struct.Struct('<BHBB')
+_TILE_DEF_STRUCT = struct.Struct('<BH')
+_GAME_START_STRUCT = struct.Struct('<BQB')
+_TILE_STRUCT = struct.Struct('<BHB')
+_ACTION_STRUCT = struct.Struct('<BBH')
+_ROUND_END_STRUCT = struct.Struct('<BH')
+_GAME_END_STRUCT = struct.Struct('<BH')
+
+
+class GameStart(NamedTuple):
+    seed: int
+    num_players: int
+
+
+class TileDraw(NamedTuple):
+    tile_name: str
+    rotation: int
+
+
+class PlayerAction(NamedTuple):
+    player_index: int
+    action_type: ActionType
+    # The id of the destination space for MOVE actions, the Direction for EXIT actions, otherwise None.
+    arg: Union[None, str, Direction]
+
+
+class RoundEnd(NamedTuple):
+    round_number: int
+
+
+class GameEnd(NamedTuple):
+    num_rounds: int
+
+
+Event = Union[GameStart, TileDraw, PlayerAction, RoundEnd, GameEnd]
+
+
+class ReplayWriter:
+    """Appends games to a log file through a buffered stream.
+
+    Pass the writer to Game as its recorder to log tile draws, actions and round ends, and bracket every game with
+    start_game() and end_game().
+    """
+    def __init__(self, path: str, buffer_size: int = 1 << 16):
+        self._file: BinaryIO = open(path, 'ab', buffering=buffer_size)
+        self._file.write(_SEGMENT_STRUCT.pack(_SEGMENT, MAGIC, FORMAT_VERSION))
+        # Process-local action ids that have been described in this segment.
+        self._defined_actions = bytearray()
+        # TileDef -> tile code in this segment.
+        self._tile_codes: Dict[TileDef, int] = {}
+
+    def start_game(self, seed: int, num_players: int) -> None:
+        self._file.write(_GAME_START_STRUCT.pack(_GAME_START, seed, num_players))
+
+    def end_game(self, num_rounds: int) -> None:
+        self._file.write(_GAME_END_STRUCT.pack(_GAME_END, num_rounds))
+
+    def record_action(self, player_index: int, action: Action) -> None:
+        action_id = action.id if action.id >= 0 else ACTIONS.intern(action.type, action.arg).id
+        if action_id >= len(self._defined_actions) or not self._defined_actions[action_id]:
+            self._define_action(action_id)
+        self._file.write(_ACTION_STRUCT.pack(_ACTION, player_index, action_id))
+
+    def record_tile(self, tile: MapTile) -> None:
+        tile_def = tile.get_tile_def()
+        tile_code = self._tile_codes.get(tile_def)
+        if tile_code is None:
+            tile_code = self._tile_codes[tile_def] = len(self._tile_codes)
+            name = tile_def.name.encode()
+            self._file.write(_TILE_DEF_STRUCT.pack(_TILE_DEF, tile_code) + bytes((len(name),)) + name)
+        self._file.write(_TILE_STRUCT.pack(_TILE, tile_code, tile.get_rotation()))
+
+    def record_round_end(self, round_number: int) -> None:
+        self._file.write(_ROUND_END_STRUCT.pack(_ROUND_END, round_number))
+
+    def _define_action(self, action_id: int) -> None:
+        action = ACTIONS.get(action_id)
+        if action.type == ActionType.MOVE:
+            space_id = action.arg.id.encode()
+            arg = bytes((_ARG_SPACE, len(space_id))) + space_id
+        elif action.type == ActionType.EXIT:
+            arg = bytes((_ARG_DIRECTION, action.arg.value))
+        else:
+            arg = bytes((_ARG_NONE,))
+        self._file.write(_ACTION_DEF_STRUCT.pack(_ACTION_DEF, action_id, action.type.value, arg[0]) + arg[1:])
+        if action_id >= len(self._defined_actions):
+            self._defined_actions.extend(bytes(action_id + 1 - len(self._defined_actions)))
+        self._defined_actions[action_id] = 1
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> 'ReplayWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class _Segment:
+    """The dictionaries in effect for one segment of a log file."""
+    def __init__(self):
+        self.actions: Dict[int, tuple] = {}
+        self.tiles: Dict[int, str] = {}
+
+
+class ReplayReader:
+    """Reads games from a log file without loading it into memory.
+
+    Opening the reader makes one pass over the file to find where each game starts; after that any game can be read
+    directly with game(i), and iterating over the reader yields every game in order.
+    """
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        self._data: Union[mmap.mmap, bytes] = b''
+        if os.fstat(self._file.fileno()).st_size:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._segments: List[_Segment] = []
+        # Offset of every GAME_START record, and the index of the segment it's in.
+        self._game_offsets = array('Q')
+        self._game_segments = array('I')
+        for offset, event in self._scan(0, None):
+            if isinstance(event, GameStart):
+                self._game_offsets.append(offset)
+                self._game_segments.append(len(self._segments) - 1)
+
+    def __len__(self):
+        return len(self._game_offsets)
+
+    def game(self, index: int) -> Iterator[Event]:
+        """Iterate over the events of the `index`th game, from its GameStart up to and including its GameEnd."""
+        segment = self._segments[self._game_segments[index]]
+        for _, event in self._scan(self._game_offsets[index], segment):
+            yield event
+            if isinstance(event, GameEnd):
+                return
+
+    def __iter__(self) -> Iterator[Iterator[Event]]:
+        for index in range(len(self)):
+            yield self.game(index)
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> 'ReplayReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _scan(self, offset: int, segment: Optional[_Segment]) -> Iterator[tuple]:
+        """Yield (offset, event) for the records starting at `offset`, with dictionary records updating `segment`.
+
+        With `segment` None, this is the initial scan: it reads the whole file and adds a _Segment for every segment
+        header. Otherwise it stops at the next segment header.
+        """
+        indexing = segment is None
+        data = self._data
+        end = len(data)
+        while offset < end:
+            tag = data[offset]
+            if segment is None and tag != _SEGMENT:
+                raise ValueError('Not a replay log: missing segment header at offset %d.' % offset)
+            record_offset = offset
+            if tag == _ACTION:
+                _, player_index, action_id = _ACTION_STRUCT.unpack_from(data, offset)
+                offset += _ACTION_STRUCT.size
+                action_type, arg = segment.actions[action_id]
+                yield record_offset, PlayerAction(player_index, action_type, arg)
+            elif tag == _TILE:
+                _, tile_code, rotation = _TILE_STRUCT.unpack_from(data, offset)
+                offset += _TILE_STRUCT.size
+                yield record_offset, TileDraw(segment.tiles[tile_code], rotation)
+            elif tag == _ROUND_END:
+                _, round_number = _ROUND_END_STRUCT.unpack_from(data, offset)
+                offset += _ROUND_END_STRUCT.size
+                yield record_offset, RoundEnd(round_number)
+            elif tag == _GAME_START:
+                _, seed, num_players = _GAME_START_STRUCT.unpack_from(data, offset)
+                offset += _GAME_START_STRUCT.size
+                yield record_offset, GameStart(seed, num_players)
+            elif tag == _GAME_END:
+                _, num_rounds = _GAME_END_STRUCT.unpack_from(data, offset)
+                offset += _GAME_END_STRUCT.size
+                yield record_offset, GameEnd(num_rounds)
+            elif tag == _ACTION_DEF:
+                _, action_id, action_type, arg_kind = _ACTION_DEF_STRUCT.unpack_from(data, offset)
+                offset += _ACTION_DEF_STRUCT.size
+                arg: Union[None, str, Direction] = None
+                if arg_kind == _ARG_SPACE:
+                    length = data[offset]
+                    arg = bytes(data[offset + 1:offset + 1 + length]).decode()
+                    offset += 1 + length
+                elif arg_kind == _ARG_DIRECTION:
+                    arg = Direction(data[offset])
+                    offset += 1
+                segment.actions[action_id] = (ActionType(action_type), arg)
+            elif tag == _TILE_DEF:
+                _, tile_code = _TILE_DEF_STRUCT.unpack_from(data, offset)
+                offset += _TILE_DEF_STRUCT.size
+                length = data[offset]
+                segment.tiles[tile_code] = bytes(data[offset + 1:offset + 1 + length]).decode()
+                offset += 1 + length
+            elif tag == _SEGMENT:
+                _, magic, version = _SEGMENT_STRUCT.unpack_from(data, offset)
+                if magic != MAGIC or version != FORMAT_VERSION:
+                    raise ValueError('Not a replay log, or unsupported version (offset %d).' % offset)
+                offset += _SEGMENT_STRUCT.size
+                if not indexing:
+                    # Reading a single game, and we've run past the end of its segment.
+                    return
+                segment = _Segment()
+                self._segments.append(segment)
+            else:
+                raise ValueError('Corrupt replay log: unknown record tag %d at offset %d.' % (tag, offset))
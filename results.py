@@ -0,0 +1,141 @@
+"""Streaming columnar storage for simulation results.
+
+A ColumnarSink takes rows one at a time and keeps only the current batch in memory, as one typed array per column.
+Whenever batch_size rows have accumulated (and on close), every column's batch is written to its own file:
+
+    <directory>/<column>/<prefix>-<part>.npy
+
+Files are in the NumPy .npy format (version 1.0, one-dimensional, little-endian), so a column can be loaded with
+numpy.load, or all of its parts with numpy.concatenate, but they're written and read here without needing NumPy.
+Different writers (e.g. simulation workers) can share a directory as long as they use different prefixes.
+"""
+import ast
+import os
+import sys
+from array import array
+from typing import BinaryIO, Dict, List, Sequence, Tuple
+
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+
+# array typecode -> .npy dtype.
+_DESCRS: Dict[str, str] = {
+    'b': '|i1',
+    'B': '|u1',
+    'h': '<i2',
+    'H': '<u2',
+    'i': '<i4',
+    'I': '<u4',
+    'q': '<i8',
+    'Q': '<u8',
+    'f': '<f4',
+    'd': '<f8',
+}
+_TYPECODES = {descr: typecode for typecode, descr in _DESCRS.items()}
+
+# (column name, array typecode)
+Column = Tuple[str, str]
+
+
+def write_npy(f: BinaryIO, values: array) -> None:
+    """Write `values` to `f` as a one-dimensional .npy array."""
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': (%d,), }" % (_DESCRS[values.typecode], len(values))
+    # The header is padded with spaces and ends with a newline, so that the data starts at a multiple of 64 bytes.
+    padding = -(len(NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header_bytes = (header + ' ' * padding + '\n').encode('latin1')
+    f.write(NPY_MAGIC)
+    f.write(len(header_bytes).to_bytes(2, 'little'))
+    f.write(header_bytes)
+    if sys.byteorder == 'big' and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    values.tofile(f)
+
+
+def read_npy(path: str) -> array:
+    """Read a one-dimensional .npy file written by write_npy (or by NumPy, for the dtypes in _DESCRS)."""
+    with open(path, 'rb') as f:
+        if f.read(len(NPY_MAGIC)) != NPY_MAGIC:
+            raise ValueError('%s is not a version 1.0 .npy file.' % path)
+        header_length = int.from_bytes(f.read(2), 'little')
+        header = ast.literal_eval(f.read(header_length).decode('latin1'))
+        if header['fortran_order'] or len(header['shape']) != 1 or header['descr'] not in _TYPECODES:
+            raise ValueError('Unsupported .npy array in %s: %s' % (path, header))
+        values = array(_TYPECODES[header['descr']])
+        values.fromfile(f, header['shape'][0])
+    if sys.byteorder == 'big' and values.itemsize > 1:
+        values.byteswap()
+    return values
+
+
+def column_parts(directory: str, column: str) -> List[str]:
+    """Return the files holding `column` in `directory`, in order of prefix and part."""
+    column_dir = os.path.join(directory, column)
+    if not os.path.isdir(column_dir):
+        return []
+    return [os.path.join(column_dir, name) for name in sorted(os.listdir(column_dir)) if name.endswith('.npy')]
+
+
+def read_column(directory: str, column: str) -> array:
+    """Read every part of `column` in `directory` into one array. Only use this for columns that fit in memory."""
+    result = None
+    for path in column_parts(directory, column):
+        values = read_npy(path)
+        if result is None:
+            result = values
+        else:
+            result.extend(values)
+    return result if result is not None else array('q')
+
+
+class ColumnarSink:
+    """Writes rows to per-column .npy files in fixed-size batches."""
+    def __init__(self, directory: str, prefix: str, columns: Sequence[Column], batch_size: int = 65536):
+        """
+        Args:
+            directory: Where to write the columns. Created if needed.
+            prefix: Name prefix for this sink's files, unique among the sinks writing to `directory`.
+            columns: The name and array typecode of each column, in the order rows list them.
+            batch_size: Maximum number of rows kept in memory, and written per file.
+        """
+        if batch_size < 1:
+            raise ValueError('batch_size must be positive.')
+        self._directory = directory
+        self._prefix = prefix
+        self._names = [name for name, _ in columns]
+        self._batches = [array(typecode) for _, typecode in columns]
+        self._batch_size = batch_size
+        self._num_parts = 0
+        self.num_rows = 0
+        for name in self._names:
+            os.makedirs(os.path.join(directory, name), exist_ok=True)
+
+    def add(self, row: Sequence) -> None:
+        """Add a row, with one value per column."""
+        batches = self._batches
+        if len(row) != len(batches):
+            raise ValueError('Expected %d values, got %d.' % (len(batches), len(row)))
+        for batch, value in zip(batches, row):
+            batch.append(value)
+        self.num_rows += 1
+        if len(batches[0]) >= self._batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write out the rows added since the last flush, if any."""
+        if not self._batches[0]:
+            return
+        for name, batch in zip(self._names, self._batches):
+            path = os.path.join(self._directory, name, '%s-%04d.npy' % (self._prefix, self._num_parts))
+            with open(path, 'wb') as f:
+                write_npy(f, batch)
+            del batch[:]
+        self._num_parts += 1
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> 'ColumnarSink':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,193 @@
+"""Seeded, splittable random number streams.
+
+Each subsystem that needs randomness (the board, the tile deck, every controller, ...) gets its own RandomStream, so
+draws in one subsystem don't shift the draws of another, and games don't share any state with each other or with the
+module-level RNG. Streams form a tree: split() derives a child stream from the parent's seed and path and a key, not
+from its current state, so e.g. the board stream of game 17 is the same no matter how many games ran before it, or in
+which process.
+
+RandomStream is a random.Random, so it can be passed anywhere one is expected, but it isn't a Mersenne Twister: it's
+counter based, with block i of the stream being SHAKE-128 of (seed, path, i), where the path is the keys the stream was
+split with, starting from a root stream with an empty path. So splitting doesn't hash anything, and seeding and
+splitting are O(1), which matters when every simulated game creates half a dozen streams. Nothing is generated until
+the first draw. Blocks are generated in bulk and start small, then double up to _MAX_BLOCK_SIZE words, so short-lived
+streams don't generate much they won't use. Bounded integer draws
+(choice, randrange, ...) take 32-bit words straight from the current block, and shuffle() takes all the words it needs
+in one slice. Since any block can be regenerated from the seed and path, a stream's state is just those and its position, so
+getstate() and setstate() are cheap enough to be part of every Game snapshot.
+"""
+import hashlib
+import os
+import random
+import sys
+from array import array
+from itertools import islice
+from typing import Iterator, List, MutableSequence, Optional, Sequence, Tuple, TypeVar, Union
+
+# Number of 32-bit words in the first and the largest blocks.
+_MIN_BLOCK_SIZE = 16
+_MAX_BLOCK_SIZE = 1024
+_WORD_BITS = 32
+_WORD_MASK = (1 << _WORD_BITS) - 1
+_NO_WORDS = array('I')
+
+SplitKey = Union[int, str]
+T = TypeVar('T')
+
+
+def derive_seed(seed: int, *key: SplitKey) -> int:
+    """Return a 64-bit seed derived from `seed` and `key`. Different keys give independent-looking seeds."""
+    digest = hashlib.blake2b(repr((seed,) + key).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _key_path(key: Sequence[SplitKey]) -> bytes:
+    """Return the path component for split(*key). Strings are quoted, so every path has just one reading."""
+    return b''.join(b'/%d' % part if isinstance(part, int) else b'/' + repr(part).encode() for part in key)
+
+
+class RandomStream(random.Random):
+    """A counter-based random.Random that can be split into independent child streams."""
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Args:
+            seed: The stream's seed, or None for a seed from the OS.
+        """
+        # random.Random.__init__ calls seed(), which sets up the rest of the state.
+        super().__init__(seed)
+
+    def seed(self, a: Optional[int] = None, version: int = 2) -> None:
+        """Restart the stream as the root stream with seed `a`, which must be an int (or None for a seed from the
+        OS)."""
+        if a is None:
+            a = int.from_bytes(os.urandom(8), 'little')
+        if not isinstance(a, int):
+            raise TypeError('RandomStream seeds must be ints, not %s.' % type(a).__name__)
+        self.initial_seed = a
+        # The keys this stream was split with from the root stream, see _key_path().
+        self._path = b''
+        # Number of blocks generated so far. The current block is block _block_index - 1, and _words iterates over it.
+        self._block_index = 0
+        self._block = _NO_WORDS
+        self._words: Iterator[int] = iter(_NO_WORDS)
+        self.gauss_next = None
+
+    def split(self, *key: SplitKey) -> 'RandomStream':
+        """Return a new stream for `key`, e.g. split('game', 17) or split('board'). The result only depends on this
+        stream's seed and path and the key, and split(a, b) is the same stream as split(a).split(b)."""
+        child = RandomStream(self.initial_seed)
+        child._path = self._path + _key_path(key)
+        return child
+
+    def _generate_block(self, index: int) -> array:
+        size = min(_MIN_BLOCK_SIZE << index, _MAX_BLOCK_SIZE)
+        words = array('I', hashlib.shake_128(b'%d%s:%d' % (self.initial_seed, self._path, index)).digest(4 * size))
+        if sys.byteorder == 'big':
+            words.byteswap()
+        return words
+
+    def _next_word(self) -> int:
+        try:
+            return next(self._words)
+        except StopIteration:
+            index = self._block_index
+            self._block = self._generate_block(index)
+            self._block_index = index + 1
+            self._words = iter(self._block)
+            return next(self._words)
+
+    def _take(self, count: int) -> List[int]:
+        """Return the next `count` words."""
+        words = list(islice(self._words, count))
+        while len(words) < count:
+            # The current block ran out.
+            words.append(self._next_word())
+            words.extend(islice(self._words, count - len(words)))
+        return words
+
+    def random(self) -> float:
+        """Return a float in [0.0, 1.0) with 53 random bits, like random.Random does."""
+        return ((self._next_word() >> 5) * 67108864 + (self._next_word() >> 6)) * (1.0 / 9007199254740992)
+
+    def getrandbits(self, k: int) -> int:
+        if k < 0:
+            raise ValueError('number of bits must be non-negative')
+        result = 0
+        num_words = (k + _WORD_BITS - 1) // _WORD_BITS
+        for _ in range(num_words):
+            result = (result << _WORD_BITS) | self._next_word()
+        return result >> (num_words * _WORD_BITS - k)
+
+    def randbytes(self, n: int) -> bytes:
+        return self.getrandbits(n * 8).to_bytes(n, 'little')
+
+    def randbelow(self, n: int) -> int:
+        """Return a uniformly random int in [0, n)."""
+        if n > _WORD_MASK:
+            return self._randbelow_with_getrandbits(n)
+        # Lemire's multiply-shift method: the high word of word * n is uniform in [0, n) once the few biased low
+        # words are rejected.
+        try:
+            m = next(self._words) * n
+        except StopIteration:
+            m = self._next_word() * n
+        if (m & _WORD_MASK) < n:
+            threshold = ((1 << _WORD_BITS) - n) % n
+            while (m & _WORD_MASK) < threshold:
+                m = self._next_word() * n
+        return m >> _WORD_BITS
+
+    # randrange, randint and sample all draw through _randbelow.
+    _randbelow = randbelow
+
+    def choice(self, seq: Sequence[T]) -> T:
+        n = len(seq)
+        if not n:
+            raise IndexError('Cannot choose from an empty sequence')
+        try:
+            m = next(self._words) * n
+        except StopIteration:
+            m = self._next_word() * n
+        if (m & _WORD_MASK) < n:
+            threshold = ((1 << _WORD_BITS) - n) % n
+            while (m & _WORD_MASK) < threshold:
+                m = self._next_word() * n
+        return seq[m >> _WORD_BITS]
+
+    def shuffle(self, x: MutableSequence) -> None:
+        """Fisher-Yates shuffle of `x`, in place."""
+        self.shuffle_range(x, 0, len(x))
+
+    def shuffle_range(self, x: MutableSequence, start: int, stop: int) -> None:
+        """Fisher-Yates shuffle of x[start:stop], in place."""
+        if stop - start < 2:
+            return
+        # One word per swap, all taken up front. Only a rejected word (chance below n / 2**32) needs another.
+        words = self._take(stop - start - 1)
+        for n, word in zip(range(stop - start, 1, -1), words):
+            m = word * n
+            if (m & _WORD_MASK) < n:
+                threshold = ((1 << _WORD_BITS) - n) % n
+                while (m & _WORD_MASK) < threshold:
+                    m = self._next_word() * n
+            i = start + n - 1
+            j = start + (m >> _WORD_BITS)
+            x[i], x[j] = x[j], x[i]
+
+    def getstate(self) -> Tuple:
+        """Return the stream's seed, path and position. Blocks are regenerated as needed by setstate()."""
+        reduced = self._words.__reduce__()
+        # An exhausted array iterator doesn't report its position.
+        position = reduced[2] if len(reduced) > 2 else len(self._block)
+        return self.initial_seed, self._path, self._block_index, position, self.gauss_next
+
+    def setstate(self, state: Tuple) -> None:
+        seed, path, block_index, position, self.gauss_next = state
+        if (seed, path, block_index) != (self.initial_seed, self._path, self._block_index):
+            # Not in the current block, so regenerate the block the state is in.
+            self.initial_seed = seed
+            self._path = path
+            self._block_index = block_index
+            self._block = self._generate_block(block_index - 1) if block_index else _NO_WORDS
+        self._words = iter(self._block)
+        self._words.__setstate__(position)
@@ -0,0 +1,113 @@
+"""Asyncio game server that hosts many concurrent games in one event loop.
+
+Every connection gets its own Game whose hunters are StreamHunterControllers talking to that connection. A session
+that is waiting for its player only holds a suspended coroutine, so idle sessions cost memory but no threads.
+
+Usage:
+    python -m server --port 8765
+    python -m server --unix /tmp/bloodborne.sock
+
+Then connect with e.g. `nc localhost 8765` and play with the same prompts as the terminal game.
+"""
+import argparse
+import asyncio
+import logging
+from controller import AsyncHunterController, StreamHunterController
+from game import Game, TurnPhase
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+async def play_async(game: Game) -> None:
+    """Play `game` to the end. All of its hunters' controllers must be AsyncHunterControllers."""
+    while not game.is_game_over():
+        player = game.get_current_player()
+        if not isinstance(player, AsyncHunterController):
+            raise TypeError('play_async needs AsyncHunterControllers, got %s.' % type(player).__name__)
+        possible_actions = game.get_possible_actions()
+        if game.get_phase() == TurnPhase.ACTION:
+            player_action = await player.select_action(possible_actions)
+        else:
+            player_action = await player.select_move(possible_actions, game.get_moves_remaining())
+        game.apply_action(player_action)
+
+
+class GameServer:
+    """Accepts connections and runs one game session per connection."""
+    def __init__(self, num_players: int = 1, max_sessions: Optional[int] = None):
+        """
+        Args:
+            num_players: Number of hunters in each game. All of them are controlled by the same connection.
+            max_sessions: Maximum number of concurrent games, or None for no limit. Connections over the limit are
+                turned away.
+        """
+        self._num_players = num_players
+        self._max_sessions = max_sessions
+        self._num_sessions = 0
+
+    def num_sessions(self) -> int:
+        return self._num_sessions
+
+    async def start_tcp(self, host: str, port: int) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        return await asyncio.start_unix_server(self.handle_connection, path)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if self._max_sessions is not None and self._num_sessions >= self._max_sessions:
+            writer.write(b'Server is full.\n')
+            await self._close(writer)
+            return
+
+        self._num_sessions += 1
+        try:
+            game = Game(self._num_players,
+                        controller_factory=lambda hunter: StreamHunterController(hunter, reader, writer),
+                        verbose=False)
+            await play_async(game)
+            writer.write(b'Game over.\n')
+        except ConnectionError:
+            # The player went away; nothing to clean up except the connection.
+            pass
+        except Exception:
+            logger.exception('Game session failed.')
+        finally:
+            self._num_sessions -= 1
+            await self._close(writer)
+
+    @staticmethod
+    async def _close(writer: asyncio.StreamWriter) -> None:
+        try:
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def serve(server: GameServer, host: str, port: int, unix_path: Optional[str]) -> None:
+    if unix_path:
+        listener = await server.start_unix(unix_path)
+    else:
+        listener = await server.start_tcp(host, port)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Host Bloodborne games over TCP or a unix socket.')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on.')
+    parser.add_argument('--port', type=int, default=8765, help='TCP port to listen on.')
+    parser.add_argument('--unix', help='Listen on this unix socket path instead of TCP.')
+    parser.add_argument('--players', type=int, default=1, help='Number of hunters per game.')
+    parser.add_argument('--max-sessions', type=int, help='Maximum number of concurrent games.')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(serve(GameServer(args.players, args.max_sessions), args.host, args.port, args.unix))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,435 @@
+"""Headless batch simulation of games with scripted controllers.
+
+Usage:
+    python -m simulate --games 1000000 --workers 8 --seed 1234
+
+Games are split into chunks and farmed out to a process pool. Each worker plays its chunk with per-game seeds and
+sends back an aggregated BatchSummary, so the parent never holds per-game results in memory.
+
+With --replay-dir, every game is also logged (see replay.py), one log file per chunk. With --results-dir, per-game and
+per-round metrics are streamed to .npy columns (see results.py) under games/ and rounds/ there. With --metrics, the game
+loop is instrumented (see instrumentation.py) and per-worker timings are written in the Prometheus text format.
+"""
+import argparse
+import math
+import multiprocessing
+import multiprocessing.util
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import instrumentation
+from action import ActionType
+from actor.hunter import Hunter
+from board import MapSpace
+from controller import RandomHunterController
+from game import Game
+from replay import ReplayWriter
+from results import Column, ColumnarSink
+from rng import RandomStream, derive_seed
+
+
+# In order of value.
+_ACTION_TYPES = tuple(ActionType)
+
+
+class _SimulationHunterController(RandomHunterController):
+    """A RandomHunterController that also remembers every space its hunter has stood on, and counts the actions it
+    took by type."""
+    def __init__(self, hunter: Hunter, rng: Optional[random.Random] = None):
+        super().__init__(hunter, rng)
+        self.visited: Set[MapSpace] = {hunter.position}
+        # Type of every action taken. Counted by action_counts() at the end, because ActionType.value is a property
+        # and comparatively slow to look up for every decision.
+        self.action_types: List[ActionType] = []
+
+    def select_move(self, possible_moves, num_moves):
+        self.visited.add(self.actor.position)
+        move = super().select_move(possible_moves, num_moves)
+        self.action_types.append(move.type)
+        return move
+
+    def select_action(self, possible_actions):
+        self.visited.add(self.actor.position)
+        action = super().select_action(possible_actions)
+        self.action_types.append(action.type)
+        return action
+
+    def action_counts(self) -> Tuple[int, ...]:
+        """Return the number of actions taken of each ActionType, indexed by value."""
+        return tuple(map(self.action_types.count, _ACTION_TYPES))
+
+
+@dataclass(frozen=True)
+class RoundResult:
+    """State of a simulated game at the end of one round."""
+    round: int
+    tiles_revealed: int
+    actions: int
+
+
+@dataclass
+class GameResult:
+    """Outcome of a single simulated game."""
+    seed: int
+    rounds: int
+    tiles_revealed: int
+    spaces_visited: int
+    # Tiles left in the tile deck. 0 means the deck was exhausted.
+    tiles_remaining: int = 0
+    # ActionType value -> number of actions of that type, over all hunters.
+    action_counts: Tuple[int, ...] = (0,) * len(ActionType)
+    rounds_played: Tuple[RoundResult, ...] = ()
+
+
+# Columns of the per-game and per-round tables written with --results-dir. `game` is the game's index in the batch.
+GAME_COLUMNS: List[Column] = ([('game', 'q'), ('seed', 'Q'), ('rounds', 'q'), ('tiles_revealed', 'q'),
+                               ('spaces_visited', 'q'), ('tiles_remaining', 'q')] +
+                              [('actions_%s' % action_type.name.lower(), 'q') for action_type in ActionType])
+ROUND_COLUMNS: List[Column] = [('game', 'q'), ('round', 'q'), ('tiles_revealed', 'q'), ('actions', 'q')]
+
+
+@dataclass
+class QuantileSketch:
+    """Approximate quantiles of a stream of non-negative numbers, in the style of DDSketch.
+
+    Values are counted in logarithmic buckets, bucket k holding the values in (gamma**(k-1), gamma**k], so any quantile
+    is estimated to within `relative_accuracy` of the true value using a bucket per factor of gamma. Zero (and anything
+    below) gets a bucket of its own. Sketches merge by adding up bucket counts, so merging is exact and order doesn't
+    matter.
+    """
+    relative_accuracy: float = 0.01
+    zero_count: int = 0
+    buckets: Dict[int, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._gamma = (1 + self.relative_accuracy) / (1 - self.relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+
+    def add(self, value: float) -> None:
+        if value <= 0:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('Can only merge sketches with the same relative accuracy.')
+        self.zero_count += other.zero_count
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return an estimate of the `q` quantile (0 <= q <= 1), or None if no values were added."""
+        count = self.zero_count + sum(self.buckets.values())
+        if not count:
+            return None
+        rank = q * (count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                # The point within the bucket with the same relative error to either end.
+                return 2 * self._gamma ** key / (self._gamma + 1)
+        raise AssertionError('Quantile rank beyond the sketch.')
+
+
+@dataclass
+class RunningStat:
+    """Count, total, variance, min, max and quantile sketch of a stream of numbers. Two RunningStats can be merged.
+
+    Values are ints in practice, so the total and the total of squares are exact, and so is the result of merging
+    RunningStats in any order.
+    """
+    count: int = 0
+    total: float = 0
+    total_squares: float = 0
+    min: Optional[float] = None
+    max: Optional[float] = None
+    sketch: QuantileSketch = field(default_factory=QuantileSketch)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.total_squares += value * value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.sketch.add(value)
+
+    def merge(self, other: 'RunningStat') -> None:
+        if other.count == 0:
+            return
+        self.count += other.count
+        self.total += other.total
+        self.total_squares += other.total_squares
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def variance(self) -> float:
+        """Return the sample variance."""
+        if self.count < 2:
+            return 0.0
+        # With int values the numerator is computed exactly, so there's no cancellation to worry about.
+        return (self.count * self.total_squares - self.total * self.total) / (self.count * (self.count - 1))
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return an estimate of the `q` quantile, accurate to 1%."""
+        estimate = self.sketch.quantile(q)
+        if estimate is None:
+            return None
+        return min(max(estimate, self.min), self.max)
+
+    def __str__(self):
+        if not self.count:
+            return 'n/a'
+        return 'mean=%.3f sd=%.3f min=%s p50=%.4g p99=%.4g max=%s' % (
+            self.mean(), math.sqrt(self.variance()), self.min, self.quantile(0.5), self.quantile(0.99), self.max)
+
+
+@dataclass
+class BatchSummary:
+    """Aggregated results of any number of games."""
+    games: int = 0
+    rounds: RunningStat = field(default_factory=RunningStat)
+    tiles_revealed: RunningStat = field(default_factory=RunningStat)
+    spaces_visited: RunningStat = field(default_factory=RunningStat)
+    tiles_remaining: RunningStat = field(default_factory=RunningStat)
+    actions: RunningStat = field(default_factory=RunningStat)
+    # Number of games that used up the tile deck.
+    decks_exhausted: int = 0
+    # Worker id -> instrumentation stats, if the games were instrumented.
+    metrics: Dict[str, instrumentation.Stats] = field(default_factory=dict, compare=False)
+
+    def add(self, result: GameResult) -> None:
+        self.games += 1
+        self.rounds.add(result.rounds)
+        self.tiles_revealed.add(result.tiles_revealed)
+        self.spaces_visited.add(result.spaces_visited)
+        self.tiles_remaining.add(result.tiles_remaining)
+        self.actions.add(sum(result.action_counts))
+        if result.tiles_remaining == 0:
+            self.decks_exhausted += 1
+
+    def merge(self, other: 'BatchSummary') -> None:
+        self.games += other.games
+        self.rounds.merge(other.rounds)
+        self.tiles_revealed.merge(other.tiles_revealed)
+        self.spaces_visited.merge(other.spaces_visited)
+        self.tiles_remaining.merge(other.tiles_remaining)
+        self.actions.merge(other.actions)
+        self.decks_exhausted += other.decks_exhausted
+        for worker, stats in other.metrics.items():
+            self.metrics.setdefault(worker, instrumentation.Stats()).merge(stats)
+
+    def __str__(self):
+        return '\n'.join(['Games played: %d' % self.games,
+                          'Rounds played: %s' % self.rounds,
+                          'Tiles revealed: %s' % self.tiles_revealed,
+                          'Spaces visited: %s' % self.spaces_visited,
+                          'Tiles remaining: %s' % self.tiles_remaining,
+                          'Actions taken: %s' % self.actions,
+                          'Tile decks exhausted: %d' % self.decks_exhausted])
+
+
+def game_seed(root_seed: int, game_index: int) -> int:
+    """Return the seed for the `game_index`th game of a batch started from `root_seed`."""
+    return derive_seed(root_seed, game_index)
+
+
+def run_game(seed: int, num_players: int = 1, recorder: Optional[ReplayWriter] = None,
+             record_rounds: bool = False) -> GameResult:
+    """Play one game to completion with random hunters and return its result. The game is logged to `recorder` if
+    given. The result's rounds_played is only filled in if `record_rounds` is set, since it costs a few percent per
+    game."""
+    # The game and each hunter get their own stream, so nothing draws from the module-level RNG.
+    rng = RandomStream(seed)
+    hunter_streams = (rng.split('hunter', i) for i in range(num_players))
+
+    def controller_factory(hunter: Hunter) -> _SimulationHunterController:
+        return _SimulationHunterController(hunter, next(hunter_streams))
+
+    if recorder is not None:
+        recorder.start_game(seed, num_players)
+    game = Game(num_players, controller_factory=controller_factory, verbose=False, recorder=recorder,
+                rng=rng.split('game'))
+    players = game.get_players()
+    rounds_played: List[RoundResult] = []
+    if record_rounds:
+        previous_actions = 0
+        while not game.is_game_over():
+            current_round = game.get_current_round()
+            game.round()
+            actions = sum(len(player.action_types) for player in players)
+            rounds_played.append(RoundResult(round=current_round,
+                                             tiles_revealed=len(game.get_board().get_current_tiles()),
+                                             actions=actions - previous_actions))
+            previous_actions = actions
+    else:
+        while not game.is_game_over():
+            game.round()
+    if recorder is not None:
+        recorder.end_game(game.get_current_round())
+
+    visited: Set[MapSpace] = set()
+    for player in players:
+        visited |= player.visited
+        visited.add(player.actor.position)
+    return GameResult(seed=seed,
+                      rounds=game.get_current_round(),
+                      tiles_revealed=len(game.get_board().get_current_tiles()),
+                      spaces_visited=len(visited),
+                      tiles_remaining=game.get_tile_deck().num_remaining(),
+                      action_counts=tuple(map(sum, zip(*(player.action_counts() for player in players)))),
+                      rounds_played=tuple(rounds_played))
+
+
+ChunkTask = Tuple[int, int, int, int, Optional[str], Optional[str], int, bool]
+
+
+def replay_path(replay_dir: str, root_seed: int, start: int) -> str:
+    """Return the log file for the chunk of games starting at `start`."""
+    return os.path.join(replay_dir, 'games-%d-%08d.bbr' % (root_seed, start))
+
+
+def results_prefix(root_seed: int, worker: int) -> str:
+    """Return the file name prefix of the results columns written by the `worker` process."""
+    return 'games-%d-%d' % (root_seed, worker)
+
+
+# (results_dir, root_seed) -> (game sink, round sink) of this process. Kept across chunks, so every worker writes
+# batches of up to batch_size rows however small the chunks are. See close_result_sinks().
+_result_sinks: Dict[Tuple[str, int], Tuple[ColumnarSink, ColumnarSink]] = {}
+
+
+def _get_result_sinks(results_dir: str, root_seed: int, batch_size: int) -> Tuple[ColumnarSink, ColumnarSink]:
+    sinks = _result_sinks.get((results_dir, root_seed))
+    if sinks is None:
+        prefix = results_prefix(root_seed, os.getpid())
+        sinks = _result_sinks[results_dir, root_seed] = (
+            ColumnarSink(os.path.join(results_dir, 'games'), prefix, GAME_COLUMNS, batch_size),
+            ColumnarSink(os.path.join(results_dir, 'rounds'), prefix, ROUND_COLUMNS, batch_size))
+    return sinks
+
+
+def close_result_sinks() -> None:
+    """Write out the rows this process's result sinks still hold, and forget the sinks."""
+    for game_sink, round_sink in _result_sinks.values():
+        game_sink.close()
+        round_sink.close()
+    _result_sinks.clear()
+
+
+def _init_worker() -> None:
+    # Pool workers close their result sinks on exit, which is why simulate() joins the pool rather than terminating it.
+    multiprocessing.util.Finalize(None, close_result_sinks, exitpriority=10)
+
+
+def run_chunk(task: ChunkTask) -> BatchSummary:
+    """Play games [start, stop) of the batch seeded by `root_seed` and return their summary."""
+    root_seed, start, stop, num_players, replay_dir, results_dir, batch_size, instrument = task
+    summary = BatchSummary()
+    recorder = ReplayWriter(replay_path(replay_dir, root_seed, start)) if replay_dir else None
+    game_sink = round_sink = None
+    if results_dir:
+        game_sink, round_sink = _get_result_sinks(results_dir, root_seed, batch_size)
+    if instrument:
+        instrumentation.enable()
+    try:
+        for game_index in range(start, stop):
+            result = run_game(game_seed(root_seed, game_index), num_players, recorder, record_rounds=bool(results_dir))
+            summary.add(result)
+            if game_sink is not None:
+                game_sink.add((game_index, result.seed, result.rounds, result.tiles_revealed, result.spaces_visited,
+                               result.tiles_remaining) + result.action_counts)
+                for round_result in result.rounds_played:
+                    round_sink.add((game_index, round_result.round, round_result.tiles_revealed,
+                                    round_result.actions))
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if instrument:
+            instrumentation.disable()
+            summary.metrics[str(os.getpid())] = instrumentation.take()
+    return summary
+
+
+def _chunks(root_seed: int, num_games: int, chunk_size: int, num_players: int, replay_dir: Optional[str],
+            results_dir: Optional[str], batch_size: int, instrument: bool) -> Iterator[ChunkTask]:
+    for start in range(0, num_games, chunk_size):
+        yield (root_seed, start, min(start + chunk_size, num_games), num_players, replay_dir, results_dir, batch_size,
+               instrument)
+
+
+def simulate(num_games: int, workers: int = 1, root_seed: int = 0, chunk_size: int = 1000,
+             num_players: int = 1, replay_dir: Optional[str] = None, results_dir: Optional[str] = None,
+             batch_size: int = 65536, instrument: bool = False) -> BatchSummary:
+    """Play `num_games` games and return the aggregated results.
+
+    With workers > 1 the games are distributed across a process pool; otherwise they're played in this process.
+    Results only depend on `root_seed`, not on the number of workers. If `replay_dir` is given, the games are logged
+    there. If `results_dir` is given, per-game and per-round metrics are written there, each worker writing batches of
+    at most `batch_size` rows. If `instrument` is set, the summary's metrics hold timings for each worker process.
+    """
+    if replay_dir:
+        os.makedirs(replay_dir, exist_ok=True)
+    tasks: Iterable[ChunkTask] = _chunks(root_seed, num_games, chunk_size, num_players, replay_dir, results_dir,
+                                         batch_size, instrument)
+    summary = BatchSummary()
+    if workers <= 1:
+        try:
+            for task in tasks:
+                summary.merge(run_chunk(task))
+        finally:
+            close_result_sinks()
+        return summary
+
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+        for chunk_summary in pool.imap_unordered(run_chunk, tasks):
+            summary.merge(chunk_summary)
+        # Let the workers exit, so they write out their result sinks (see _init_worker).
+        pool.close()
+        pool.join()
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Run headless Bloodborne games with scripted hunters.')
+    parser.add_argument('--games', type=int, default=1000, help='Number of games to play.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Number of worker processes.')
+    parser.add_argument('--seed', type=int, default=0, help='Root seed for the batch.')
+    parser.add_argument('--players', type=int, default=1, help='Number of hunters per game.')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Number of games per worker task.')
+    parser.add_argument('--replay-dir', help='Directory to write game logs to.')
+    parser.add_argument('--results-dir', help='Directory to write per-game and per-round metrics to, as .npy columns.')
+    parser.add_argument('--batch-size', type=int, default=65536,
+                        help='Maximum number of result rows a worker buffers before writing them out.')
+    parser.add_argument('--metrics', help='Instrument the games and write per-worker timings to this file, in the '
+                                          'Prometheus text format. Use - for stdout.')
+    args = parser.parse_args(argv)
+
+    summary = simulate(args.games, workers=args.workers, root_seed=args.seed, chunk_size=args.chunk_size,
+                       num_players=args.players, replay_dir=args.replay_dir, results_dir=args.results_dir,
+                       batch_size=args.batch_size, instrument=bool(args.metrics))
+    print(summary)
+    if args.metrics:
+        metrics = instrumentation.format_prometheus(({'worker': worker}, stats)
+                                                    for worker, stats in sorted(summary.metrics.items()))
+        if args.metrics == '-':
+            print(metrics, end='')
+        else:
+            with open(args.metrics, 'w') as f:
+                f.write(metrics)
+
+
+if __name__ == '__main__':
+    main()
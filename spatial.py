@@ -0,0 +1,168 @@
+"""Hit testing: which space is at a given point on the board.
+
+Board coordinates put the tile at Position (x, y) in the unit square [x, x + 1] x [y, y + 1], with y increasing upwards
+like Positions do. (Tile-local MapSpace bounds have y increasing downwards, see MapSpace.)
+
+SpaceIndex transforms every placed tile's space polygons into board coordinates and buckets them in a uniform grid of
+cells, so a query only tests the few polygons in the cells it touches. It listens to the Board, so it stays up to date
+as tiles are added and removed.
+"""
+import math
+from board import Board, BoardListener, MapSpace, MapTile
+from typing import Dict, Iterator, List, Optional, Tuple
+
+Point = Tuple[float, float]
+Polygon = Tuple[Point, ...]
+
+
+def rotate_local(point: Point, rotation: int) -> Point:
+    """Rotate a tile-local point clockwise (as seen on screen) about the tile centre by `rotation` quarter turns."""
+    u, v = point
+    for _ in range(rotation % 4):
+        u, v = 1 - v, u
+    return u, v
+
+
+def space_polygon(board: Board, tile: MapTile, space: MapSpace) -> Polygon:
+    """Return the bounds of `space`, which is on `tile`, in board coordinates."""
+    x, y = board.get_position(tile)
+    rotation = tile.get_rotation()
+    polygon = []
+    for point in space.bounds:
+        u, v = rotate_local(point, rotation)
+        polygon.append((x + u, y + 1 - v))
+    return tuple(polygon)
+
+
+def point_in_polygon(polygon: Polygon, x: float, y: float) -> bool:
+    """Even-odd rule point in polygon test."""
+    inside = False
+    x1, y1 = polygon[-1]
+    for x2, y2 in polygon:
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+def _segments_intersect(a: Point, b: Point, c: Point, d: Point) -> bool:
+    def orientation(p: Point, q: Point, r: Point) -> float:
+        return (q[0] - p[0]) * (r[1] - p[1]) - (q[1] - p[1]) * (r[0] - p[0])
+
+    d1 = orientation(c, d, a)
+    d2 = orientation(c, d, b)
+    d3 = orientation(a, b, c)
+    d4 = orientation(a, b, d)
+    if ((d1 > 0) != (d2 > 0) or d1 == 0 or d2 == 0) and ((d3 > 0) != (d4 > 0) or d3 == 0 or d4 == 0):
+        # Either a proper crossing or a touching/collinear case; check the bounding boxes to rule out disjoint
+        # collinear segments.
+        return (min(a[0], b[0]) <= max(c[0], d[0]) and min(c[0], d[0]) <= max(a[0], b[0]) and
+                min(a[1], b[1]) <= max(c[1], d[1]) and min(c[1], d[1]) <= max(a[1], b[1]))
+    return False
+
+
+class _Entry:
+    __slots__ = ('space', 'polygon', 'bbox')
+
+    def __init__(self, space: MapSpace, polygon: Polygon):
+        self.space = space
+        self.polygon = polygon
+        xs = [x for x, _ in polygon]
+        ys = [y for _, y in polygon]
+        self.bbox = (min(xs), min(ys), max(xs), max(ys))
+
+    def intersects_rect(self, x0: float, y0: float, x1: float, y1: float) -> bool:
+        bx0, by0, bx1, by1 = self.bbox
+        if bx1 < x0 or bx0 > x1 or by1 < y0 or by0 > y1:
+            return False
+        if any(x0 <= x <= x1 and y0 <= y <= y1 for x, y in self.polygon):
+            return True
+        corners = ((x0, y0), (x1, y0), (x1, y1), (x0, y1))
+        if any(point_in_polygon(self.polygon, x, y) for x, y in corners):
+            return True
+        edges = list(zip(self.polygon, self.polygon[1:] + self.polygon[:1]))
+        rect_edges = list(zip(corners, corners[1:] + corners[:1]))
+        return any(_segments_intersect(a, b, c, d) for a, b in edges for c, d in rect_edges)
+
+
+class SpaceIndex(BoardListener):
+    """Answers point and rectangle queries for the spaces on a Board."""
+    def __init__(self, board: Board, cells_per_tile: int = 4):
+        """
+        Args:
+            board: The board to index. The index registers itself as a listener; call close() to unregister.
+            cells_per_tile: Number of grid cells along each side of a tile. More cells mean fewer polygons to test per
+                query, but more memory.
+        """
+        self._board = board
+        self._cells_per_tile = cells_per_tile
+        # (cell x, cell y) -> entries whose bounding boxes overlap the cell.
+        self._cells: Dict[Tuple[int, int], List[_Entry]] = {}
+        # MapTile -> [(entry, cells it was added to)]
+        self._tile_entries: Dict[MapTile, List[Tuple[_Entry, List[Tuple[int, int]]]]] = {}
+        # MapSpace -> entry, for polygon lookups.
+        self._space_entries: Dict[MapSpace, _Entry] = {}
+        for tile in board.get_current_tiles():
+            self.tile_added(tile)
+        board.add_listener(self)
+
+    def close(self) -> None:
+        """Stop following changes to the board."""
+        self._board.remove_listener(self)
+
+    def _cell_range(self, x0: float, y0: float, x1: float, y1: float) -> Iterator[Tuple[int, int]]:
+        scale = self._cells_per_tile
+        for cell_x in range(math.floor(x0 * scale), math.floor(x1 * scale) + 1):
+            for cell_y in range(math.floor(y0 * scale), math.floor(y1 * scale) + 1):
+                yield cell_x, cell_y
+
+    def tile_added(self, tile: MapTile) -> None:
+        entries = []
+        for space in tile.get_spaces():
+            entry = _Entry(space, space_polygon(self._board, tile, space))
+            cells = list(self._cell_range(*entry.bbox))
+            for cell in cells:
+                self._cells.setdefault(cell, []).append(entry)
+            entries.append((entry, cells))
+            self._space_entries[space] = entry
+        self._tile_entries[tile] = entries
+
+    def tile_removed(self, tile: MapTile) -> None:
+        for entry, cells in self._tile_entries.pop(tile):
+            for cell in cells:
+                cell_entries = self._cells[cell]
+                cell_entries.remove(entry)
+                if not cell_entries:
+                    del self._cells[cell]
+            del self._space_entries[entry.space]
+
+    def get_polygon(self, space: MapSpace) -> Polygon:
+        """Return the bounds of a space on the board, in board coordinates."""
+        return self._space_entries[space].polygon
+
+    def space_at(self, x: float, y: float) -> Optional[MapSpace]:
+        """Return the space containing the point (x, y), or None. Points on a shared edge go to either space."""
+        scale = self._cells_per_tile
+        for entry in self._cells.get((math.floor(x * scale), math.floor(y * scale)), ()):
+            bx0, by0, bx1, by1 = entry.bbox
+            if bx0 <= x <= bx1 and by0 <= y <= by1 and point_in_polygon(entry.polygon, x, y):
+                return entry.space
+        return None
+
+    def spaces_in_rect(self, x0: float, y0: float, x1: float, y1: float) -> List[MapSpace]:
+        """Return the spaces that overlap the rectangle [x0, x1] x [y0, y1], in no particular order."""
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        # Only look at occupied cells if the rectangle covers more cells than there are.
+        scale = self._cells_per_tile
+        num_cells = (math.floor(x1 * scale) - math.floor(x0 * scale) + 1) * \
+                    (math.floor(y1 * scale) - math.floor(y0 * scale) + 1)
+        if num_cells > len(self._cells):
+            candidates = (entry for entries in self._cells.values() for entry in entries)
+        else:
+            candidates = (entry for cell in self._cell_range(x0, y0, x1, y1) for entry in self._cells.get(cell, ()))
+        found: Dict[MapSpace, None] = {}
+        for entry in candidates:
+            if entry.space not in found and entry.intersects_rect(x0, y0, x1, y1):
+                found[entry.space] = None
+        return list(found)
@@ -0,0 +1,20 @@
+import unittest
+from action import ACTIONS, END_MOVE, Action, ActionType
+from board import Direction
+from tiles import BASE
+
+
+class ActionTableTest(unittest.TestCase):
+    def test_interning(self):
+        space = BASE['graveyard'].spaces[1]
+        move = ACTIONS.move(space)
+        self.assertIs(move, ACTIONS.intern(ActionType.MOVE, space))
+        self.assertIs(move, ACTIONS.get(move.id))
+        self.assertEqual(Action(ActionType.MOVE, space), move)
+        self.assertIs(ACTIONS.exit(Direction.LEFT), ACTIONS.intern(ActionType.EXIT, Direction.LEFT))
+        self.assertIs(END_MOVE, ACTIONS.intern(ActionType.END_MOVE))
+        self.assertNotEqual(move.id, ACTIONS.move(BASE['graveyard'].spaces[0]).id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+from benchmarks.cases import BENCHMARKS
+from benchmarks.runner import compare, time_operation
+
+
+class BenchmarksTest(unittest.TestCase):
+    def test_cases_run(self):
+        for name, setup in BENCHMARKS.items():
+            with self.subTest(name):
+                operation = setup()
+                for _ in range(3):
+                    operation()
+
+    def test_time_operation(self):
+        result = time_operation(lambda: None, min_time=0.001, repeat=2)
+        self.assertGreaterEqual(result['loops'], 1)
+        self.assertLessEqual(result['best'], result['median'])
+
+    def test_compare(self):
+        baseline = {'benchmarks': {'fast': {'best': 1.0}, 'slow': {'best': 1.0}, 'removed': {'best': 1.0}}}
+        results = {'benchmarks': {'fast': {'best': 1.1}, 'slow': {'best': 1.5}, 'new': {'best': 9.0}}}
+        regressions = compare(results, baseline, tolerance=0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith('slow:'))
+
+
+if __name__ == '__main__':
+    unittest.main()
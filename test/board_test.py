@@ -1,8 +1,21 @@
+import multiprocessing
 import unittest
-from board import Board, Direction, MapTile
+import pickle
+import random
+from board import MASK_DIRECTIONS, Board, Direction, MapSpace, MapTile, SPACES
 from tiles import BASE, create_tile
 
 
+def _space_summary(board):
+    """Return every space's valid moves and exits, by space id."""
+    return {str(space): (sorted(str(move) for move in board.get_valid_moves(space)), tile.get_space_exits(space))
+            for tile in board.get_current_tiles() for space in tile.get_spaces()}
+
+
+def _unpickled_space_summary(pickled_board):
+    return _space_summary(pickle.loads(pickled_board))
+
+
 class BoardTest(unittest.TestCase):
     def test_board(self):
         central_lamp_tile = MapTile(BASE['central_lamp'])
@@ -20,6 +33,42 @@ class BoardTest(unittest.TestCase):
         self.assertEqual(1, len(moves))
         self.assertIn(cl2, moves)
 
+    def test_space_interning(self):
+        bounds = ((0, 0), (1, 0), (1, 1), (0, 1))
+        space1 = MapSpace('interning-0', bounds)
+        space2 = MapSpace('interning-0', bounds)
+        space3 = MapSpace('interning-1', bounds)
+        self.assertEqual(space1.uid, space2.uid)
+        self.assertEqual(space1, space2)
+        self.assertNotEqual(space1, space3)
+        self.assertIs(space1, SPACES.get(space2.uid))
+        self.assertEqual(space1, pickle.loads(pickle.dumps(space1)))
+
+    def test_pickle_in_fresh_process(self):
+        # The other process never sees these spaces, so the spaces interned after them get different uids there.
+        for i in range(3):
+            MapSpace('pickle-unseen-%d' % i, ((0, 0), (1, 0), (1, 1), (0, 1)))
+        halves = [((0, 0), (0.5, 0), (0.5, 1), (0, 1)), ((0.5, 0), (1, 0), (1, 1), (0.5, 1))]
+        tile_def = create_tile(tile_id='pickle-halves', positions=halves, exits=[None, 1, None, 0],
+                               adjacency={0: [1], 1: [0]})
+        central_lamp_tile = MapTile(BASE['central_lamp'])
+        board = Board(central_lamp_tile)
+        board.add_tile(central_lamp_tile, Direction.LEFT, tile_def, new_tile_rotation=0)
+        with multiprocessing.get_context('spawn').Pool(1) as pool:
+            self.assertEqual(_space_summary(board), pool.apply(_unpickled_space_summary, (pickle.dumps(board),)))
+
+    def test_tile_rotation(self):
+        oedon_chapel = BASE['oedon_chapel']
+        oc1, oc2, oc3 = oedon_chapel.spaces
+        tile = MapTile(oedon_chapel, rotation=1)
+        self.assertEqual((Direction.UP, Direction.RIGHT, Direction.DOWN), tile.get_exit_directions())
+        self.assertEqual(0b0111, tile.get_exit_mask())
+        self.assertEqual(oc1, tile.get_exit_space(Direction.RIGHT))
+        self.assertIsNone(tile.get_exit_space(Direction.LEFT))
+        self.assertEqual((Direction.UP,), tile.get_space_exits(oc2))
+        self.assertEqual((Direction.DOWN,), tile.get_space_exits(oc3))
+        self.assertRaises(ValueError, tile.get_space_exits, BASE['central_lamp'].spaces[0])
+
     def test_add_tile(self):
         central_lamp_tile = MapTile(BASE['central_lamp'])
         cl1, cl2, cl3 = central_lamp_tile.get_spaces()
@@ -84,6 +133,78 @@ class BoardTest(unittest.TestCase):
         self.assertEqual(1, len(moves))
         self.assertIn(tile_corner1.get_spaces()[0], moves)
 
+        # Tile 3's exit facing S is blocked, so the only open exit left is at the bottom of S.
+        self.assertEqual(1, board.get_num_open_exits())
+        self.assertEqual([(tile_straight, Direction.DOWN)], list(board.get_frontier()))
+        self.assertEqual((Direction.DOWN,), board.get_open_exits(tile_straight))
+        self.assertEqual((), board.get_open_exits(tile_corner3))
+        # A dead end below S closes the frontier, but a corner doesn't.
+        td_dead_end = create_tile(tile_id='dead_end', positions=one_space, exits=[0, None, None, None],
+                                  adjacency={0: []})
+        self.assertTrue(board.would_close_frontier(tile_straight, Direction.DOWN, td_dead_end, 0))
+        self.assertFalse(board.would_close_frontier(tile_straight, Direction.DOWN, td_corner3, 0))
+
+    def test_grid(self):
+        one_space = [((0, 0), (1, 0), (1, 1), (0, 1))]
+        tile_defs = [create_tile(tile_id='grid%d' % i, positions=one_space, exits=[None, 0, None, 0], adjacency={0: []})
+                     for i in range(12)]
+        first_tile = MapTile(tile_defs[0])
+        board = Board(first_tile)
+        snapshot = board.snapshot()
+        # A long row of tiles to the left makes the grid grow.
+        tiles = [first_tile]
+        for tile_def in tile_defs[1:]:
+            tiles.append(board.add_tile(tiles[-1], Direction.LEFT, tile_def, new_tile_rotation=0))
+        for i, tile in enumerate(tiles):
+            self.assertEqual((-i, 0), board.get_position(tile))
+            self.assertIs(tile, board.get_tile_at((-i, 0)))
+        self.assertIs(tiles[1], board.get_tile_in_direction(tiles[0], Direction.LEFT))
+        self.assertIsNone(board.get_tile_in_direction(tiles[0], Direction.RIGHT))
+        self.assertIsNone(board.get_tile_at((0, 1)))
+        self.assertIsNone(board.get_tile_at((100, 100)))
+        with self.assertRaises(ValueError):
+            board.add_tile(tiles[1], Direction.RIGHT, tile_defs[0], new_tile_rotation=0)
+
+        matrix = board.to_matrix()
+        self.assertEqual((12, 1, (-11, 0)), (matrix.width, matrix.height, matrix.origin))
+        self.assertEqual([list(range(12, 0, -1))], matrix.rows())
+
+        board.restore(snapshot)
+        self.assertIsNone(board.get_tile_at((-1, 0)))
+        self.assertEqual([[1]], board.to_matrix().rows())
+
+    def test_frontier(self):
+        def scan(board):
+            return {(tile, direction) for tile in board.get_current_tiles() for direction in tile.get_exit_directions()
+                    if not board.get_tile_in_direction(tile, direction)}
+
+        rng = random.Random(4)
+        tile_defs = [tile_def for name, tile_def in BASE.items() if name != 'central_lamp']
+        for _ in range(20):
+            board = Board(MapTile(BASE['central_lamp']))
+            snapshots = []
+            rng.shuffle(tile_defs)
+            for tile_def in tile_defs:
+                frontier = sorted(scan(board), key=str)
+                self.assertEqual(set(board.get_frontier()), set(frontier))
+                self.assertEqual(board.get_num_open_exits(), len(frontier))
+                if not frontier:
+                    break
+                tile, direction = rng.choice(frontier)
+                rotation = direction.reverse().value - rng.choice(MASK_DIRECTIONS[tile_def.get_exit_mask()]).value
+                would_close = board.would_close_frontier(tile, direction, tile_def, rotation)
+                exit_mask = tile_def.get_exit_mask(rotation)
+                self.assertTrue(board.get_placement_masks(tile, direction) & (1 << exit_mask))
+                keep_open = board.get_placement_masks(tile, direction, keep_frontier_open=True)
+                self.assertEqual(not would_close, bool(keep_open & (1 << exit_mask)))
+                snapshots.append((board.snapshot(), frontier))
+                board.add_tile(tile, direction, tile_def, rotation)
+                self.assertEqual(would_close, board.get_num_open_exits() == 0)
+            for snapshot, frontier in reversed(snapshots):
+                board.restore(snapshot)
+                self.assertEqual(set(board.get_frontier()), set(frontier))
+                self.assertEqual(board.get_num_open_exits(), len(frontier))
+
 
 if __name__ == '__main__':
     unittest.main()
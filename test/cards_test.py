@@ -26,6 +26,36 @@ class DeckTest(unittest.TestCase):
         self.assertIn(1, drawn)
         self.assertIn(3, drawn)
 
+    def test_drawn_cards_unchanged(self):
+        """Cards that were drawn should not change when the deck is later shuffled, reset or drawn from."""
+        d = Deck(4)
+        d.shuffle()
+        drawn = d.draw(2)
+        drawn_copy = list(drawn)
+        d.discard(drawn)
+        d.shuffle_in([5, 6])
+        d.shuffle()
+        d.draw(5)
+        self.assertEqual(drawn_copy, list(drawn))
+        self.assertEqual(1, d.current_deck_size())
+
+    def test_draw_card(self):
+        d = Deck(5)
+        d.shuffle()
+        drawn = d.draw()[0]
+        self.assertFalse(d.has_card(drawn))
+        self.assertRaises(ValueError, d.draw_card, drawn)
+        d.draw_card(3 if drawn != 3 else 4)
+        self.assertEqual(3, d.current_deck_size())
+        remaining = {card for card in range(5) if d.has_card(card)}
+        self.assertEqual(3, len(remaining))
+        self.assertEqual(remaining, set(d.draw(3)))
+
+        d.shuffle_in([drawn])
+        self.assertTrue(d.has_card(drawn))
+        d.draw_card(drawn)
+        self.assertEqual(0, d.current_deck_size())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,35 @@
+import marshal
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import catalog
+from tiles import BASE
+
+
+class CatalogTest(unittest.TestCase):
+    def test_base_tile_set(self):
+        self.assertIs(BASE, catalog.load_tile_set('base'))
+        self.assertIn('central_lamp', BASE)
+        self.assertEqual('Central Lamp', BASE['central_lamp'].spaces[1].name)
+        self.assertIn('Heal 2', catalog.get_tile_help('base', 'grand_cathedral'))
+
+    def test_compiled_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                mock.patch.dict(os.environ, {'BLOODBORNE_TILE_CACHE': cache_dir}):
+            compiled = catalog._load_compiled('base')
+            cache_path = catalog._cache_path('base', catalog._source_path('base'))
+            self.assertTrue(os.path.exists(cache_path))
+            self.assertEqual(compiled, catalog._load_compiled('base'))
+
+            # A cache built from different source is ignored and rebuilt.
+            with open(cache_path, 'rb') as f:
+                version, source_hash, data = marshal.load(f)
+            with open(cache_path, 'wb') as f:
+                marshal.dump((version, 'stale', data[:1]), f)
+            self.assertEqual(compiled, catalog._load_compiled('base'))
+
+
+if __name__ == '__main__':
+    unittest.main()
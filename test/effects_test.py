@@ -0,0 +1,62 @@
+import unittest
+from actor.actor import Actor
+from board import Board, Direction, MapTile
+from effects import TileEffects, Trigger
+from tiles import BASE
+
+
+class TileEffectsTest(unittest.TestCase):
+    def test_effects(self):
+        central_lamp_tile = MapTile(BASE['central_lamp'])
+        cl1, cl2, cl3 = central_lamp_tile.get_spaces()
+        board = Board(central_lamp_tile)
+        effects = TileEffects(board)
+        actor = Actor(cl2, 6)
+        self.assertEqual([cl2], effects.get_lamp_spaces())
+        self.assertEqual(1, len(effects.get_effects(Trigger.ON_INTERACT, cl2)))
+        self.assertEqual((), effects.get_effects(Trigger.ON_INTERACT, cl1))
+        self.assertIsNone(effects.fire(Trigger.ON_INTERACT, actor, cl1))
+
+        snapshot = board.snapshot()
+        chapel_tile = board.add_tile(central_lamp_tile, Direction.LEFT, BASE['oedon_chapel'], new_tile_rotation=0)
+        cathedral_tile = board.add_tile(central_lamp_tile, Direction.UP, BASE['grand_cathedral'])
+        clinic_tile = board.add_tile(central_lamp_tile, Direction.RIGHT, BASE['iosefkas_clinic'])
+        self.assertEqual([chapel_tile], effects.get_tiles(Trigger.ON_ENEMY_ATTACK))
+        self.assertEqual([central_lamp_tile, cathedral_tile], effects.get_tiles(Trigger.ON_INTERACT))
+
+        # Central lamp teleport.
+        event = effects.fire(Trigger.ON_INTERACT, actor, cl2)
+        self.assertEqual(effects.get_lamp_spaces()[1:], event.destinations)
+        self.assertEqual(3, len(event.destinations))
+
+        # Oedon chapel applies on every space of the tile.
+        for space in chapel_tile.get_spaces():
+            self.assertEqual(-1, effects.fire(Trigger.ON_ENEMY_ATTACK, actor, space).speed)
+
+        # Grand cathedral heals 2, up to max hp.
+        actor.set_hp(3)
+        effects.fire(Trigger.ON_INTERACT, actor, cathedral_tile.get_spaces()[3])
+        self.assertEqual(5, actor.get_hp())
+        effects.fire(Trigger.ON_INTERACT, actor, cathedral_tile.get_spaces()[0])
+        self.assertEqual(6, actor.get_hp())
+
+        # Iosefka's clinic only works once per turn.
+        clinic_space = clinic_tile.get_spaces()[1]
+        self.assertEqual(1, effects.fire(Trigger.ONCE_PER_TURN, actor, clinic_space).cards_to_draw)
+        self.assertEqual(5, actor.get_hp())
+        self.assertIsNone(effects.fire(Trigger.ONCE_PER_TURN, actor, clinic_tile.get_spaces()[0]))
+        other_actor = Actor(clinic_space, 6)
+        self.assertIsNotNone(effects.fire(Trigger.ONCE_PER_TURN, other_actor, clinic_space))
+        effects.new_turn()
+        self.assertIsNotNone(effects.fire(Trigger.ONCE_PER_TURN, actor, clinic_space))
+        self.assertEqual(4, actor.get_hp())
+
+        board.restore(snapshot)
+        self.assertEqual([cl2], effects.get_lamp_spaces())
+        self.assertEqual([], effects.get_tiles(Trigger.ON_ENEMY_ATTACK))
+        self.assertEqual([central_lamp_tile], effects.get_tiles(Trigger.ON_INTERACT))
+        self.assertIsNone(effects.fire(Trigger.ONCE_PER_TURN, actor, clinic_space))
+
+        effects.close()
+        board.add_tile(central_lamp_tile, Direction.LEFT, BASE['oedon_chapel'], new_tile_rotation=0)
+        self.assertEqual([], effects.get_tiles(Trigger.ON_ENEMY_ATTACK))
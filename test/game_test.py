@@ -0,0 +1,104 @@
+import random
+import unittest
+from functools import partial
+from action import ActionType
+from board import Direction
+from controller import RandomHunterController
+from effects import EFFECTS, TileEffect, Trigger
+from game import Game
+from tiles import BASE
+
+
+def _game_state(game):
+    board = game.get_board()
+    return ([(str(tile), board.get_valid_moves(tile.get_spaces()[0])) for tile in board.get_current_tiles()],
+            [player.actor.position for player in game.get_players()],
+            game._tiles.num_remaining(), game.get_current_round(), game.get_phase(), game.get_moves_remaining())
+
+
+def _play(game, num_decisions):
+    for _ in range(num_decisions):
+        if game.is_game_over():
+            break
+        player = game.get_current_player()
+        game.apply_action(player.select_action(game.get_possible_actions()))
+
+
+class GameTest(unittest.TestCase):
+    def test_snapshot_restore(self):
+        random.seed(5)
+        game = Game(2, controller_factory=partial(RandomHunterController, rng=random.Random(5)), verbose=False)
+        _play(game, 7)
+        snapshot = game.snapshot()
+        state = _game_state(game)
+
+        for _ in range(10):
+            _play(game, 20)
+            game.restore(snapshot)
+            self.assertEqual(state, _game_state(game))
+
+        # Restored games keep playing normally.
+        while not game.is_game_over():
+            game.round()
+        self.assertRaises(ValueError, game.round)
+
+    def test_snapshot_restores_used_effects(self):
+        game = Game(1, controller_factory=partial(RandomHunterController, rng=random.Random(5)), verbose=False)
+        effects = game.get_tile_effects()
+        board = game.get_board()
+        clinic_tile = board.add_tile(next(iter(board.get_current_tiles())), Direction.RIGHT, BASE['iosefkas_clinic'])
+        clinic_space = clinic_tile.get_spaces()[1]
+        actor = game.get_players()[0].actor
+        snapshot = game.snapshot()
+        self.assertIsNotNone(effects.fire(Trigger.ONCE_PER_TURN, actor, clinic_space))
+        used_snapshot = game.snapshot()
+        self.assertIsNone(effects.fire(Trigger.ONCE_PER_TURN, actor, clinic_space))
+
+        game.restore(snapshot)
+        self.assertIsNotNone(effects.fire(Trigger.ONCE_PER_TURN, actor, clinic_space))
+        effects.new_turn()
+        game.restore(used_snapshot)
+        self.assertIsNone(effects.fire(Trigger.ONCE_PER_TURN, actor, clinic_space))
+
+    def test_moves_fire_on_enter_effects(self):
+        events = []
+        on_enter = TileEffect('central_lamp', Trigger.ON_ENTER, events.append)
+        EFFECTS['central_lamp'].append(on_enter)
+        self.addCleanup(EFFECTS['central_lamp'].remove, on_enter)
+        game = Game(1, controller_factory=partial(RandomHunterController, rng=random.Random(5)), verbose=False)
+        player = game.get_current_player()
+        lamp_tile = game.get_board().get_tile(player.actor.position)
+        move = next(move for move in game.get_player_moves(player)
+                    if move.type == ActionType.MOVE and game.get_board().get_tile(move.arg) is lamp_tile)
+
+        game.apply_player_move(player, move)
+        self.assertEqual([(Trigger.ON_ENTER, player.actor, move.arg)],
+                         [(event.trigger, event.actor, event.space) for event in events])
+
+    def test_move_generation_is_cached(self):
+        random.seed(6)
+        game = Game(1, controller_factory=RandomHunterController, verbose=False)
+        player = game.get_current_player()
+        self.assertIs(game.get_player_actions(player), game.get_player_actions(player))
+        self.assertIs(game.get_player_moves(player), game.get_player_moves(player))
+
+    def test_handle_player_move(self):
+        game = Game(1, controller_factory=partial(RandomHunterController, rng=random.Random(8)), verbose=False)
+        player = game.get_current_player()
+        for _ in range(20):
+            start = player.actor.position
+            destination_space = game.handle_player_move(player, 2)
+            if destination_space is None:
+                self.assertEqual(start, player.actor.position)
+            else:
+                self.assertEqual(destination_space, player.actor.position)
+
+    def test_no_pursuit_distances_without_monsters(self):
+        game = Game(1, controller_factory=partial(RandomHunterController, rng=random.Random(7)), verbose=False)
+        game.round()
+        # Nothing would use the distances, so they aren't computed.
+        self.assertIsNone(game._distance_field.distance(game.get_players()[0].actor.position))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import instrumentation
+from game import Game
+from simulate import run_game, simulate
+
+
+class InstrumentationTest(unittest.TestCase):
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.take()
+
+    def test_enable_disable(self):
+        original_round = Game.round
+        instrumentation.enable()
+        self.assertTrue(instrumentation.is_enabled())
+        self.assertIsNot(Game.round, original_round)
+        run_game(3)
+        instrumentation.disable()
+        self.assertIs(Game.round, original_round)
+
+        stats = instrumentation.take()
+        self.assertEqual(stats.timings['game.round'].count, 5)
+        # Subclass controllers call their base class methods, but each decision should only be counted once.
+        self.assertEqual(stats.timings['controller.select_move'].count, stats.timings['game.get_player_moves'].count)
+        self.assertEqual(instrumentation.take().timings, {})
+
+        # Nothing is recorded while disabled.
+        run_game(3)
+        self.assertEqual(instrumentation.get_stats().timings, {})
+
+    def test_prometheus(self):
+        instrumentation.enable()
+        run_game(3)
+        text = instrumentation.take().to_prometheus({'worker': 'a'})
+        self.assertIn('# TYPE bloodborne_call_seconds histogram', text)
+        self.assertIn('bloodborne_call_seconds_count{worker="a",function="game.round"} 5', text)
+        self.assertIn('le="+Inf"', text)
+
+    def test_simulate_metrics(self):
+        summary = simulate(4, root_seed=1, chunk_size=2, instrument=True)
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertEqual(len(summary.metrics), 1)
+        stats = next(iter(summary.metrics.values()))
+        self.assertEqual(stats.timings['game.round'].count, summary.rounds.total)
+
+
+if __name__ == '__main__':
+    unittest.main()
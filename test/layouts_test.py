@@ -0,0 +1,90 @@
+import unittest
+from board import Board, Direction, MapTile
+from fractions import Fraction
+from layouts import CLOSED, DEPTH_LIMIT, EXHAUSTED, canonical_layout, enumerate_layouts
+from tiles import BASE
+
+
+def _tiles_with_mask(mask):
+    return [tile_def for name, tile_def in BASE.items() if name != 'central_lamp' and tile_def.get_exit_mask() == mask]
+
+
+def _brute_force(board, remaining, num_placed, max_tiles, keep_frontier_open):
+    """Enumerate placements on a real Board, without any symmetry reduction or memoization."""
+    open_exits = [(tile, direction) for tile in list(board.get_current_tiles())
+                  for direction in tile.get_exit_directions() if not board.get_tile_in_direction(tile, direction)]
+    if not open_exits:
+        return {(CLOSED, num_placed): Fraction(1)}
+    if not remaining:
+        return {(EXHAUSTED, num_placed): Fraction(1)}
+    if num_placed >= max_tiles:
+        return {(DEPTH_LIMIT, num_placed): Fraction(1)}
+    result = {}
+    for tile, direction in open_exits:
+        # (index in remaining, rotations) of the tiles that can be placed.
+        options = []
+        for i, tile_def in enumerate(remaining):
+            exits = tile_def.get_exit_mask()
+            options.append((i, [direction.reverse().value - d.value for d in Direction if exits & (1 << d.value)]))
+        if keep_frontier_open:
+            open_options = [(i, [rotation for rotation in rotations
+                                 if not board.would_close_frontier(tile, direction, remaining[i], rotation)])
+                            for i, rotations in options]
+            open_options = [option for option in open_options if option[1]]
+            if open_options:
+                options = open_options
+        for i, rotations in options:
+            for rotation in rotations:
+                snapshot = board.snapshot()
+                board.add_tile(tile, direction, remaining[i], rotation)
+                p = Fraction(1, len(open_exits) * len(options) * len(rotations))
+                for outcome, q in _brute_force(board, remaining[:i] + remaining[i + 1:], num_placed + 1,
+                                               max_tiles, keep_frontier_open).items():
+                    result[outcome] = result.get(outcome, Fraction(0)) + p * q
+                board.restore(snapshot)
+    return result
+
+
+class LayoutsTest(unittest.TestCase):
+    def test_canonical_layout(self):
+        layout = {(0, 0): 0b1111, (0, 1): 0b0100, (1, 0): 0b0110}
+        # Rotated a quarter turn clockwise.
+        rotated = {(0, 0): 0b1111, (1, 0): 0b1000, (0, -1): 0b1100}
+        # Mirrored left to right.
+        mirrored = {(0, 0): 0b1111, (0, 1): 0b0100, (-1, 0): 0b1100}
+        self.assertEqual(canonical_layout(layout), canonical_layout(rotated))
+        self.assertEqual(canonical_layout(layout), canonical_layout(mirrored))
+        self.assertNotEqual(canonical_layout(layout), canonical_layout({(0, 0): 0b1111, (0, 1): 0b0100}))
+
+    def test_dead_ends_close_the_lamp(self):
+        lamp = MapTile(BASE['central_lamp'], 0)
+        distribution = enumerate_layouts(_tiles_with_mask(0b0100)[:4], lamp)
+        self.assertEqual(distribution.outcomes, {(CLOSED, 4): Fraction(1)})
+
+    def test_matches_brute_force(self):
+        lamp = MapTile(BASE['central_lamp'], 0)
+        tile_defs = (_tiles_with_mask(0b0100)[:2] + _tiles_with_mask(0b0101)[:1] + _tiles_with_mask(0b0110)[:1] +
+                     _tiles_with_mask(0b1110)[:1])
+        # Starting from a straight tile, the board can close early.
+        for start_tile in (lamp, MapTile(_tiles_with_mask(0b0101)[1], 0)):
+            for keep_frontier_open in (False, True):
+                with self.subTest(start_tile=str(start_tile), keep_frontier_open=keep_frontier_open):
+                    distribution = enumerate_layouts(tile_defs, start_tile, 3, keep_frontier_open)
+                    expected = _brute_force(Board(start_tile), tile_defs, 0, 3, keep_frontier_open)
+                    self.assertEqual(distribution.outcomes, expected)
+                    self.assertEqual(sum(distribution.outcomes.values()), 1)
+        self.assertGreater(enumerate_layouts(tile_defs, start_tile, 3, keep_frontier_open=False).probability(CLOSED), 0)
+
+    def test_keep_frontier_open(self):
+        # From a straight tile, a dead end closes the board only when there's nothing else to place.
+        straight = MapTile(_tiles_with_mask(0b0101)[0], 0)
+        tile_defs = _tiles_with_mask(0b0100)[:2] + _tiles_with_mask(0b0110)[:1]
+        self.assertEqual(enumerate_layouts(tile_defs, straight, keep_frontier_open=False).outcomes,
+                         {(CLOSED, 2): Fraction(1, 3), (CLOSED, 3): Fraction(2, 3)})
+        self.assertEqual(enumerate_layouts(tile_defs, straight).outcomes, {(CLOSED, 3): Fraction(1)})
+        self.assertEqual(enumerate_layouts(_tiles_with_mask(0b0100)[:2], straight).outcomes,
+                         {(CLOSED, 2): Fraction(1)})
+
+
+if __name__ == '__main__':
+    unittest.main()
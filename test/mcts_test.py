@@ -0,0 +1,111 @@
+import multiprocessing
+import pickle
+import random
+import unittest
+from functools import partial
+from board import Direction, MapSpace
+from controller import RandomHunterController
+from game import Game
+from mcts import MCTSController, _Node, _state_key, _worker_search, tiles_revealed_reward
+from rng import RandomStream
+from tiles import BASE
+
+
+class MCTSControllerTest(unittest.TestCase):
+    def test_search_leaves_game_unchanged(self):
+        random.seed(3)
+        game = Game(1, controller_factory=partial(MCTSController, rollouts=30, rng=random.Random(3)), verbose=False)
+        controller = game.get_current_player()
+        controller.set_game(game)
+        for _ in range(10):
+            board = game.get_board()
+            state = (list(board.get_current_tiles()), controller.actor.position, game.get_tile_deck().num_remaining(),
+                     game.get_phase(), game.get_moves_remaining())
+            possible_actions = game.get_possible_actions()
+            action = controller.select_action(possible_actions)
+            self.assertIn(action, possible_actions)
+            self.assertEqual(state, (list(board.get_current_tiles()), controller.actor.position,
+                                     game.get_tile_deck().num_remaining(), game.get_phase(),
+                                     game.get_moves_remaining()))
+            game.apply_action(action)
+
+    def test_search_leaves_randomness_unchanged(self):
+        game = Game(1, controller_factory=partial(MCTSController, rollouts=30, rng=random.Random(4)), verbose=False,
+                    rng=RandomStream(4))
+        controller = game.get_current_player()
+        controller.set_game(game)
+        streams = game.snapshot().streams
+        module_state = random.getstate()
+        controller.select_action(game.get_possible_actions())
+        self.assertEqual(streams, game.snapshot().streams)
+        self.assertEqual(module_state, random.getstate())
+
+    def test_state_key_covers_the_whole_position(self):
+        def new_game():
+            return Game(1, controller_factory=partial(RandomHunterController, rng=random.Random(8)), verbose=False,
+                        rng=RandomStream(8))
+
+        game1, game2 = new_game(), new_game()
+        self.assertEqual(_state_key(game1), _state_key(game2))
+        # The same number of tiles and the same newest tile, but different earlier tiles.
+        board1, board2 = game1.get_board(), game2.get_board()
+        lamp1, lamp2 = next(iter(board1.get_current_tiles())), next(iter(board2.get_current_tiles()))
+        board1.add_tile(lamp1, Direction.LEFT, BASE['oedon_chapel'], new_tile_rotation=0)
+        board2.add_tile(lamp2, Direction.UP, BASE['grand_cathedral'])
+        clinic = board1.add_tile(lamp1, Direction.RIGHT, BASE['iosefkas_clinic'])
+        board2.add_tile(lamp2, Direction.RIGHT, BASE['iosefkas_clinic'], new_tile_rotation=clinic.get_rotation())
+        self.assertNotEqual(_state_key(game1), _state_key(game2))
+
+        # The same board, but different tiles left in the deck.
+        game3, game4 = new_game(), new_game()
+        game4.get_tile_deck().draw()
+        self.assertNotEqual(_state_key(game3), _state_key(game4))
+
+    def test_iterations_sample_different_tiles(self):
+        game = Game(1, controller_factory=partial(MCTSController, rollouts=200, rng=random.Random(4)), verbose=False,
+                    rng=RandomStream(4))
+        controller = game.get_current_player()
+        controller.set_game(game)
+        root = _Node(_state_key(game))
+        controller._search.run(game, root, 200, None)
+
+        def max_outcomes(node):
+            return max([0] + [len(edge.outcomes) for edge in node.edges.values()] +
+                       [max_outcomes(child) for edge in node.edges.values() for child in edge.outcomes.values()])
+        # Exits reveal different tiles in different iterations.
+        self.assertGreater(max_outcomes(root), 1)
+
+    def test_workers(self):
+        game = Game(1, controller_factory=partial(MCTSController, rollouts=30, workers=2, rng=random.Random(5)),
+                    verbose=False, rng=RandomStream(5))
+        controller = game.get_current_player()
+        controller.set_game(game)
+        try:
+            for _ in range(3):
+                streams = game.snapshot().streams
+                possible_actions = game.get_possible_actions()
+                action = controller.select_action(possible_actions)
+                self.assertIn(action, possible_actions)
+                self.assertEqual(streams, game.snapshot().streams)
+                game.apply_action(action)
+        finally:
+            controller.close()
+
+    def test_worker_search_in_spawned_process(self):
+        game = Game(1, controller_factory=partial(MCTSController, rollouts=30, rng=random.Random(6)), verbose=False,
+                    rng=RandomStream(6))
+        controller = game.get_current_player()
+        controller.set_game(game)
+        game.apply_action(game.get_possible_actions()[0])
+        task = (pickle.dumps(game), 7, 40, None, 1.4, tiles_revealed_reward, 200)
+        # Spawned workers start from a fresh interpreter. Interning a space there before anything else gives every
+        # space in the unpickled game a different uid than here.
+        unseen_space = partial(MapSpace, 'mcts-unseen', ((0, 0), (1, 0), (1, 1), (0, 1)))
+        with multiprocessing.get_context('spawn').Pool(1, initializer=unseen_space) as pool:
+            stats = pool.apply(_worker_search, (task,))
+        self.assertEqual(40, sum(visits for visits, _ in stats.values()))
+        self.assertEqual(set(game.get_possible_actions()), set(stats))
+
+
+if __name__ == '__main__':
+    unittest.main()
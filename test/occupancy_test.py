@@ -0,0 +1,76 @@
+import pickle
+import unittest
+from functools import partial
+from actor.actor import Actor
+from actor.occupancy import Occupancy
+from board import Board, Direction, MapTile
+from controller import RandomHunterController
+from game import Game
+from rng import RandomStream
+from tiles import BASE
+
+
+class OccupancyTest(unittest.TestCase):
+    def test_occupancy(self):
+        central_lamp_tile = MapTile(BASE['central_lamp'])
+        cl1, cl2, cl3 = central_lamp_tile.get_spaces()
+        board = Board(central_lamp_tile)
+        oedon_chapel_tile = board.add_tile(central_lamp_tile, Direction.LEFT, BASE['oedon_chapel'], new_tile_rotation=0)
+        oc1, _, _ = oedon_chapel_tile.get_spaces()
+
+        occupancy = Occupancy(board)
+        monster = Actor(cl1, max_hp=3)
+        occupancy.add(monster)
+        self.assertEqual([monster], list(occupancy.get_actors(cl1)))
+        self.assertEqual(1, occupancy.count_monsters(cl1))
+        self.assertEqual(0, occupancy.count_hunters(cl1))
+        self.assertEqual(0, occupancy.count(oc1))
+
+        monster.move(cl2)
+        self.assertEqual(0, occupancy.count(cl1))
+        self.assertEqual(1, occupancy.count(cl2))
+        self.assertEqual([monster], list(occupancy.get_tile_actors(central_lamp_tile)))
+
+        monster.move(oc1)
+        self.assertEqual([], list(occupancy.get_tile_actors(central_lamp_tile)))
+        self.assertEqual([monster], list(occupancy.get_tile_actors(oedon_chapel_tile)))
+        self.assertRaises(ValueError, occupancy.add, monster)
+
+        occupancy.remove(monster)
+        self.assertEqual(0, occupancy.count(oc1))
+        monster.move(cl3)
+        self.assertEqual(0, occupancy.count(cl3))
+
+    def test_game(self):
+        rng = RandomStream(4)
+        game = Game(3, controller_factory=partial(RandomHunterController, rng=rng.split('hunters')), verbose=False,
+                    rng=rng)
+        occupancy = game.get_occupancy()
+        snapshot = game.snapshot()
+
+        def check():
+            board = game.get_board()
+            for tile in board.get_current_tiles():
+                expected = {player.actor for player in game.get_players()
+                            if board.get_tile(player.actor.position) == tile}
+                self.assertEqual(expected, set(occupancy.get_tile_actors(tile)))
+                for space in tile.get_spaces():
+                    hunters = [player.actor for player in game.get_players() if player.actor.position == space]
+                    self.assertEqual(set(hunters), set(occupancy.get_actors(space)))
+                    self.assertEqual(len(hunters), occupancy.count_hunters(space))
+                    self.assertEqual(0, occupancy.count_monsters(space))
+
+        while not game.is_game_over():
+            game.round()
+            check()
+        game.restore(snapshot)
+        check()
+
+        # Copies (e.g. sent to another process) have their own, consistent index.
+        game = pickle.loads(pickle.dumps(game))
+        occupancy = game.get_occupancy()
+        check()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import random
+import unittest
+from board import Board, Direction, MapTile
+from pursuit import DistanceField
+from tiles import BASE
+
+
+class DistanceFieldTest(unittest.TestCase):
+    def test_distances(self):
+        central_lamp_tile = MapTile(BASE['central_lamp'])
+        cl1, cl2, cl3 = central_lamp_tile.get_spaces()
+        board = Board(central_lamp_tile)
+        oedon_chapel_tile = board.add_tile(central_lamp_tile, Direction.LEFT, BASE['oedon_chapel'], new_tile_rotation=0)
+        oc1, oc2, oc3 = oedon_chapel_tile.get_spaces()
+
+        field = DistanceField(board)
+        field.reset([cl3])
+        self.assertEqual(0, field.distance(cl3))
+        self.assertEqual(2, field.distance(cl1))
+        self.assertEqual(3, field.distance(oc3))
+        self.assertEqual(4, field.distance(oc1))
+        self.assertEqual(oc3, field.next_step(oc1))
+
+        field.hunter_moved(cl3, cl2)
+        self.assertEqual(0, field.distance(cl2))
+        self.assertEqual(1, field.distance(cl3))
+        self.assertEqual(3, field.distance(oc2))
+
+    def test_incremental_updates_match_full_recompute(self):
+        rng = random.Random(42)
+        tile_defs = [tile_def for name, tile_def in BASE.items() if name != 'central_lamp']
+        for _ in range(20):
+            first_tile = MapTile(BASE['central_lamp'])
+            board = Board(first_tile)
+            hunters = [first_tile.get_spaces()[0], first_tile.get_spaces()[2]]
+            field = DistanceField(board)
+            field.reset(hunters)
+            for tile_def in rng.sample(tile_defs, 8):
+                # Extend the board through a random open exit, then move a hunter around.
+                open_exits = [(tile, direction) for tile in board.get_current_tiles()
+                              for direction in tile.get_exit_directions()
+                              if board.get_tile_in_direction(tile, direction) is None]
+                if not open_exits:
+                    break
+                tile, direction = rng.choice(open_exits)
+                field.tile_added(board.add_tile(tile, direction, tile_def))
+                for _ in range(3):
+                    hunter = rng.randrange(len(hunters))
+                    destination = rng.choice(board.get_valid_moves(hunters[hunter]))
+                    field.hunter_moved(hunters[hunter], destination)
+                    hunters[hunter] = destination
+
+                expected = DistanceField(board)
+                expected.reset(hunters)
+                for space in (s for t in board.get_current_tiles() for s in t.get_spaces()):
+                    self.assertEqual(expected.distance(space), field.distance(space))
+
+
+if __name__ == '__main__':
+    unittest.main()
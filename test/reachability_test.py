@@ -0,0 +1,75 @@
+import pickle
+import random
+import unittest
+from board import Board, Direction, MapTile
+from pursuit import DistanceField
+from reachability import Reachability, mask_of, spaces_of
+from tiles import BASE
+
+
+class ReachabilityTest(unittest.TestCase):
+    def test_reachability(self):
+        central_lamp_tile = MapTile(BASE['central_lamp'])
+        cl1, cl2, cl3 = central_lamp_tile.get_spaces()
+        board = Board(central_lamp_tile)
+        reachability = Reachability(board)
+        self.assertEqual(mask_of(board.get_valid_moves(cl3)), reachability.neighbors(cl3))
+        self.assertEqual(mask_of([cl1, cl2, cl3]), reachability.within(cl3, 5))
+
+        snapshot = board.snapshot()
+        oedon_chapel_tile = board.add_tile(central_lamp_tile, Direction.LEFT, BASE['oedon_chapel'], new_tile_rotation=0)
+        oc1, oc2, oc3 = oedon_chapel_tile.get_spaces()
+        self.assertEqual(mask_of([cl3]), reachability.within(cl3, 0))
+        self.assertEqual({cl1, cl2, cl3, oc3}, set(spaces_of(reachability.within(cl3, 3))))
+        self.assertEqual({oc1, oc2}, set(spaces_of(reachability.exactly(cl3, 4))))
+        self.assertEqual(mask_of(board.get_valid_moves(oc3)), reachability.neighbors(oc3))
+
+        routes = reachability.routes(oc3, 2)
+        self.assertIn((), routes)
+        self.assertEqual(len(routes), len(set(routes)))
+        for route in routes:
+            self.assertNotIn(oc3, route)
+            self.assertEqual(len(route), len(set(route)))
+            for start, end in zip((oc3,) + route, route):
+                self.assertIn(end, board.get_valid_moves(start))
+        self.assertEqual({route[-1] for route in routes if route} | {oc3}, set(spaces_of(reachability.within(oc3, 2))))
+
+        copy = pickle.loads(pickle.dumps(reachability))
+        self.assertEqual(reachability.within(oc3, 2), copy.within(oc3, 2))
+        self.assertEqual(reachability.neighbors(cl3), copy.neighbors(cl3))
+
+        board.restore(snapshot)
+        self.assertEqual(0, reachability.neighbors(oc3))
+        self.assertEqual(mask_of([cl1, cl2, cl3]), reachability.within(cl3, 5))
+        self.assertRaises(KeyError, reachability.within, oc3, 1)
+
+    def test_matches_distance_field(self):
+        rng = random.Random(7)
+        tile_defs = [tile_def for name, tile_def in BASE.items() if name != 'central_lamp']
+        for _ in range(10):
+            first_tile = MapTile(BASE['central_lamp'])
+            board = Board(first_tile, rng)
+            reachability = Reachability(board)
+            snapshot = board.snapshot()
+            for tile_def in rng.sample(tile_defs, 10):
+                frontier = list(board.get_frontier())
+                if not frontier:
+                    break
+                board.add_tile(*rng.choice(frontier), tile_def)
+
+            spaces = [space for tile in board.get_current_tiles() for space in tile.get_spaces()]
+            start = rng.choice(spaces)
+            distances = DistanceField(board)
+            distances.reset([start])
+            for num_moves in range(6):
+                expected = {space for space in spaces
+                            if distances.distance(space) is not None and distances.distance(space) <= num_moves}
+                self.assertEqual(expected, set(spaces_of(reachability.within(start, num_moves))))
+
+            board.restore(snapshot)
+            self.assertEqual(mask_of(first_tile.get_spaces()), reachability.within(first_tile.get_spaces()[0], 10))
+            reachability.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
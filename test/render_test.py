@@ -0,0 +1,95 @@
+import unittest
+from board import Board, Direction, MapTile
+from render import BoardRenderer
+from tiles import create_tile
+
+_HALVES = [((0, 0), (0.5, 0), (0.5, 1), (0, 1)), ((0.5, 0), (1, 0), (1, 1), (0.5, 1))]
+
+
+class RenderTest(unittest.TestCase):
+    def setUp(self):
+        self.tile_def = create_tile(tile_id='halves', positions=_HALVES, exits=[0, 1, 1, 0],
+                                    adjacency={0: [1], 1: [0]})
+        self.td_b = create_tile(tile_id='halves_b', positions=_HALVES, exits=[0, 1, 1, 0], adjacency={0: [1], 1: [0]})
+        self.tile_a = MapTile(self.tile_def)
+        self.board = Board(self.tile_a)
+        self.renderer = BoardRenderer(self.board, cell_width=9, cell_height=5)
+
+    def test_ascii(self):
+        self.assertEqual('\n'.join(['+---E---+',
+                                    '|  |    |',
+                                    'E a|  b E',
+                                    '|  |    |',
+                                    '+---E---+']), self.renderer.render_ascii())
+        a_cell = self.renderer._ascii_cells[(0, 0)]
+
+        snapshot = self.board.snapshot()
+        tile_b = self.board.add_tile(self.tile_a, Direction.RIGHT, self.td_b, new_tile_rotation=0)
+        self.renderer.update_actors({'1': tile_b.get_spaces()[1]})
+        lines = self.renderer.render_ascii().split('\n')
+        self.assertEqual(5, len(lines))
+        self.assertEqual('E a|  b EE a|  b1E', lines[2])
+        # The first tile didn't change, so its cell wasn't redrawn.
+        self.assertIs(a_cell, self.renderer._ascii_cells[(0, 0)])
+        fragment = self.renderer._ascii_fragments[(self.td_b, 0)]
+
+        self.renderer.update_actors({'1': self.tile_a.get_spaces()[0]})
+        self.assertEqual('E a1  b EE a|  b E', self.renderer.render_ascii().split('\n')[2])
+
+        self.board.restore(snapshot)
+        self.assertEqual('E a1  b E', self.renderer.render_ascii().split('\n')[2])
+        self.assertNotIn((1, 0), self.renderer._ascii_cells)
+
+        # Fragments only depend on the TileDef and rotation, so placing the tile again reuses the cached one.
+        self.board.add_tile(self.tile_a, Direction.RIGHT, self.td_b, new_tile_rotation=0)
+        self.renderer.render_ascii()
+        self.assertIs(fragment, self.renderer._ascii_cells[(1, 0)])
+
+    def test_actor_on_removed_tile(self):
+        snapshot = self.board.snapshot()
+        tile_b = self.board.add_tile(self.tile_a, Direction.RIGHT, self.td_b, new_tile_rotation=0)
+        self.renderer.update_actors({'1': tile_b.get_spaces()[1]})
+        self.renderer.render_ascii()
+        self.board.restore(snapshot)
+        td_c = create_tile(tile_id='halves_c', positions=_HALVES, exits=[0, 1, 1, 0], adjacency={0: [1], 1: [0]})
+        tile_c = self.board.add_tile(self.tile_a, Direction.RIGHT, td_c, new_tile_rotation=0)
+        self.assertEqual('E a|  b EE a|  b E', self.renderer.render_ascii().split('\n')[2])
+        self.assertEqual(4, self.renderer.render_svg().count('<polygon'))
+
+        self.renderer.update_actors({'1': tile_c.get_spaces()[0]})
+        self.assertEqual('E a|  b EE a1  b E', self.renderer.render_ascii().split('\n')[2])
+
+    def test_actor_moves_only_redraw_their_cells(self):
+        tile_b = self.board.add_tile(self.tile_a, Direction.RIGHT, self.td_b, new_tile_rotation=0)
+        tile_c = self.board.add_tile(self.tile_a, Direction.DOWN, create_tile(
+            tile_id='halves_c', positions=_HALVES, exits=[0, 1, 1, 0], adjacency={0: [1], 1: [0]}), 0)
+        self.renderer.update_actors({'1': tile_b.get_spaces()[0], '2': tile_b.get_spaces()[1]})
+        self.renderer.render_ascii()
+
+        self.renderer.update_actors({'1': tile_c.get_spaces()[0], '2': tile_b.get_spaces()[1]})
+        self.assertEqual({(1, 0), (0, -1)}, self.renderer._ascii_dirty)
+        self.renderer.render_ascii()
+        self.renderer.update_actors({'2': tile_b.get_spaces()[1]})
+        self.assertEqual({(0, -1)}, self.renderer._ascii_dirty)
+        self.assertNotIn((0, -1), self.renderer._cell_actors)
+        self.assertEqual(['2'], list(self.renderer._cell_actors[(1, 0)]))
+
+    def test_svg(self):
+        tile_b = self.board.add_tile(self.tile_a, Direction.DOWN, self.td_b, new_tile_rotation=0)
+        self.renderer.update_actors({'hunter': tile_b.get_spaces()[0]})
+        svg = self.renderer.render_svg()
+        self.assertTrue(svg.startswith('<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 200">'))
+        self.assertEqual(4, svg.count('<polygon'))
+        self.assertEqual(1, svg.count('class="actor"'))
+        self.assertIn('>hunter</text>', svg)
+        # The new tile is below the first one, so it's drawn lower down.
+        self.assertIn('<g transform="translate(0,100)">', svg)
+
+        self.renderer.close()
+        self.board.add_tile(tile_b, Direction.RIGHT, create_tile(
+            tile_id='halves_c', positions=_HALVES, exits=[0, 1, 1, 0], adjacency={0: [1], 1: [0]}), 0)
+        self.assertEqual(4, self.renderer.render_svg().count('<polygon'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+from replay import GameEnd, GameStart, PlayerAction, ReplayReader, ReplayWriter, RoundEnd, TileDraw
+from simulate import run_game
+
+
+class ReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'games.bbr')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        seeds = [11, 12, 13]
+        with ReplayWriter(self.path) as writer:
+            results = [run_game(seed, recorder=writer) for seed in seeds[:2]]
+        # A second writer appends a new segment with its own dictionaries.
+        with ReplayWriter(self.path) as writer:
+            results.append(run_game(seeds[2], recorder=writer))
+
+        with ReplayReader(self.path) as reader:
+            self.assertEqual(len(reader), 3)
+            # Read the games out of order to exercise random access.
+            for index in (2, 0, 1):
+                events = list(reader.game(index))
+                result = results[index]
+                self.assertEqual(events[0], GameStart(seeds[index], 1))
+                self.assertEqual(events[-1], GameEnd(result.rounds))
+                tile_draws = [event for event in events if isinstance(event, TileDraw)]
+                self.assertEqual(len(tile_draws), result.tiles_revealed - 1)
+                self.assertEqual([event.round_number for event in events if isinstance(event, RoundEnd)],
+                                 list(range(result.rounds)))
+                self.assertTrue(any(isinstance(event, PlayerAction) for event in events))
+            self.assertEqual(sum(1 for _ in reader), 3)
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a replay')
+        with self.assertRaises(ValueError):
+            ReplayReader(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import io
+import os
+import tempfile
+import unittest
+from array import array
+from results import ColumnarSink, column_parts, read_column, read_npy, write_npy
+
+
+class ResultsTest(unittest.TestCase):
+    def test_npy_header(self):
+        f = io.BytesIO()
+        write_npy(f, array('q', [1, -2, 3]))
+        data = f.getvalue()
+        header_length = int.from_bytes(data[8:10], 'little')
+        self.assertEqual(b'\x93NUMPY\x01\x00', data[:8])
+        self.assertEqual(0, (10 + header_length) % 64)
+        self.assertIn(b"'descr': '<i8'", data[10:10 + header_length])
+        self.assertIn(b"'shape': (3,)", data[10:10 + header_length])
+        self.assertEqual(3 * 8, len(data) - 10 - header_length)
+
+    def test_sink(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with ColumnarSink(directory, 'a', [('x', 'q'), ('y', 'd')], batch_size=4) as sink:
+                for i in range(10):
+                    sink.add((i, i / 2))
+                self.assertRaises(ValueError, sink.add, (1,))
+            with ColumnarSink(directory, 'b', [('x', 'q'), ('y', 'd')], batch_size=4) as sink:
+                sink.add((10, 5.0))
+            parts = column_parts(directory, 'x')
+            self.assertEqual(['a-0000.npy', 'a-0001.npy', 'a-0002.npy', 'b-0000.npy'],
+                             [os.path.basename(path) for path in parts])
+            self.assertEqual(array('q', [4, 5, 6, 7]), read_npy(parts[1]))
+            self.assertEqual(array('q', range(11)), read_column(directory, 'x'))
+            self.assertEqual(array('d', [i / 2 for i in range(11)]), read_column(directory, 'y'))
+            self.assertEqual(array('q'), read_column(directory, 'z'))
+
+
+if __name__ == '__main__':
+    unittest.main()
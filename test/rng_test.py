@@ -0,0 +1,101 @@
+import pickle
+import unittest
+from collections import Counter
+from functools import partial
+from controller import RandomHunterController
+from game import Game
+from rng import RandomStream
+
+
+def _play(game: Game):
+    while not game.is_game_over():
+        game.round()
+    return [str(tile) for tile in game.get_board().get_current_tiles()]
+
+
+class RandomStreamTest(unittest.TestCase):
+    def test_deterministic(self):
+        stream1 = RandomStream(7)
+        stream2 = RandomStream(7)
+        self.assertEqual([stream1.randrange(100) for _ in range(5000)], [stream2.randrange(100) for _ in range(5000)])
+        self.assertEqual(stream1.random(), stream2.random())
+        self.assertNotEqual([RandomStream(8).random() for _ in range(3)], [RandomStream(7).random() for _ in range(3)])
+
+        stream1.seed(7)
+        self.assertEqual(RandomStream(7).getrandbits(100), stream1.getrandbits(100))
+
+    def test_split(self):
+        root = RandomStream(1)
+        root.random()
+        # Children only depend on the root's seed and the key, not on what the root has drawn.
+        self.assertEqual(RandomStream(1).split('game', 3).getrandbits(64), root.split('game', 3).getrandbits(64))
+        self.assertNotEqual(root.split('game', 3).getrandbits(64), root.split('game', 4).getrandbits(64))
+        self.assertNotEqual(root.split('board').getrandbits(64), root.split('tiles').getrandbits(64))
+        self.assertEqual(root.split('game', 3).getrandbits(64), root.split('game').split(3).getrandbits(64))
+        # Keys are quoted in the stream's path, so they can't run together.
+        self.assertNotEqual(root.split('a/b').getrandbits(64), root.split('a', 'b').getrandbits(64))
+        self.assertNotEqual(root.split('3').getrandbits(64), root.split(3).getrandbits(64))
+
+    def test_pickle(self):
+        stream = RandomStream(3)
+        stream.choice('abc')
+        copy = pickle.loads(pickle.dumps(stream))
+        self.assertEqual([stream.random() for _ in range(3000)], [copy.random() for _ in range(3000)])
+
+    def test_state(self):
+        stream = RandomStream(4)
+        stream.getrandbits(20 * 32)
+        state = stream.getstate()
+        # Far enough to need new blocks.
+        draws = [stream.random() for _ in range(100)]
+        stream.setstate(state)
+        self.assertEqual(draws, [stream.random() for _ in range(100)])
+        other = RandomStream(5)
+        other.setstate(state)
+        self.assertEqual(draws, [other.random() for _ in range(100)])
+
+        items = list(range(30))
+        stream.shuffle(items)
+        self.assertEqual(list(range(30)), sorted(items))
+
+    def test_uniform(self):
+        stream = RandomStream(5)
+        counts = Counter(stream.choice('abcde') for _ in range(10000))
+        self.assertEqual(set('abcde'), set(counts))
+        self.assertTrue(all(1800 < count < 2200 for count in counts.values()), counts)
+
+        permutations = Counter()
+        for _ in range(6000):
+            items = [0, 1, 2]
+            stream.shuffle(items)
+            permutations[tuple(items)] += 1
+        self.assertEqual(6, len(permutations))
+        self.assertTrue(all(850 < count < 1150 for count in permutations.values()), permutations)
+        self.assertTrue(all(0 <= stream.randrange(3, 10 ** 12) < 10 ** 12 for _ in range(100)))
+
+    def test_game_streams(self):
+        def new_game(seed):
+            rng = RandomStream(seed)
+            return Game(2, controller_factory=partial(RandomHunterController, rng=rng.split('hunters')),
+                        verbose=False, rng=rng)
+
+        self.assertEqual(_play(new_game(11)), _play(new_game(11)))
+
+        # Reseeding a game changes what it draws from then on, and reseeding it the same way gives the same draws.
+        game1 = new_game(12)
+        game2 = new_game(12)
+        game1.reseed(99)
+        game2.reseed(99)
+        self.assertEqual(game1.get_tile_deck().draw(), game2.get_tile_deck().draw())
+
+        # Restoring a snapshot restores the streams too, so the game draws the same way again.
+        snapshot = game1.snapshot()
+        game1.get_tile_deck().shuffle()
+        tiles = [game1.get_tile_deck().draw() for _ in range(5)]
+        game1.restore(snapshot)
+        game1.get_tile_deck().shuffle()
+        self.assertEqual(tiles, [game1.get_tile_deck().draw() for _ in range(5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
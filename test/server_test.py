@@ -0,0 +1,52 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from controller import AsyncHunterController, BlockingControllerAdapter, HunterController, RandomHunterController
+from game import Game
+from server import GameServer, play_async
+
+
+async def _client(path):
+    """Play a whole game by always picking the first option. Return the number of prompts answered."""
+    reader, writer = await asyncio.open_unix_connection(path)
+    num_prompts = 0
+    try:
+        while True:
+            await reader.readuntil(b'> ')
+            num_prompts += 1
+            writer.write(b'1\n')
+            await writer.drain()
+    except asyncio.IncompleteReadError as e:
+        assert e.partial.endswith(b'Game over.\n'), e.partial
+    finally:
+        writer.close()
+    return num_prompts
+
+
+class GameServerTest(unittest.TestCase):
+    def test_concurrent_sessions(self):
+        async def run():
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                path = os.path.join(tmp_dir, 'server.sock')
+                server = GameServer()
+                listener = await server.start_unix(path)
+                async with listener:
+                    results = await asyncio.gather(*[_client(path) for _ in range(20)])
+                return results
+
+        for num_prompts in asyncio.run(run()):
+            self.assertGreater(num_prompts, 0)
+
+    def test_async_controllers(self):
+        self.assertFalse(issubclass(AsyncHunterController, HunterController))
+        self.assertRaises(TypeError, AsyncHunterController, None)
+        game = Game(1, controller_factory=lambda hunter: BlockingControllerAdapter(
+            hunter, RandomHunterController(hunter)), verbose=False)
+        self.assertRaises(TypeError, game.round)
+        asyncio.run(play_async(game))
+        self.assertTrue(game.is_game_over())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from action import ActionType
+from results import column_parts, read_column
+from simulate import QuantileSketch, RunningStat, run_game, simulate
+
+
+class SimulateTest(unittest.TestCase):
+    def test_run_game_is_deterministic(self):
+        self.assertEqual(run_game(1234), run_game(1234))
+
+    def test_chunking_does_not_change_results(self):
+        """Results should only depend on the root seed, not on how games are split up."""
+        summary1 = simulate(50, root_seed=7, chunk_size=50)
+        summary2 = simulate(50, root_seed=7, chunk_size=7)
+        self.assertEqual(summary1.games, 50)
+        self.assertEqual(summary1, summary2)
+
+    def test_results_dir(self):
+        with tempfile.TemporaryDirectory() as directory:
+            summary = simulate(20, root_seed=3, chunk_size=7, results_dir=directory, batch_size=5)
+            games_dir = os.path.join(directory, 'games')
+            rounds_dir = os.path.join(directory, 'rounds')
+            self.assertEqual(list(range(20)), sorted(read_column(games_dir, 'game')))
+            self.assertEqual(summary.tiles_revealed.total, sum(read_column(games_dir, 'tiles_revealed')))
+            action_columns = ['actions_%s' % action_type.name.lower() for action_type in ActionType]
+            self.assertEqual(summary.actions.total,
+                             sum(sum(read_column(games_dir, column)) for column in action_columns))
+            self.assertEqual(summary.rounds.total, len(read_column(rounds_dir, 'round')))
+            self.assertEqual(summary.actions.total, sum(read_column(rounds_dir, 'actions')))
+            # Batches span chunks, so 20 games in batches of 5 take 4 files.
+            self.assertEqual(4, len(column_parts(games_dir, 'game')))
+            result = run_game(read_column(games_dir, 'seed')[0], record_rounds=True)
+            self.assertEqual(result.rounds, len(result.rounds_played))
+            self.assertEqual(result.tiles_revealed, result.rounds_played[-1].tiles_revealed)
+
+    def test_results_dir_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            simulate(20, workers=2, root_seed=3, chunk_size=3, results_dir=directory, batch_size=100)
+            games_dir = os.path.join(directory, 'games')
+            self.assertEqual(list(range(20)), sorted(read_column(games_dir, 'game')))
+            # One file per worker that played any games.
+            self.assertLessEqual(len(column_parts(games_dir, 'game')), 2)
+        self.assertEqual((), run_game(3).rounds_played)
+
+    def test_running_stat(self):
+        stat = RunningStat()
+        for value in range(1, 101):
+            stat.add(value)
+        self.assertAlmostEqual(50.5, stat.mean())
+        self.assertAlmostEqual(841.6666666, stat.variance(), places=5)
+        for q in (0.01, 0.5, 0.9, 0.99):
+            exact = 1 + int(q * 99)
+            self.assertAlmostEqual(exact, stat.quantile(q), delta=0.01 * exact)
+
+        sketch = QuantileSketch()
+        other = QuantileSketch()
+        sketch.add(0)
+        other.add(1000)
+        sketch.merge(other)
+        self.assertEqual(0, sketch.quantile(0))
+        self.assertAlmostEqual(1000, sketch.quantile(1), delta=10)
+        self.assertIsNone(QuantileSketch().quantile(0.5))
+
+
+if __name__ == '__main__':
+    unittest.main()
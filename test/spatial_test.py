@@ -0,0 +1,52 @@
+import unittest
+from board import Board, Direction, MapTile
+from spatial import SpaceIndex
+from tiles import create_tile
+
+_HALVES = [((0, 0), (0.5, 0), (0.5, 1), (0, 1)), ((0.5, 0), (1, 0), (1, 1), (0.5, 1))]
+
+
+class SpatialTest(unittest.TestCase):
+    def setUp(self):
+        td_a = create_tile(tile_id='halves_a', positions=_HALVES, exits=[0, 1, 1, 0], adjacency={0: [1], 1: [0]})
+        self.td_b = create_tile(tile_id='halves_b', positions=_HALVES, exits=[0, 1, 1, 0], adjacency={0: [1], 1: [0]})
+        self.tile_a = MapTile(td_a)
+        self.board = Board(self.tile_a)
+        self.index = SpaceIndex(self.board)
+
+    def test_point_queries(self):
+        a0, a1 = self.tile_a.get_spaces()
+        self.assertEqual(a0, self.index.space_at(0.25, 0.5))
+        self.assertEqual(a1, self.index.space_at(0.75, 0.1))
+        self.assertIsNone(self.index.space_at(1.5, 0.5))
+        self.assertIsNone(self.index.space_at(-0.5, 0.5))
+
+        # Rotated a quarter turn clockwise, the left half ends up on top.
+        snapshot = self.board.snapshot()
+        tile_b = self.board.add_tile(self.tile_a, Direction.RIGHT, self.td_b, new_tile_rotation=1)
+        b0, b1 = tile_b.get_spaces()
+        self.assertEqual(b0, self.index.space_at(1.5, 0.75))
+        self.assertEqual(b1, self.index.space_at(1.5, 0.25))
+        self.assertEqual(((2, 1), (2, 0.5), (1, 0.5), (1, 1)), self.index.get_polygon(b0))
+
+        self.board.restore(snapshot)
+        self.assertIsNone(self.index.space_at(1.5, 0.75))
+
+    def test_rect_queries(self):
+        a0, a1 = self.tile_a.get_spaces()
+        tile_b = self.board.add_tile(self.tile_a, Direction.RIGHT, self.td_b, new_tile_rotation=1)
+        b0, b1 = tile_b.get_spaces()
+        self.assertEqual([a0], self.index.spaces_in_rect(0.1, 0.1, 0.2, 0.2))
+        self.assertEqual({a0, a1, b0, b1}, set(self.index.spaces_in_rect(0.4, 0.4, 1.2, 0.6)))
+        self.assertEqual({b0}, set(self.index.spaces_in_rect(1.2, 0.7, 5, 5)))
+        self.assertEqual({a0, a1, b0, b1}, set(self.index.spaces_in_rect(-100, -100, 100, 100)))
+        self.assertEqual([], self.index.spaces_in_rect(3, 3, 4, 4))
+
+        self.index.close()
+        self.board.add_tile(tile_b, Direction.DOWN, create_tile(
+            tile_id='halves_c', positions=_HALVES, exits=[0, 1, 1, 0], adjacency={0: [1], 1: [0]}), 0)
+        self.assertIsNone(self.index.space_at(1.5, -0.5))
+
+
+if __name__ == '__main__':
+    unittest.main()
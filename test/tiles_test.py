@@ -0,0 +1,61 @@
+import unittest
+from board import Board, Direction, MapTile
+from rng import RandomStream
+from tiles import BASE, ExitMaskIndex, TileDeck, get_exit_mask_index
+
+
+class TilesTest(unittest.TestCase):
+    def setUp(self):
+        self.tile_defs = [tile_def for name, tile_def in BASE.items() if name != 'central_lamp']
+
+    def test_exit_mask_index(self):
+        index = ExitMaskIndex(self.tile_defs)
+        for exit_mask in range(16):
+            expected = {(i, rotation) for i, tile_def in enumerate(self.tile_defs) for rotation in range(4)
+                        if tile_def.get_exit_mask(rotation) == exit_mask}
+            self.assertEqual(expected, set(index.get(exit_mask)))
+        # Every tile has an exit, so every tile can be rotated to have an exit UP.
+        up_masks = sum(1 << exit_mask for exit_mask in range(16) if exit_mask & 1)
+        self.assertEqual(list(range(len(self.tile_defs))), [i for i, _ in index.matching(up_masks)])
+        self.assertEqual((), index.matching(1 << 0))
+        # A cross can be rotated any way.
+        cross = self.tile_defs.index(BASE['graveyard'])
+        self.assertEqual((cross, (0, 1, 2, 3)), index.matching(1 << 0b1111)[0])
+
+    def test_shared_exit_mask_index(self):
+        index = get_exit_mask_index(self.tile_defs)
+        self.assertIs(index, get_exit_mask_index(list(self.tile_defs)))
+        self.assertIsNot(index, get_exit_mask_index(self.tile_defs[1:]))
+        self.assertIs(index, TileDeck(self.tile_defs)._exit_mask_index)
+
+    def test_draw_with_exit_masks(self):
+        # The board's only open exit is the dead end's exit DOWN, so another dead end there would close the board.
+        dead_end = MapTile(BASE['tomb_of_oedon'])
+        board = Board(dead_end)
+        tile_defs = [tile_def for tile_def in self.tile_defs if tile_def is not BASE['tomb_of_oedon']]
+        deck = TileDeck(tile_defs, RandomStream(3))
+        keep_open = board.get_placement_masks(dead_end, Direction.DOWN, keep_frontier_open=True)
+        drawn = []
+        while True:
+            result = deck.draw_with_exit_masks(keep_open)
+            if result is None:
+                break
+            tile_def, rotation = result
+            self.assertTrue(keep_open & (1 << tile_def.get_exit_mask(rotation)))
+            self.assertFalse(board.would_close_frontier(dead_end, Direction.DOWN, tile_def, rotation))
+            drawn.append(tile_def)
+        self.assertEqual(len(drawn), len(set(drawn)))
+
+        # Only the dead ends are left, and they can still be drawn without the constraint.
+        remaining = [deck.draw() for _ in range(deck.num_remaining())]
+        self.assertEqual(4, len(remaining))
+        self.assertTrue(all(bin(tile_def.get_exit_mask()).count('1') == 1 for tile_def in remaining))
+        self.assertEqual(set(tile_defs), set(drawn) | set(remaining))
+
+        deck.shuffle_in(drawn[0])
+        self.assertEqual((drawn[0], 0), deck.draw_with_exit_masks(1 << drawn[0].get_exit_mask()))
+        self.assertIsNone(deck.draw())
+
+
+if __name__ == '__main__':
+    unittest.main()
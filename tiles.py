@@ -1,14 +1,65 @@
+import random
 from board import MapSpace, TileDef
-from cards.deck import Deck
-from typing import List, Optional
+from cards.deck import Deck, DeckSnapshot
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+class ExitMaskIndex:
+    """Finds the tiles, and their rotations, that have given exit masks."""
+    def __init__(self, tiles: Sequence[TileDef]):
+        # Exit mask -> ((index in tiles, rotation), ...) for every rotation of every tile that has that exit mask.
+        entries: List[List[Tuple[int, int]]] = [[] for _ in range(16)]
+        for i, tile in enumerate(tiles):
+            for rotation in range(4):
+                entries[tile.get_exit_mask(rotation)].append((i, rotation))
+        self._entries: Tuple[Tuple[Tuple[int, int], ...], ...] = tuple(tuple(e) for e in entries)
+        # Allowed masks -> result of matching(). Only a few sets of masks ever come up, so this stays small.
+        self._matches: Dict[int, Tuple[Tuple[int, Tuple[int, ...]], ...]] = {}
+
+    def get(self, exit_mask: int) -> Tuple[Tuple[int, int], ...]:
+        """Return (index in tiles, rotation) for every rotation of every tile that has exactly `exit_mask`."""
+        return self._entries[exit_mask]
+
+    def matching(self, allowed_masks: int) -> Tuple[Tuple[int, Tuple[int, ...]], ...]:
+        """Return (index in tiles, rotations) for the tiles that have an allowed exit mask in at least one rotation,
+        where rotations are the rotations with allowed masks. `allowed_masks` is a 16-bit set of exit masks, see
+        Board.get_placement_masks()."""
+        result = self._matches.get(allowed_masks)
+        if result is None:
+            matches: Dict[int, List[int]] = {}
+            for exit_mask, entries in enumerate(self._entries):
+                if allowed_masks & (1 << exit_mask):
+                    for i, rotation in entries:
+                        matches.setdefault(i, []).append(rotation)
+            result = self._matches[allowed_masks] = tuple((i, tuple(sorted(rotations)))
+                                                          for i, rotations in sorted(matches.items()))
+        return result
+
+
+# Tile list -> its ExitMaskIndex. Every game deals from the same few tile lists, so they share an index (and its cache
+# of matches) instead of building one per TileDeck.
+_exit_mask_indexes: Dict[Tuple[TileDef, ...], ExitMaskIndex] = {}
+
+
+def get_exit_mask_index(tiles: Sequence[TileDef]) -> ExitMaskIndex:
+    """Return the shared ExitMaskIndex of `tiles`."""
+    key = tuple(tiles)
+    index = _exit_mask_indexes.get(key)
+    if index is None:
+        index = _exit_mask_indexes[key] = ExitMaskIndex(key)
+    return index
 
 
 class TileDeck:
     """A TileDeck is a simplified Deck that doesn't have a discard pile."""
-    def __init__(self, tiles: List[TileDef]):
-        self._deck = Deck(len(tiles))
+    def __init__(self, tiles: List[TileDef], rng: Optional[random.Random] = None):
+        self._rng = rng if rng is not None else random
+        self._deck = Deck(len(tiles), rng)
         self._deck.shuffle()
         self._tiles = tiles
+        # TileDef -> card number in self._deck.
+        self._card_numbers: Dict[TileDef, int] = {tile: i for i, tile in enumerate(tiles)}
+        self._exit_mask_index = get_exit_mask_index(tiles)
 
     def draw(self) -> Optional[TileDef]:
         if self._deck.current_deck_size() == 0:
@@ -16,14 +67,47 @@ class TileDeck:
         drawn_card = self._deck.draw(num_cards=1, auto_shuffle_discard=False)
         return self._tiles[drawn_card[0]]
 
+    def draw_with_exit_masks(self, allowed_masks: int) -> Optional[Tuple[TileDef, int]]:
+        """Draw a tile that can be rotated to have one of `allowed_masks` (a 16-bit set of exit masks, see
+        Board.get_placement_masks()), and return it with one of those rotations. Return None if no remaining tile fits.
+
+        The tile is picked uniformly from the remaining tiles that fit, and the rotation uniformly from its rotations
+        that fit.
+        """
+        has_card = self._deck.has_card
+        candidates = [match for match in self._exit_mask_index.matching(allowed_masks) if has_card(match[0])]
+        if not candidates:
+            return None
+        card, rotations = self._rng.choice(candidates)
+        self._deck.draw_card(card)
+        return self._tiles[card], self._rng.choice(rotations)
+
     def shuffle_in(self, tile: TileDef) -> None:
-        if tile not in self._tiles:
+        card = self._card_numbers.get(tile)
+        if card is None:
             raise ValueError('Provided tile is not in this deck.')
-        self._deck.shuffle_in([self._tiles.index(tile)])
+        self._deck.shuffle_in([card])
+
+    def shuffle(self) -> None:
+        """Shuffle the remaining tiles."""
+        self._deck.shuffle()
 
     def num_remaining(self) -> int:
         return self._deck.current_deck_size()
 
+    def get_remaining_tiles(self) -> List[TileDef]:
+        """Return the tiles left in the deck, in no particular order."""
+        has_card = self._deck.has_card
+        return [tile for card, tile in enumerate(self._tiles) if has_card(card)]
+
+    def snapshot(self) -> DeckSnapshot:
+        """See Deck.snapshot()."""
+        return self._deck.snapshot()
+
+    def restore(self, snapshot: DeckSnapshot) -> None:
+        """See Deck.restore()."""
+        self._deck.restore(snapshot)
+
 
 def create_tile(**kwargs) -> TileDef:
     """Convenience function for creating a TileDef.
@@ -44,445 +128,16 @@ def create_tile(**kwargs) -> TileDef:
     return TileDef(spaces, exits, adjacency, kwargs['tile_id'])
 
 
-BASE = {
-    'central_lamp': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +-----+--E--+-----+
-          |     |     |     |
-          |     |  N  |     |
-          E     |  L  |     E
-          |     |     |     |
-          |     |     |     |
-          +-----+--E--+-----+
-        (0, 1)          (1, 1)
-    
-        Special effect: Interact on Central Lamp space: teleport to any lamp space or inside any fog gate.
-        ''',
-        tile_id='central_lamp',
-        positions=[
-            ((0, 0), (0.33, 0), (0.33, 1), (0, 1)),
-            ((0.33, 0), (0.67, 0), (0.67, 1), (0.33, 1)),
-            ((0.67, 0), (1, 0), (1, 1), (0.67, 1))
-        ],
-        exits=[1, 2, 1, 0],
-        adjacency={0: [1], 1: [0, 2], 2: [1]},
-        names={1: 'Central Lamp'}
-    ),
-    'oedon_chapel': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +--------E--------+
-          |       N L       |
-          |                 |
-          +--------+--------+
-          E        |        E
-          |        |        |
-          +--------+--------+
-        (0, 1)          (1, 1)
-    
-        Special effect: Enemy attacks suffer -1 speed while on this tile.
-        ''',
-        tile_id='oedon_chapel',
-        positions=[
-            ((0, 0), (1, 0), (1, 0.5), (0, 0.5)),
-            ((0, 0.5), (0.5, 0.5), (0.5, 1), (0, 1)),
-            ((0.5, 0.5), (1, 0.5), (1, 1), (0.5, 1)),
-        ],
-        exits=[0, 2, None, 1],
-        adjacency={0: [1, 2], 1: [0, 2], 2: [0, 1]},
-        names={0: 'Oedon Chapel'}
-    ),
-    'courtyard_lamp': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +-----+-----+-----+
-          |     |     |     |
-          |     |  N  |     |
-          E     |  L  |     E
-          |     |     |     |
-          |     |     |     |
-          +-----+--E--+-----+
-        (0, 1)          (1, 1)
-        ''',
-        tile_id='courtyard_lamp',
-        positions=[
-            ((0, 0), (0.33, 0), (0.33, 1), (0, 1)),
-            ((0.33, 0), (0.67, 0), (0.67, 1), (0.33, 1)),
-            ((0.67, 0), (1, 0), (1, 1), (0.67, 1))
-        ],
-        exits=[None, 2, 1, 0],
-        adjacency={0: [1], 1: [0, 2], 2: [1]},
-        names={1: 'Courtyard Lamp'}
-    ),
-    'tomb_of_oedon': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +-----------------+
-          |       N C       |
-          |                 |
-          +-----------------+
-          |        L        |
-          |                 |
-          +--------E--------+
-        (0, 1)          (1, 1)
-        
-        Special effect: Chests are draw-three-select-one. Shuffle others back into deck.
-        ''',
-        tile_id='tomb_of_oedon',
-        positions=[
-            ((0, 0), (1, 0), (1, 0.5), (0, 0.5)),
-            ((0, 0.5), (0.5, 0.5), (0.5, 1), (0, 1))
-        ],
-        exits=[None, None, 1, None],
-        adjacency={0: [1], 1: [0]},
-        names={0: 'Tomb of Oedon'}
-    ),
-    'alleyway': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +--------E--------+
-          |                 |
-          +-----------------+
-          |       N 3       |
-          +-----------------+
-          |                 |
-          +--------E--------+
-        (0, 1)          (1, 1)
-        ''',
-        tile_id='alleyway',
-        positions=[
-            ((0, 0), (1, 0), (1, 0.33), (0, 0.33)),
-            ((0, 0.33), (1, 0.33), (1, 0.67), (0, 0.67)),
-            ((0, 0.67), (1, 0.67), (1, 1), (0, 1))
-        ],
-        exits=[0, None, 2, None],
-        adjacency={0: [1], 1: [0, 2], 2: [1]},
-        names={1: 'Alleyway'}
-    ),
-    'the_great_bridge': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +--------E--------+
-          |      N C 3      |
-          |                 |
-          +-----------------+
-          |                 |
-          |                 |
-          +--------E--------+
-        (0, 1)          (1, 1)
-    
-        Special effect: Hunters may not move out of spaces containing enemies on this tile.
-        ''',
-        tile_id='great_bridge',
-        positions=[
-            ((0, 0), (1, 0), (1, 0.5), (0, 0.5)),
-            ((0, 0.5), (0.5, 0.5), (0.5, 1), (0, 1))
-        ],
-        exits=[0, None, 1, None],
-        adjacency={0: [1], 1: [0]},
-        names={0: 'The Great Bridge'}
-    ),
-    'ransacked_house': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +-----------------+
-          |     1 C C 3     |
-          |        N        |
-          +-----------------+
-          |                 |
-          |                 |
-          +--------E--------+
-        (0, 1)          (1, 1)
-        ''',
-        tile_id='ransacked_house',
-        positions=[
-            ((0, 0), (1, 0), (1, 0.5), (0, 0.5)),
-            ((0, 0.5), (0.5, 0.5), (0.5, 1), (0, 1))
-        ],
-        exits=[None, None, 1, None],
-        adjacency={0: [1], 1: [0]},
-        names={0: 'Ransacked House'}
-    ),
-    'barred_window': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +--------+--------+
-          |    N   |        |
-          |        |        |
-          +--------+    C   E
-          |    2   |        |
-          |        |        |
-          +-------E+--------+
-        (0, 1)          (1, 1)
-        ''',
-        tile_id='barred_window',
-        positions=[
-            ((0, 0), (0.5, 0), (0.5, 0.5), (0, 0.5)),
-            ((0.5, 0), (1, 0), (1, 1), (0.5, 1)),
-            ((0, 0.5), (0.5, 0.5), (0.5, 1), (0, 1))
-        ],
-        exits=[None, 1, 2, None],
-        adjacency={0: [1, 2], 1: [0, 2], 2: [0, 1]},
-        names={0: 'Barred Window'}
-    ),
-    'church_of_the_good_chalice': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +-----------------+
-          |      N C C      |
-          +-----------------+
-          |        L        |
-          +-----------------+
-          |                 |
-          +--------E--------+
-        (0, 1)          (1, 1)
-        
-        Special effect: Interact: Trade one consumable for a blood echo.
-        (N.B. unclear if it's one consumable or one chest pickup)
-        ''',
-        tile_id='good_chalice',
-        positions=[
-            ((0, 0), (1, 0), (1, 0.33), (0, 0.33)),
-            ((0, 0.33), (1, 0.33), (1, 0.67), (0, 0.67)),
-            ((0, 0.67), (1, 0.67), (1, 1), (0, 1))
-        ],
-        exits=[None, None, 2, None],
-        adjacency={0: [1], 1: [0, 2], 2: [1]},
-        names={1: 'Church of the Good Chalice'}
-    ),
-    'graveyard': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +--------E--------+
-          |                 |
-          +-----------------+
-          E       C 2       E
-          +-----------------+
-          |                 |
-          +--------E--------+
-        (0, 1)          (1, 1)
-        ''',
-        tile_id='graveyard',
-        positions=[
-            ((0, 0), (1, 0), (1, 0.33), (0, 0.33)),
-            ((0, 0.33), (1, 0.33), (1, 0.67), (0, 0.67)),
-            ((0, 0.67), (1, 0.67), (1, 1), (0, 1))
-        ],
-        exits=[0, 1, 2, 1],
-        adjacency={0: [1], 1: [0, 2], 2: [1]},
-        names={1: 'Graveyard'}
-    ),
-    'occupied_house': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +--------E--------+
-          |        1        |
-          E                 E
-          +-----------------+
-          |        N        |
-          |                 |
-          +-----------------+
-        (0, 1)          (1, 1)
-        ''',
-        tile_id='occupied_house',
-        positions=[
-            ((0, 0), (1, 0), (1, 0.5), (0, 0.5)),
-            ((0, 0.5), (0.5, 0.5), (0.5, 1), (0, 1))
-        ],
-        exits=[0, 0, None, 0],
-        adjacency={0: [1], 1: [0]},
-        names={1: 'Occupied House'}
-    ),
-    'grand_cathedral': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +-----------------+
-          |        N        |
-          +--------+--------+
-          |    L   |    C   |
-          +--------+--------+
-          |                 |
-          +--------E--------+
-        (0, 1)          (1, 1)
-        
-        Special effect: Interact: Heal 2
-        ''',
-        tile_id='grand_cathedral',
-        positions=[
-            ((0, 0), (1, 0), (1, 0.33), (0, 0.33)),
-            ((0, 0.33), (0.5, 0.33), (0.5, 0.67), (0, 0.67)),
-            ((0.5, 0.33), (1, 0.33), (1, 0.67), (0.5, 0.67)),
-            ((0, 0.67), (1, 0.67), (1, 1), (0, 1))
-        ],
-        exits=[None, None, 3, None],
-        adjacency={0: [1, 2], 1: [0, 2, 3], 2: [0, 1, 3], 3: [1, 2]},
-        names={0: 'Grand Cathedral'}
-    ),
-    'iosefkas_clinic': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +-----------------+
-          |       N L       |
-          |                 |
-          +-----------------+
-          |                 |
-          |                 |
-          +--------E--------+
-        (0, 1)          (1, 1)
-        
-        Special effect: Once per turn: Take one damage and draw one card
-        ''',
-        tile_id='iosefkas_clinic',
-        positions=[
-            ((0, 0), (1, 0), (1, 0.5), (0, 0.5)),
-            ((0, 0.5), (0.5, 0.5), (0.5, 1), (0, 1))
-        ],
-        exits=[None, None, 1, None],
-        adjacency={0: [1], 1: [0]},
-        names={0: 'Iosefka\'s Clinic'}
-    ),
-    'unnamed1': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +--------E--------+
-          |                 |
-          |                 |
-          +-----------------+
-          |       C 3       |
-          |                 |
-          +--------E--------+
-        (0, 1)          (1, 1)
-        ''',
-        tile_id='unnamed1',
-        positions=[
-            ((0, 0), (1, 0), (1, 0.5), (0, 0.5)),
-            ((0, 0.5), (0.5, 0.5), (0.5, 1), (0, 1))
-        ],
-        exits=[0, None, 1, None],
-        adjacency={0: [1], 1: [0]}
-    ),
-    'unnamed2': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +--------+--------+
-          |    1   |    3   |
-          E        |        E
-          +--------+--------+
-          |                 |
-          |                 |
-          +--------E--------+
-        (0, 1)          (1, 1)
-        ''',
-        tile_id='unnamed2',
-        positions=[
-            ((0, 0), (0.5, 0), (0.5, 0.5), (0, 0.5)),
-            ((0.5, 0), (1, 0), (1, 0.5), (0.5, 0.5)),
-            ((0, 0.5), (1, 0.5), (1, 1), (0, 1)),
-        ],
-        exits=[None, 1, 2, 0],
-        adjacency={0: [1, 2], 1: [0, 2], 2: [0, 1]}
-    ),
-    'unnamed3': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +--------+--------+
-          |    C   |        |
-          |        |        E
-          +--------+--------+
-          |        1        |
-          |                 |
-          +--------E--------+
-        (0, 1)          (1, 1)
-        ''',
-        tile_id='unnamed3',
-        positions=[
-            ((0, 0), (0.5, 0), (0.5, 0.5), (0, 0.5)),
-            ((0.5, 0), (1, 0), (1, 0.5), (0.5, 0.5)),
-            ((0, 0.5), (1, 0.5), (1, 1), (0, 1)),
-        ],
-        exits=[None, 1, 2, None],
-        adjacency={0: [1, 2], 1: [0, 2], 2: [0, 1]}
-    ),
-    'unnamed4': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +-----------------+
-          |        C        |
-          +-----------------+
-          E        2        E
-          +-----------------+
-          |        1        |
-          +--------E--------+
-        (0, 1)          (1, 1)
-        ''',
-        tile_id='unnamed4',
-        positions=[
-            ((0, 0), (1, 0), (1, 0.33), (0, 0.33)),
-            ((0, 0.33), (1, 0.33), (1, 0.67), (0, 0.67)),
-            ((0, 0.67), (1, 0.67), (1, 1), (0, 1))
-        ],
-        exits=[None, 1, 2, 1],
-        adjacency={0: [1], 1: [0, 2], 2: [1]}
-    ),
-    'unnamed5': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +-------E+--------+
-          |        |        |
-          |        |        |
-          E    2   |   C    E
-          |        |        |
-          |        |        |
-          +--------+E-------+
-        (0, 1)          (1, 1)
-        ''',
-        tile_id='unnamed5',
-        positions=[
-            ((0, 0), (0.5, 0), (0.5, 1), (0, 1)),
-            ((0.5, 0), (1, 0), (1, 1), (0.5, 1))
-        ],
-        exits=[0, 1, 1, 0],
-        adjacency={0: [1], 1: [0]}
-    ),
-    'unnamed6': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +--------+--------+
-          |        |        |
-          |        |        |
-          E    2   |   1    E
-          |        |        |
-          |        |        |
-          +--------+--------+
-        (0, 1)          (1, 1)
-        ''',
-        tile_id='unnamed6',
-        positions=[
-            ((0, 0), (0.5, 0), (0.5, 1), (0, 1)),
-            ((0.5, 0), (1, 0), (1, 1), (0.5, 1))
-        ],
-        exits=[None, 1, None, 0],
-        adjacency={0: [1], 1: [0]}
-    ),
-    'unnamed7': create_tile(
-        help='''
-        (0, 0)          (1, 0)
-          +-----------------+
-          |        C        |
-          E                 E
-          +-----------------+
-          |        3        |
-          |                 |
-          +--------E--------+
-        (0, 1)          (1, 1)
-        ''',
-        tile_id='unnamed7',
-        positions=[
-            ((0, 0), (1, 0), (1, 0.5), (0, 0.5)),
-            ((0, 0.5), (0.5, 0.5), (0.5, 1), (0, 1))
-        ],
-        exits=[None, 0, 1, 0],
-        adjacency={0: [1], 1: [0]}
-    ),
+# Module attributes that name tile sets in the catalog. They're loaded on first access, so importing this module doesn't
+# build any tiles.
+_TILE_SET_ATTRIBUTES: Dict[str, str] = {
+    'BASE': 'base',
 }
+
+
+def __getattr__(name: str) -> Any:
+    if name in _TILE_SET_ATTRIBUTES:
+        # Imported here because catalog itself depends on this module.
+        from catalog import load_tile_set
+        return load_tile_set(_TILE_SET_ATTRIBUTES[name])
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))